@@ -0,0 +1,255 @@
+"""Offline benchmarks for `srtgo` against the local stand-in server.
+
+    python benchmarks/bench.py search --rail srt -n 200 --latency 0.01
+    python benchmarks/bench.py loop --rail ktx --open-after 100
+    python benchmarks/bench.py search --metrics   # per-endpoint client metrics
+    python benchmarks/bench.py loop --profile --profile-cpu   # srtgo --profile, headless
+    python benchmarks/bench.py loop --error stall=0.05 --deadline 2   # half-open requests
+
+`search` times back-to-back `search_train` calls; `loop` drives
+`srtgo.srtgo.reserve_loop` until the stand-in opens a seat and books it.
+Both report requests/sec, per-call latency percentiles and client CPU per
+poll (thread CPU of the calling thread, so the in-process server is not
+counted).
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from standin import StandIn, StandInConfig, redirect
+
+from srtgo import srtgo
+from srtgo.profiling import LoopProfiler
+from srtgo.scheduler import PollScheduler
+from srtgo.ktx import AdultPassenger, Korail, ReserveOption
+from srtgo.settings import Settings
+from srtgo.srt import SRT, Adult, SeatType
+from srtgo.watch import WatchSet
+
+SEARCH_PARAMS = {
+    "srt": {"dep": "수서", "arr": "부산", "available_only": False},
+    "ktx": {"dep": "서울", "arr": "부산", "include_no_seats": True},
+}
+
+
+class MemoryKeyring:
+    """Throwaway keyring so benchmarks never read or write real credentials."""
+
+    def __init__(self):
+        self._store = {}
+
+    def get_password(self, service, username):
+        return self._store.get((service, username))
+
+    def set_password(self, service, username, password):
+        self._store[(service, username)] = password
+
+    def delete_password(self, service, username):
+        self._store.pop((service, username), None)
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    if not samples:
+        return {p: 0.0 for p in points}
+    ordered = sorted(samples)
+    return {
+        p: ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+        for p in points
+    }
+
+
+def report(title, latencies, wall, cpu, polls, extra=None):
+    pct = percentiles(latencies)
+    print(f"== {title}")
+    print(f"  polls          {polls}")
+    print(f"  requests/sec   {polls / wall if wall else 0:.1f}")
+    print(
+        "  latency ms     "
+        + "  ".join(f"p{p}={v * 1000:.2f}" for p, v in pct.items())
+    )
+    print(f"  cpu/poll ms    {cpu / polls * 1000 if polls else 0:.3f}")
+    for key, value in (extra or {}).items():
+        print(f"  {key:<14s} {value}")
+
+
+def report_metrics(metrics):
+    print(f"  {'endpoint':<26s} {'calls':>6s} {'err':>4s} {'retry':>5s}"
+          f" {'p50 ms':>8s} {'p99 ms':>8s} {'max ms':>8s} {'in B':>8s} {'out B':>6s}")
+    for name, stats in sorted(metrics.snapshot().items()):
+        time_, size_in, size_out = stats["time"], stats["bytes_in"], stats["bytes_out"]
+        print(
+            f"  {name:<26s} {stats['count']:6d} {stats['errors']:4d} {stats['retries']:5d}"
+            f" {time_['p50'] * 1000:8.2f} {time_['p99'] * 1000:8.2f}"
+            f" {time_['max'] * 1000:8.2f} {size_in['mean']:8.0f} {size_out['mean']:6.0f}"
+        )
+
+
+def make_client(rail, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        if rail == "srt":
+            return SRT("1234567890", "password", **kwargs)
+        return Korail("1234567890", "password", **kwargs)
+
+
+def config_from_args(args, **overrides):
+    errors = {}
+    for item in args.error or []:
+        kind, _, probability = item.partition("=")
+        errors[kind] = float(probability)
+    values = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "n_trains": args.trains,
+        "extra_fields": args.extra_fields,
+        "n_bookings": args.bookings,
+        "errors": errors,
+        "stall": args.stall,
+        "seed": args.seed,
+    }
+    values.update(overrides)
+    return StandInConfig(**values)
+
+
+def bench_search(args):
+    with StandIn(config_from_args(args)) as server, redirect(server.url):
+        rail = make_client(args.rail)
+        params = SEARCH_PARAMS[args.rail]
+        for _ in range(args.warmup):
+            rail.search_train(**params)
+        metrics = rail.enable_metrics() if args.metrics else None
+
+        latencies, errors = [], 0
+        cpu_start, wall_start = time.thread_time(), time.perf_counter()
+        for _ in range(args.n):
+            start = time.perf_counter()
+            try:
+                rail.search_train(**params)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+
+        report(
+            f"{args.rail} search_train",
+            latencies,
+            wall,
+            cpu,
+            args.n,
+            {"errors": errors, "server": server.stats()["requests"]},
+        )
+        if metrics:
+            report_metrics(metrics)
+
+
+def bench_loop(args):
+    srtgo.settings = Settings(backend=MemoryKeyring())
+    scheduler = PollScheduler(
+        scale=args.interval / 4, minimum=0, max_delay=max(args.interval * 16, 0.01),
+        max_rate=args.max_rate,
+    )
+
+    config = config_from_args(args, open_after=args.open_after, open_index=args.pick)
+    with StandIn(config) as server, redirect(server.url):
+        rail = make_client(args.rail)
+        is_srt = args.rail == "srt"
+        params = dict(SEARCH_PARAMS[args.rail])
+        params["passengers"] = [Adult() if is_srt else AdultPassenger()]
+        profiler = (
+            LoopProfiler(cpu=args.profile_cpu, top=args.profile_top)
+            if args.profile or args.profile_cpu
+            else None
+        )
+
+        while True:  # the injected errors may hit the picking search too
+            try:
+                watch = WatchSet([rail.search_train(**params)[args.pick]])
+                break
+            except Exception:
+                rail.clear()
+        searches = server.stats()["searches"]
+
+        cpu_start, wall_start = time.thread_time(), time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            reservation = srtgo.reserve_loop(
+                rail,
+                "SRT" if is_srt else "KTX",
+                params,
+                watch,
+                params["passengers"],
+                SeatType.GENERAL_FIRST if is_srt else ReserveOption.GENERAL_FIRST,
+                max_attempts=args.open_after + 10,
+                profiler=profiler,
+                scheduler=scheduler,
+                deadline=args.deadline,
+            )
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+
+        polls = server.stats()["searches"] - searches
+        report(
+            f"{args.rail} reserve_loop",
+            [wall / polls] if polls else [],
+            wall,
+            cpu,
+            polls,
+            {
+                "reserved": reservation,
+                "server": server.stats()["requests"],
+                "scheduler": {k: scheduler.stats()[k] for k in ("signals", "reasons")},
+            },
+        )
+        if profiler:
+            print(profiler.summary())
+
+
+def add_common_arguments(parser):
+    parser.add_argument("--rail", choices=("srt", "ktx"), default="srt")
+    parser.add_argument("--latency", type=float, default=0.0, help="server latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency (s)")
+    parser.add_argument("--trains", type=int, default=10, help="trains per search")
+    parser.add_argument("--extra-fields", type=int, default=60, help="padding fields per row")
+    parser.add_argument("--bookings", type=int, default=0, help="existing bookings")
+    parser.add_argument(
+        "--error", action="append", help="inject errors, e.g. overload=0.1 or drop=0.01"
+    )
+    parser.add_argument("--stall", type=float, default=60.0, help="stalled reply delay (s)")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="srtgo stand-in benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="back-to-back search_train calls")
+    add_common_arguments(search)
+    search.add_argument("-n", type=int, default=200)
+    search.add_argument("--warmup", type=int, default=5)
+    search.add_argument("--metrics", action="store_true", help="print client metrics")
+    search.set_defaults(func=bench_search)
+
+    loop = commands.add_parser("loop", help="drive reserve_loop until a seat opens")
+    add_common_arguments(loop)
+    loop.add_argument("--open-after", type=int, default=50, help="polls before a seat opens")
+    loop.add_argument("--pick", type=int, default=0, help="train index to watch")
+    loop.add_argument("--interval", type=float, default=0.001, help="mean poll interval (s)")
+    loop.add_argument("--max-rate", type=float, help="cap on searches per second")
+    loop.add_argument(
+        "--deadline",
+        type=float,
+        default=srtgo.RESERVE_ITERATION_DEADLINE,
+        help="per-search deadline (s)",
+    )
+    loop.add_argument("--profile", action="store_true", help="print phase timings")
+    loop.add_argument("--profile-cpu", action="store_true", help="also run cProfile")
+    loop.add_argument("--profile-top", type=int, default=15)
+    loop.set_defaults(func=bench_loop)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""reserve_loop through connection flaps, with and without the circuit breaker.
+
+The stand-in drops every search for `--down` seconds, `--flaps` times, with
+`--up` seconds of normal service in between; a seat opens after the last
+outage. Each case runs `reserve_loop` until it books, once with a breaker
+that never opens (every poll goes out, as before) and once with the
+client's default `CircuitBreaker`. Reports the requests sent into the
+outages, how long after each outage the next search got through, and the
+breaker's counts:
+
+    python benchmarks/bench_breaker.py --rail srt --flaps 3 --down 3
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import threading
+import time
+
+from bench import SEARCH_PARAMS, MemoryKeyring, make_client
+from standin import StandIn, StandInConfig, redirect
+
+from srtgo import srtgo
+from srtgo.ktx import AdultPassenger, ReserveOption
+from srtgo.scheduler import PollScheduler
+from srtgo.settings import Settings
+from srtgo.srt import Adult, SeatType
+from srtgo.transport import CircuitBreaker
+from srtgo.watch import WatchSet
+
+NEVER_OPENS = CircuitBreaker(threshold=10**9)
+
+
+def flap(server, args, recoveries, done):
+    state = server.state
+    for _ in range(args.flaps):
+        time.sleep(args.up)
+        state.config.errors = {"drop": 1.0}
+        time.sleep(args.down)
+        state.config.errors = {}
+        end, served = time.perf_counter(), state.searches
+        while state.searches == served and not done.is_set():
+            time.sleep(0.001)
+        recoveries.append(time.perf_counter() - end)
+    state.config.open_after = state.searches
+
+
+def measure(rail_type, breaker, args):
+    srtgo.settings = Settings(backend=MemoryKeyring())
+    config = StandInConfig(n_trains=args.trains, open_after=10**9)
+    with StandIn(config) as server, redirect(server.url):
+        rail = make_client(rail_type, **({"breaker": breaker} if breaker else {}))
+        is_srt = rail_type == "srt"
+        params = dict(SEARCH_PARAMS[rail_type])
+        params["passengers"] = [Adult() if is_srt else AdultPassenger()]
+        watch = WatchSet([rail.search_train(**params)[0]])
+        scheduler = PollScheduler(
+            scale=args.interval / 4, minimum=0, max_delay=args.interval * 16,
+            max_rate=None,
+        )
+
+        recoveries, done = [], threading.Event()
+        flapper = threading.Thread(target=flap, args=(server, args, recoveries, done))
+        start = time.perf_counter()
+        flapper.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                reservation = srtgo.reserve_loop(
+                    rail,
+                    "SRT" if is_srt else "KTX",
+                    params,
+                    watch,
+                    params["passengers"],
+                    SeatType.GENERAL_FIRST if is_srt else ReserveOption.GENERAL_FIRST,
+                    max_attempts=10**6,
+                    scheduler=scheduler,
+                )
+        finally:
+            done.set()
+            flapper.join()
+        wall = time.perf_counter() - start
+        dropped = server.stats()["requests"].get("dropped", 0)
+    return reservation is not None, wall, dropped, recoveries, rail.breaker.snapshot()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rail", choices=("srt", "ktx"), default="srt")
+    parser.add_argument("--flaps", type=int, default=3, help="outages")
+    parser.add_argument("--down", type=float, default=3.0, help="outage length (s)")
+    parser.add_argument("--up", type=float, default=1.0, help="uptime between (s)")
+    parser.add_argument("--interval", type=float, default=0.05, help="poll interval (s)")
+    parser.add_argument("--trains", type=int, default=10, help="trains per search")
+    args = parser.parse_args(argv)
+
+    outage = args.flaps * args.down
+    print(
+        f"{'breaker':<8s} {'booked':>6s} {'wall s':>7s} {'dropped':>8s} {'/s down':>8s}"
+        f" {'recover ms':>17s}  circuits"
+    )
+    for name, breaker in (("off", NEVER_OPENS), ("default", None)):
+        booked, wall, dropped, recoveries, circuits = measure(args.rail, breaker, args)
+        recover = (
+            f"{statistics.mean(recoveries) * 1000:7.0f} (max {max(recoveries) * 1000:4.0f})"
+            if recoveries
+            else "-"
+        )
+        circuits = {
+            host: {k: v for k, v in c.items() if k in ("opened", "probes", "rejected")}
+            for host, c in circuits.items()
+        }
+        print(
+            f"{name:<8s} {str(booked):>6s} {wall:7.2f} {dropped:8d}"
+            f" {dropped / outage:8.1f} {recover:>17s}  {circuits or ''}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Search + availability check per poll: full rescan vs `ChangeTracker`.
+
+Polls the stand-in with `--trains` trains per result and checks `--watch`
+of them the way `reserve_loop` does, once rebuilding and rescanning every
+result and once through a `ChangeTracker`, where unchanged trains are reused.
+Either way every watched train is checked. A seat opens halfway through.
+Reports client thread CPU per poll, how often a watched train was found
+open, and what the tracker reused:
+
+    python benchmarks/bench_changes.py --trains 40 --watch 10 -n 200
+"""
+
+import argparse
+import statistics
+import time
+
+from bench import SEARCH_PARAMS, make_client
+from standin import StandIn, StandInConfig, redirect
+
+from srtgo.changes import ChangeTracker
+from srtgo.ktx import ReserveOption
+from srtgo.srt import SeatType
+from srtgo.srtgo import _is_seat_available
+
+SEAT_TYPE = {"srt": SeatType.GENERAL_FIRST, "ktx": ReserveOption.GENERAL_FIRST}
+
+
+def measure(rail_type, tracked, args):
+    config = StandInConfig(n_trains=args.trains, open_after=args.n // 2)
+    with StandIn(config) as server, redirect(server.url):
+        rail = make_client(rail_type)
+        query = rail.prepare_search(**SEARCH_PARAMS[rail_type])
+        changes = ChangeTracker() if tracked else None
+        seat_type, label = SEAT_TYPE[rail_type], rail_type.upper()
+        watch = range(args.watch)
+        samples, opened_total = [], 0
+        for _ in range(args.n + 1):
+            start = time.thread_time()
+            trains = rail.search(query, changes)
+            found = [
+                i for i in watch if _is_seat_available(trains[i], seat_type, label)
+            ]
+            samples.append(time.thread_time() - start)
+            opened_total += len(found)
+    return statistics.mean(samples[1:]), opened_total, (
+        changes.stats() if tracked else None
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trains", type=int, default=40, help="trains per result")
+    parser.add_argument("--watch", type=int, default=10, help="trains checked")
+    parser.add_argument("-n", type=int, default=200, help="polls per case")
+    args = parser.parse_args(argv)
+
+    print(f"{'rail':<5s} {'check':<9s} {'cpu/poll':>10s} {'hits':>5s}  tracker")
+    for rail_type in ("srt", "ktx"):
+        for tracked in (False, True):
+            cpu, hits, stats = measure(rail_type, tracked, args)
+            print(
+                f"{rail_type:<5s} {'tracked' if tracked else 'rescan':<9s}"
+                f" {cpu * 1000:7.3f} ms {hits:5d}  {stats or ''}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Response decoding cost per payload and JSON backend.
+
+Records search and ticket-list bodies from the stand-in (or loads `*.json`
+bodies captured from the real servers with `--payloads DIR`), then times the
+old path (decode to `str`, `json.loads`, copy) against parsing the bytes with
+each installed `srtgo.transport` JSON backend:
+
+    python benchmarks/bench_decode.py --trains 10 --bookings 10
+    python benchmarks/bench_decode.py --save payloads/   # keep the recordings
+"""
+
+import argparse
+import json
+import pathlib
+import time
+from types import MappingProxyType
+
+from bench import make_client
+from standin import StandIn, StandInConfig, redirect
+
+from srtgo import transport
+
+
+def record(args):
+    config = StandInConfig(
+        n_trains=args.trains, extra_fields=args.extra_fields, n_bookings=args.bookings
+    )
+    payloads = {}
+    with StandIn(config) as server, redirect(server.url):
+        for rail, calls in (
+            ("srt", (
+                ("search", lambda c: c.search_train("수서", "부산", available_only=False)),
+                ("reservations", lambda c: c.get_reservations(summary=True)),
+            )),
+            ("ktx", (
+                ("search", lambda c: c.search_train("서울", "부산", include_no_seats=True)),
+                ("tickets", lambda c: c.tickets()),
+            )),
+        ):
+            client = make_client(rail, max_workers=1)
+            for name, call in calls:
+                bodies = []
+                client._log_response = lambda r: bodies.append(r.content)
+                call(client)
+                payloads[f"{rail}_{name}"] = bodies[0]
+    return payloads
+
+
+def legacy(content):
+    data = json.loads(content.decode("utf-8"))
+    return data.copy()
+
+
+def current(content):
+    return MappingProxyType(transport.loads(content))
+
+
+def measure(fn, content, repeat):
+    fn(content)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(content)
+    return (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trains", type=int, default=10)
+    parser.add_argument("--extra-fields", type=int, default=60)
+    parser.add_argument("--bookings", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--payloads", type=pathlib.Path, help="load recorded *.json bodies")
+    parser.add_argument("--save", type=pathlib.Path, help="write the recorded bodies here")
+    args = parser.parse_args(argv)
+
+    if args.payloads:
+        payloads = {p.stem: p.read_bytes() for p in sorted(args.payloads.glob("*.json"))}
+    else:
+        payloads = record(args)
+    if args.save:
+        args.save.mkdir(parents=True, exist_ok=True)
+        for name, content in payloads.items():
+            (args.save / f"{name}.json").write_bytes(content)
+
+    transport.loads(b"{}")
+    default = transport.JSON_BACKEND
+    backends = []
+    for name in transport.JSON_BACKENDS:
+        try:
+            transport.set_json_backend(name)
+        except ImportError:
+            continue
+        backends.append(name)
+
+    print(f"{'payload':<18s}  {'bytes':>7s}  {'str+copy':>10s}" + "".join(
+        f"  {f'bytes/{name}':>12s}" for name in backends
+    ))
+    for name, content in payloads.items():
+        row = f"{name:<18s}  {len(content):7d}  {measure(legacy, content, args.repeat) * 1e6:7.1f} us"
+        for backend in backends:
+            transport.set_json_backend(backend)
+            row += f"  {measure(current, content, args.repeat) * 1e6:9.1f} us"
+        print(row)
+    transport.set_json_backend(default)
+    print(f"default backend: {default}")
+
+
+if __name__ == "__main__":
+    main()
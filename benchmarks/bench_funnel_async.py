@@ -0,0 +1,80 @@
+"""NetFunnel queue wait: blocking vs overlapped, and how fast a wait cancels.
+
+Each round passes the stand-in's queue (`--funnel-wait` checks, one second
+apart) and does `--work` seconds of other I/O-bound work, either one after
+the other with `run()` or concurrently with `run_async()`. Cancel latency is
+the time between setting the `cancel` event and `run()` returning:
+
+    python benchmarks/bench_funnel_async.py --funnel-wait 3 --work 2
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+from standin import StandIn, StandInConfig, redirect
+
+from srtgo.netfunnel import NetFunnelCancelled
+from srtgo.srt import NetFunnelHelper
+
+
+def sequential(helper, args):
+    start = time.perf_counter()
+    helper.clear()
+    helper.run()
+    time.sleep(args.work)
+    return time.perf_counter() - start
+
+
+def overlapped(helper, args):
+    async def main():
+        helper.clear()
+        await asyncio.gather(helper.run_async(), asyncio.sleep(args.work))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return time.perf_counter() - start
+
+
+def cancel_latency(helper, args):
+    helper.clear()
+    cancel = threading.Event()
+    cancelled_at = []
+
+    def fire():
+        cancelled_at.append(time.perf_counter())
+        cancel.set()
+
+    threading.Timer(args.cancel_after, fire).start()
+    try:
+        helper.run(cancel=cancel)
+    except NetFunnelCancelled:
+        return time.perf_counter() - cancelled_at[0]
+    return float("nan")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--funnel-wait", type=int, default=3, help="queue checks per pass")
+    parser.add_argument("--work", type=float, default=2.0, help="seconds of other work")
+    parser.add_argument("--cancel-after", type=float, default=1.5)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    config = StandInConfig(funnel_wait=args.funnel_wait)
+    with StandIn(config) as server, redirect(server.url):
+        helper = NetFunnelHelper()
+        for label, fn in (("sequential", sequential), ("overlapped", overlapped)):
+            elapsed = statistics.median(fn(helper, args) for _ in range(args.repeat))
+            print(f"{label:<12s} {elapsed * 1000:8.1f} ms")
+        latency = statistics.median(
+            cancel_latency(helper, args) for _ in range(args.repeat)
+        )
+        print(f"{'cancel':<12s} {latency * 1000:8.1f} ms")
+        helper.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""NetFunnel key lifetime: fixed TTL vs learned from rejections, on the stand-in.
+
+The stand-in refuses keys older than `--server-ttl`, while the client starts
+out trusting them for `--initial-ttl`. A watch of `--polls` searches spaced
+`--wait` apart then counts searches refused for a stale key and the funnel
+passes needed, once with the TTL fixed and once learning it:
+
+    python benchmarks/bench_funnel_ttl.py --server-ttl 3 --initial-ttl 4.8
+"""
+
+import argparse
+import time
+
+from bench import SEARCH_PARAMS, make_client
+from standin import StandIn, StandInConfig, redirect
+
+from srtgo.netfunnel import KeyLifetime
+from srtgo.srt import NETFUNNEL_REJECTED, SRTResponseError
+
+
+class FixedLifetime(KeyLifetime):
+    # Before learning: a refused key is dropped, the TTL stays put
+    def reject(self):
+        if self.age() is not None:
+            self.rejected += 1
+        self.drop()
+
+
+def watch(learn, args):
+    config = StandInConfig(funnel_key_ttl=args.server_ttl)
+    with StandIn(config) as server, redirect(server.url):
+        rail = make_client("srt")
+        lifetime = (KeyLifetime if learn else FixedLifetime)(
+            args.initial_ttl, min_ttl=0.5, step=args.step
+        )
+        rail._netfunnel.lifetime = lifetime
+        refused = 0
+        start = time.perf_counter()
+        for _ in range(args.polls):
+            try:
+                rail.search_train(**SEARCH_PARAMS["srt"])
+            except SRTResponseError as ex:
+                if NETFUNNEL_REJECTED not in ex.msg:
+                    raise
+                refused += 1
+            time.sleep(args.wait)
+        elapsed = time.perf_counter() - start
+        passes = rail.netfunnel_stats()["runs"]
+    return refused, passes, lifetime.ttl, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server-ttl", type=float, default=3.0)
+    parser.add_argument("--initial-ttl", type=float, default=4.8)
+    parser.add_argument("--step", type=float, default=0.2, help="TTL probe step")
+    parser.add_argument("--wait", type=float, default=0.25, help="seconds between searches")
+    parser.add_argument("--polls", type=int, default=80)
+    args = parser.parse_args(argv)
+
+    print(f"{'ttl':<8s} {'refused':>8s} {'passes':>7s} {'final ttl':>10s} {'time':>8s}")
+    for learn in (False, True):
+        refused, passes, ttl, elapsed = watch(learn, args)
+        print(
+            f"{'learned' if learn else 'fixed':<8s} {refused:8d} {passes:7d}"
+            f" {ttl:9.2f}s {elapsed:7.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
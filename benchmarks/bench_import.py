@@ -0,0 +1,97 @@
+"""Import-time benchmark for the `srtgo` entry point.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+reports the median cumulative import time plus the slowest dependencies.
+Exits non-zero when a heavy dependency is loaded eagerly or the median goes
+over `--budget-ms`, so it can gate regressions in CI:
+
+    python benchmarks/bench_import.py --budget-ms 150
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Dependencies that must stay off the import path of the listed modules.
+HEAVY_MODULES = ("telegram", "inquirer", "curl_cffi", "requests", "Crypto", "keyring")
+MODULES = ("srtgo.srtgo", "srtgo.srt", "srtgo.ktx")
+
+EAGER_CHECK = """
+import sys, importlib
+importlib.import_module({module!r})
+loaded = [
+    name for name in {heavy!r}
+    if name in sys.modules and type(sys.modules[name]).__name__ != "_LazyModule"
+]
+print(",".join(loaded))
+"""
+
+
+def import_times(module):
+    """Return {name: cumulative_us} for `module` and everything it pulled in.
+
+    Interpreter start-up imports (`site`, `encodings`...) are left out.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = len(name) - len(name.lstrip())
+        rows.append((depth, name.strip(), int(cumulative)))
+
+    # -X importtime lists children before their parent, so the subtree of
+    # `module` is the run of deeper rows right above its own row.
+    end = next(i for i, row in enumerate(rows) if row[1] == module)
+    start = end
+    while start > 0 and rows[start - 1][0] > rows[end][0]:
+        start -= 1
+    return {name: cumulative for _, name, cumulative in rows[start : end + 1]}
+
+
+def eager_heavy_modules(module):
+    result = subprocess.run(
+        [sys.executable, "-c", EAGER_CHECK.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return [name for name in result.stdout.strip().split(",") if name]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="srtgo import-time benchmark")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in MODULES:
+        runs = [import_times(module) for _ in range(args.runs)]
+        total = statistics.median(run[module] for run in runs) / 1000
+        print(f"== {module}: {total:.1f} ms (median of {args.runs})")
+
+        slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)
+        for name, cumulative in slowest[1 : args.top + 1]:
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+        if eager := eager_heavy_modules(module):
+            print(f"  FAIL: loaded eagerly: {', '.join(eager)}")
+            failed = True
+        if args.budget_ms is not None and total > args.budget_ms:
+            print(f"  FAIL: over budget ({args.budget_ms:.0f} ms)")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Reservation listing latency against the number of bookings.
+
+Times `SRT.get_reservations`, `Korail.reservations` and `Korail.tickets`
+with sequential detail lookups (`max_workers=1`) and with the worker pool,
+plus the summary listings that skip detail lookups altogether:
+
+    python benchmarks/bench_listing.py --latency 0.02 --workers 4
+"""
+
+import argparse
+import statistics
+import time
+
+from bench import make_client
+from standin import StandIn, StandInConfig, redirect
+
+CALLS = {
+    "srt get_reservations": ("srt", lambda rail: rail.get_reservations()),
+    "srt get_reservations(summary=True)": (
+        "srt", lambda rail: rail.get_reservations(summary=True)
+    ),
+    "ktx reservations": ("ktx", lambda rail: rail.reservations()),
+    "ktx reservations(summary=True)": (
+        "ktx", lambda rail: rail.reservations(summary=True)
+    ),
+    "ktx tickets": ("ktx", lambda rail: rail.tickets()),
+}
+
+
+def measure(name, bookings, workers, args):
+    rail_type, call = CALLS[name]
+    config = StandInConfig(latency=args.latency, n_bookings=bookings)
+    with StandIn(config) as server, redirect(server.url):
+        rail = make_client(rail_type, max_workers=workers)
+        call(rail)  # warm up connections on every worker
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            call(rail)
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.02, help="server latency (s)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--bookings", type=int, nargs="+", default=[2, 10, 20, 50])
+    args = parser.parse_args(argv)
+
+    for name in CALLS:
+        print(f"== {name}")
+        print(f"  {'bookings':>8s}  {'sequential':>12s}  {f'{args.workers} workers':>12s}")
+        for bookings in args.bookings:
+            sequential = measure(name, bookings, 1, args)
+            pooled = measure(name, bookings, args.workers, args)
+            print(
+                f"  {bookings:8d}  {sequential * 1000:9.1f} ms  {pooled * 1000:9.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Time and allocations per parsed search response.
+
+Parses a stand-in search response (`json.loads` plus one model per row) into
+the slot-based `SRTTrain` / ktx `Train`, and into an eager stand-in that
+copies every field into an instance `__dict__` the way the models used to.
+Each train's availability is then checked as the reservation loop does:
+
+    python benchmarks/bench_models.py --trains 10 --extra-fields 60
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from standin import StandInConfig, StandInState
+
+from srtgo import ktx, srt
+
+
+def eager(model):
+    """`model`, but with every field decoded up front into an instance `__dict__`."""
+    fields = model.fields()
+
+    class Eager(model):
+        def __init__(self, data):
+            super().__init__(data)
+            for name, field in fields.items():
+                self.__dict__[name] = field.__get__(self)
+
+    Eager.__name__ = f"Eager{model.__name__}"
+    return Eager
+
+
+RAILS = {
+    "srt": (
+        srt.SRTTrain,
+        lambda state: {"outDataSets": {"dsOutput1": state.search_rows("srt", {})}},
+        lambda j: j["outDataSets"]["dsOutput1"],
+        lambda train: train.seat_available() or train.reserve_wait_possible_code == 9,
+    ),
+    "ktx": (
+        ktx.Train,
+        lambda state: {"trn_infos": {"trn_info": state.search_rows("ktx", {})}},
+        lambda j: j["trn_infos"]["trn_info"],
+        lambda train: train.has_seat() or train.wait_reserve_flag == 9,
+    ),
+}
+
+
+def measure(model, body, rows_of, available, repeat):
+    def parse():
+        trains = [model(row) for row in rows_of(json.loads(body))]
+        return [train for train in trains if available(train)]
+
+    parse()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse()
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    trains = [model(row) for row in rows_of(json.loads(body))]
+    parsed, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del trains
+    return elapsed, parsed
+
+
+def model_bytes(model, rows):
+    tracemalloc.start()
+    trains = [model(row) for row in rows]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del trains
+    return size / len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trains", type=int, default=10)
+    parser.add_argument("--extra-fields", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    state = StandInState(
+        StandInConfig(n_trains=args.trains, extra_fields=args.extra_fields)
+    )
+    for rail, (model, response, rows_of, available) in RAILS.items():
+        body = json.dumps(response(state))
+        rows = rows_of(json.loads(body))
+        print(f"== {rail} ({args.trains} trains, {len(body)} bytes)")
+        print(f"  {'model':<16s}  {'parse+check':>12s}  {'retained KiB':>12s}  {'model B/train':>13s}")
+        for cls in (eager(model), model):
+            elapsed, parsed = measure(cls, body, rows_of, available, args.repeat)
+            print(
+                f"  {cls.__name__:<16s}  {elapsed * 1e6:9.1f} us"
+                f"  {parsed / 1024:12.1f}  {model_bytes(cls, rows):13.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
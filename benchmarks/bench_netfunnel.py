@@ -0,0 +1,92 @@
+"""NetFunnel passes through redirect hosts: one shared session vs per-host pool.
+
+The stand-in points each NetFunnel step at the next of `--hosts` loopback
+addresses and delays the first reply on every new connection by
+`--connect-latency`. Each pass clears the key and goes through the queue
+(`--funnel-wait` checks, one second apart), reporting the network and queue
+time split from `NetFunnelHelper.stats()` and the new connections opened:
+
+    python benchmarks/bench_netfunnel.py --hosts 6 --funnel-wait 6 --passes 2
+"""
+
+import argparse
+import contextlib
+import io
+
+from standin import StandIn, StandInConfig, redirect
+
+from srtgo import transport
+from srtgo.srt import NetFunnelHelper
+
+
+def shared_session(helper):
+    # Before per-host pooling: every host went through one session
+    session = helper._session_for(helper.NETFUNNEL_HOST)
+    helper._session_for = lambda host: session
+
+
+def measure(pooled, args):
+    config = StandInConfig(
+        funnel_wait=args.funnel_wait,
+        funnel_hosts=args.hosts,
+        connect_latency=args.connect_latency,
+    )
+    with StandIn(config) as server, redirect(server.url):
+        helper = NetFunnelHelper()
+        if not pooled:
+            shared_session(helper)
+        first = None
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(args.passes):
+                helper.clear()
+                helper.run()
+                if first is None:
+                    first = dict(helper.last_run)
+        helper.close()
+        stats = helper.stats()
+        new = sum(c["new"] for c in helper.connections.snapshot().values())
+    later = args.passes - 1
+    return {
+        "first net": first["network"],
+        "later net": (stats["network"] - first["network"]) / later if later else 0.0,
+        "queue": stats["queue"] / args.passes,
+        "new conns": new,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=6, help="funnel redirect hosts")
+    parser.add_argument("--funnel-wait", type=int, default=6, help="queue checks per pass")
+    parser.add_argument("--connect-latency", type=float, default=0.05)
+    parser.add_argument("--passes", type=int, default=2)
+    parser.add_argument(
+        "--backend", choices=("curl_cffi", "requests", "both"), default="both"
+    )
+    args = parser.parse_args(argv)
+
+    backends = ("curl_cffi", "requests") if args.backend == "both" else (args.backend,)
+    has_curl_cffi = transport.HAS_CURL_CFFI
+    keys = ("first net", "later net", "queue", "new conns")
+    print(f"{'backend':<10s} {'sessions':<9s}" + "".join(f" {k:>10s}" for k in keys))
+    try:
+        for backend in backends:
+            if backend == "curl_cffi" and not has_curl_cffi:
+                continue
+            transport.HAS_CURL_CFFI = backend == "curl_cffi"
+            for pooled in (False, True):
+                result = measure(pooled, args)
+                print(
+                    f"{backend:<10s} {'per-host' if pooled else 'shared':<9s}"
+                    + "".join(
+                        f" {result[k] * 1000:7.1f} ms" for k in keys[:3]
+                    )
+                    + f" {result['new conns']:10d}"
+                )
+    finally:
+        transport.HAS_CURL_CFFI = has_curl_cffi
+    print("(net and queue are per pass; queue is the wait between queue checks)")
+
+
+if __name__ == "__main__":
+    main()
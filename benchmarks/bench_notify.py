@@ -0,0 +1,87 @@
+"""Caller-side cost of Telegram notifications against the stand-in Bot API.
+
+Compares the old pattern (a new `telegram.Bot` plus `asyncio.run` per
+message) with `srtgo.notify.TelegramNotifier`, and checks that bursts are
+coalesced and everything queued is delivered on close:
+
+    python benchmarks/bench_notify.py --messages 20 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import time
+
+import telegram
+
+from bench import percentiles
+from standin import StandIn, StandInConfig
+
+from srtgo.notify import TelegramNotifier
+
+TOKEN = "123456:stand-in"
+CHAT_ID = "42"
+
+
+def legacy_send(base_url, text):
+    async def send():
+        bot = telegram.Bot(token=TOKEN, base_url=base_url)
+        async with bot:
+            await bot.send_message(chat_id=CHAT_ID, text=text)
+
+    asyncio.run(send())
+
+
+def run(args):
+    config = StandInConfig(latency_by_endpoint={
+        "telegram.getMe": args.latency,
+        "telegram.sendMessage": args.latency,
+    })
+    with StandIn(config) as server:
+        base_url = f"{server.url}/bot"
+
+        legacy = []
+        for i in range(args.messages):
+            start = time.perf_counter()
+            legacy_send(base_url, f"legacy {i}")
+            legacy.append(time.perf_counter() - start)
+        legacy_calls = server.stats()["requests"].get("telegram.sendMessage", 0)
+
+        notifier = TelegramNotifier(TOKEN, CHAT_ID, base_url=base_url)
+        queued = []
+        for i in range(args.messages):
+            start = time.perf_counter()
+            notifier.send(f"queued {i}")
+            queued.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        notifier.close()
+        flush = time.perf_counter() - start
+        calls = server.stats()["requests"].get("telegram.sendMessage", 0) - legacy_calls
+
+        delivered = sum(
+            text.count("queued ") for text in server.state.telegram_messages
+        )
+
+    for title, samples, api_calls in (
+        ("new Bot + asyncio.run per message", legacy, legacy_calls),
+        ("TelegramNotifier.send", queued, calls),
+    ):
+        pct = percentiles(samples)
+        print(f"== {title}")
+        print(
+            "  caller ms      "
+            + "  ".join(f"p{p}={v * 1000:.3f}" for p, v in pct.items())
+        )
+        print(f"  sendMessage    {api_calls}")
+    print(f"  flush on close {flush * 1000:.1f} ms, delivered {delivered}/{args.messages}")
+    print(f"  dropped={notifier.dropped} failed={notifier.failed}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="Bot API latency (s)")
+    run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
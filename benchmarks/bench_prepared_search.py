@@ -0,0 +1,83 @@
+"""Client CPU per search: search_train(**params) vs a prepared query.
+
+`search_train` validates and encodes the whole query on every call, which is
+what each poll of `reserve()` used to do; `search(query)` sends a query from
+`prepare_search` with only the volatile fields spliced in. Two measurements
+per rail, both in thread CPU of the calling thread:
+
+* build: producing the request body alone, no I/O
+* poll: a full search against the stand-in (body, request, parse, filter)
+
+    python benchmarks/bench_prepared_search.py -n 300
+"""
+
+import argparse
+import statistics
+import time
+
+from bench import SEARCH_PARAMS, make_client
+from standin import StandIn, StandInConfig, redirect
+
+from srtgo.ktx import Korail
+from srtgo.srt import SRT
+
+KEY = "E3E70682C2094CAC629F6FBED82C07CD"
+
+
+def build_cost(rail_type, prepared, n):
+    params = SEARCH_PARAMS[rail_type]
+    if rail_type == "srt":
+        query = SRT.prepare_search(**params)
+        if prepared:
+            build = lambda: query.encode(KEY)
+        else:
+            build = lambda: SRT.prepare_search(**params).encode(KEY)
+    else:
+        query = Korail.prepare_search(**params)
+        if prepared:
+            build = lambda: query.encode("AD", "240531001", "1234567890")
+        else:
+            build = lambda: Korail.prepare_search(**params).encode(
+                "AD", "240531001", "1234567890"
+            )
+    start = time.thread_time()
+    for _ in range(n):
+        build()
+    return (time.thread_time() - start) / n
+
+
+def poll_cost(rail_type, prepared, n):
+    params = SEARCH_PARAMS[rail_type]
+    with StandIn(StandInConfig()) as server, redirect(server.url):
+        rail = make_client(rail_type)
+        query = rail.prepare_search(**params)
+        search = (lambda: rail.search(query)) if prepared else (
+            lambda: rail.search_train(**params)
+        )
+        search()
+        samples = []
+        for _ in range(n):
+            start = time.thread_time()
+            search()
+            samples.append(time.thread_time() - start)
+    return statistics.mean(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=300, help="searches per case")
+    args = parser.parse_args(argv)
+
+    print(f"{'rail':<5s} {'query':<9s} {'build us':>9s} {'poll ms':>8s}")
+    for rail_type in ("srt", "ktx"):
+        for prepared in (False, True):
+            build = build_cost(rail_type, prepared, args.n * 20)
+            poll = poll_cost(rail_type, prepared, args.n)
+            print(
+                f"{rail_type:<5s} {'prepared' if prepared else 'per call':<9s}"
+                f" {build * 1e6:9.1f} {poll * 1000:8.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
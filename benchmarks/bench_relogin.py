@@ -0,0 +1,80 @@
+"""Recovery time after a forced session expiry on the stand-in.
+
+Expires every server-side session, lets one search fail, then recovers the
+way `reserve_loop` used to (a brand-new client) and with the in-place
+`relogin()`, timing until the next search succeeds and counting the requests
+and new TCP connections it took:
+
+    python benchmarks/bench_relogin.py --latency 0.02 --funnel-wait 1
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import time
+
+from bench import SEARCH_PARAMS, make_client
+from standin import StandIn, StandInConfig, redirect
+
+
+def rebuild(rail_type, rail):
+    return make_client(rail_type)
+
+
+def relogin(rail_type, rail):
+    with contextlib.redirect_stdout(io.StringIO()):
+        rail.relogin()
+    return rail
+
+
+def measure(rail_type, recover, args):
+    config = StandInConfig(latency=args.latency, funnel_wait=args.funnel_wait)
+    with StandIn(config) as server, redirect(server.url):
+        rail = make_client(rail_type)
+        params = SEARCH_PARAMS[rail_type]
+        rail.search_train(**params)
+
+        samples, requests, connections = [], [], []
+        for _ in range(args.repeat):
+            server.expire_sessions()
+            try:
+                rail.search_train(**params)
+            except Exception:
+                pass
+            else:
+                raise RuntimeError("search succeeded on an expired session")
+
+            before = server.stats()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                rail = recover(rail_type, rail)
+                rail.search_train(**params)
+            samples.append(time.perf_counter() - start)
+            after = server.stats()
+            requests.append(
+                sum(after["requests"].values()) - sum(before["requests"].values())
+            )
+            connections.append(after["connections"] - before["connections"])
+    return statistics.median(samples), statistics.mean(requests), statistics.mean(connections)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.02, help="server latency (s)")
+    parser.add_argument("--funnel-wait", type=int, default=0, help="NetFunnel queue polls")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'rail':<5s} {'recovery':<12s} {'time':>10s} {'requests':>9s} {'new conns':>10s}")
+    for rail_type in ("srt", "ktx"):
+        for name, recover in (("new client", rebuild), ("relogin()", relogin)):
+            elapsed, requests, connections = measure(rail_type, recover, args)
+            print(
+                f"{rail_type:<5s} {name:<12s} {elapsed * 1000:7.1f} ms"
+                f" {requests:9.1f} {connections:10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
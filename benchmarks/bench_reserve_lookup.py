@@ -0,0 +1,78 @@
+"""Time from reserve POST to a confirmed `SRTReservation`.
+
+For 1, 10 and 50 existing bookings, compares three ways of finding the new
+booking:
+
+* full scan: `get_reservations()` with every booking's tickets, as
+  `SRT._reserve` did before the targeted lookup (N+3 requests)
+* summary scan: `get_reservations(summary=True)`, which `SRT._reserve` still
+  falls back to when the reserve response lacks details
+* targeted: the reserve response + one `ticket_info`
+
+    python benchmarks/bench_reserve_lookup.py --latency 0.01
+"""
+
+import argparse
+import statistics
+import time
+
+from bench import make_client
+from standin import StandIn, StandInConfig, redirect
+
+LOOKUP_ENDPOINTS = ("srt.reserve", "srt.tickets", "srt.ticket_info")
+MODES = ("full scan", "summary scan", "targeted")
+
+
+def full_scan(srt):
+    def find(reservation_number):
+        for reservation in srt.get_reservations():
+            if reservation.reservation_number == reservation_number:
+                return reservation
+        raise LookupError(reservation_number)
+
+    return find
+
+
+def measure(bookings, mode, args):
+    config = StandInConfig(
+        latency=args.latency,
+        n_bookings=bookings,
+        reserve_details=mode == "targeted",
+    )
+    with StandIn(config) as server, redirect(server.url):
+        srt = make_client("srt")
+        if mode == "full scan":
+            srt._find_reservation = full_scan(srt)
+        train = srt.search_train("수서", "부산", available_only=False)[0]
+        before = server.stats()["requests"]
+
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            reservation = srt._reserve("1101", train)
+            samples.append(time.perf_counter() - start)
+            srt.cancel(reservation)
+
+        after = server.stats()["requests"]
+    calls = sum(after.get(e, 0) - before.get(e, 0) for e in LOOKUP_ENDPOINTS)
+    return statistics.median(samples), calls / args.repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.01, help="server latency (s)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--bookings", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args(argv)
+
+    print(f"{'bookings':>8s}" + "".join(f"  {mode:>18s}" for mode in MODES))
+    for bookings in args.bookings:
+        line = f"{bookings:8d}"
+        for mode in MODES:
+            median, calls = measure(bookings, mode, args)
+            line += f"  {median * 1000:8.1f} ms {calls:4.0f} req"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Fixed gamma polling vs `PollScheduler` under simulated congestion.
+
+Runs entirely on a `SimulatedClock`, so results are deterministic for a seed.
+The server is overloaded between `--congestion START END` (each search gets
+an overload reply with probability `--overload`), and a client counts as
+locked out for every `--lockout-window` seconds in which it sent more than
+`--lockout-limit` searches during congestion. A seat opens at `--open`:
+
+    python benchmarks/bench_scheduler.py --seeds 20
+"""
+
+import argparse
+import random
+import statistics
+
+from srtgo.scheduler import OK, OVERLOAD, PollScheduler, SimulatedClock
+
+POLICIES = {
+    # What `_sleep()` used to do: same gamma interval whatever happens
+    "fixed gamma": dict(backoff=1.0, max_rate=None),
+    "adaptive": dict(),
+}
+
+
+def simulate(policy, seed, args):
+    clock = SimulatedClock()
+    rng = random.Random(seed)
+    scheduler = PollScheduler(
+        clock=clock, sleep=clock.sleep, rng=random.Random(seed), **POLICIES[policy]
+    )
+    start, end = args.congestion
+    requests = congested = overloads = 0
+    windows = {}
+    while True:
+        now = clock()
+        if now >= args.open:
+            return {
+                "requests": requests,
+                "congested": congested,
+                "overloads": overloads,
+                "lockouts": sum(n > args.lockout_limit for n in windows.values()),
+                "detect": now - args.open,
+            }
+        requests += 1
+        clock.sleep(args.rtt)
+        if start <= now < end:
+            congested += 1
+            window = int(now // args.lockout_window)
+            windows[window] = windows.get(window, 0) + 1
+            if rng.random() < args.overload:
+                overloads += 1
+                scheduler.record(OVERLOAD)
+                scheduler.wait()
+                continue
+        scheduler.record(OK)
+        scheduler.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seeds", type=int, default=20)
+    parser.add_argument("--congestion", type=float, nargs=2, default=(60, 240))
+    parser.add_argument("--overload", type=float, default=0.8)
+    parser.add_argument("--open", type=float, default=250, help="seat opens at (s)")
+    parser.add_argument("--rtt", type=float, default=0.1, help="search round trip (s)")
+    parser.add_argument("--lockout-window", type=float, default=10)
+    parser.add_argument("--lockout-limit", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    keys = ("requests", "congested", "overloads", "lockouts", "detect")
+    print(f"{'policy':<12s}" + "".join(f"  {key:>10s}" for key in keys))
+    for policy in POLICIES:
+        runs = [simulate(policy, seed, args) for seed in range(args.seeds)]
+        print(
+            f"{policy:<12s}"
+            + "".join(
+                f"  {statistics.mean(run[key] for run in runs):10.1f}" for key in keys
+            )
+        )
+    print(f"(means over {args.seeds} seeds; detect = seconds from seat opening to next search)")
+
+
+if __name__ == "__main__":
+    main()
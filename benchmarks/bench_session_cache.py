@@ -0,0 +1,71 @@
+"""Startup cost with and without a saved login session, on the stand-in.
+
+Builds a fresh client the way `srtgo` does on every run and times it until
+the first search succeeds. "cold" always logs in; "resumed" reuses a session
+from a `SessionCache`; "expired" has a cached session the server no longer
+accepts, so it pays for a refused first request and the login:
+
+    python benchmarks/bench_session_cache.py --latency 0.05
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from bench import SEARCH_PARAMS, make_client
+from standin import StandIn, StandInConfig, redirect
+
+from srtgo.session_cache import SessionCache
+
+
+def measure(rail_type, mode, args):
+    config = StandInConfig(latency=args.latency)
+    with tempfile.TemporaryDirectory() as tmp, StandIn(config) as server, redirect(server.url):
+        cache = SessionCache(SessionCache.new_key(), Path(tmp) / "sessions.bin")
+        params = SEARCH_PARAMS[rail_type]
+        samples, requests, connections = [], [], []
+        for _ in range(args.repeat):
+            if mode == "resumed":
+                make_client(rail_type, session_cache=cache)
+            elif mode == "expired":
+                make_client(rail_type, session_cache=cache)
+                server.expire_sessions()
+
+            before = server.stats()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                rail = make_client(
+                    rail_type, session_cache=cache if mode != "cold" else None
+                )
+                rail.search_train(**params)
+            samples.append(time.perf_counter() - start)
+            after = server.stats()
+            requests.append(
+                sum(after["requests"].values()) - sum(before["requests"].values())
+            )
+            connections.append(after["connections"] - before["connections"])
+    return statistics.median(samples), statistics.mean(requests), statistics.mean(connections)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.02, help="server latency (s)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'rail':<5s} {'startup':<8s} {'time':>10s} {'requests':>9s} {'conns':>6s}")
+    for rail_type in ("srt", "ktx"):
+        for mode in ("cold", "resumed", "expired"):
+            elapsed, requests, connections = measure(rail_type, mode, args)
+            print(
+                f"{rail_type:<5s} {mode:<8s} {elapsed * 1000:7.1f} ms"
+                f" {requests:9.1f} {connections:6.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Stress one shared SRT or Korail client from many threads.
+
+`--threads` threads share a single client against the stand-in, released
+together round after round, and check the concurrency contract of
+`srtgo.srt.SRT` and `srtgo.ktx.Korail`:
+
+* funnel: with the key dropped, threads that search together pass the
+  NetFunnel queue once (SRT)
+* relogin: with the session expired on the server, threads that all call
+  relogin(since=...) with the generation they saw log in once
+* referer: concurrent reserve_info() calls each get their own reservation
+  back, and no header sticks to the session (SRT)
+* mixed: searches and reservation listings from every thread, error free
+
+Prints what each check saw and exits with status 1 if any failed:
+
+    python benchmarks/bench_threads.py --rail srt --threads 8 --rounds 20
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench import SEARCH_PARAMS, make_client
+from standin import StandIn, StandInConfig, redirect
+
+
+class Together:
+    """Runs `fn(i)` on every thread at once, released by a barrier."""
+
+    def __init__(self, threads):
+        self.threads = threads
+        self._pool = ThreadPoolExecutor(threads)
+
+    def __call__(self, fn):
+        barrier = threading.Barrier(self.threads)
+
+        def run(i):
+            barrier.wait()
+            return fn(i)
+
+        return list(self._pool.map(run, range(self.threads)))
+
+    def close(self):
+        self._pool.shutdown()
+
+
+def check_funnel(rail, server, together, args):
+    query = rail.prepare_search(**SEARCH_PARAMS["srt"])
+    passes = []
+    for _ in range(args.rounds):
+        rail.clear()
+        before = rail.netfunnel_stats()["runs"]
+        together(lambda i: rail.search(query))
+        passes.append(rail.netfunnel_stats()["runs"] - before)
+    return max(passes) == 1, f"passes per round: max {max(passes)}, total {sum(passes)}"
+
+
+def check_relogin(rail, server, together, args):
+    endpoint = f"{args.rail}.login"
+    logins = []
+    for _ in range(args.rounds):
+        server.expire_sessions()
+        before = server.stats()["requests"].get(endpoint, 0)
+        generation = rail.login_generation
+        results = together(lambda i: rail.relogin(since=generation))
+        logins.append(server.stats()["requests"].get(endpoint, 0) - before)
+        if not all(results):
+            return False, "relogin() failed"
+    return max(logins) == 1, f"logins per round: max {max(logins)}, total {sum(logins)}"
+
+
+def check_referer(rail, server, together, args):
+    headers = dict(rail._session.headers)
+    reservations = rail.get_reservations()
+    wrong = 0
+    for _ in range(args.rounds):
+        picks = [reservations[i % len(reservations)] for i in range(args.threads)]
+        infos = together(lambda i: rail.reserve_info(picks[i]))
+        wrong += sum(
+            info["pnrNo"] != pick.reservation_number
+            for info, pick in zip(infos, picks)
+        )
+    leaked = dict(rail._session.headers) != headers
+    return not wrong and not leaked, (
+        f"replies for another reservation: {wrong}, session headers changed: {leaked}"
+    )
+
+
+def check_mixed(rail, server, together, args):
+    query = rail.prepare_search(**SEARCH_PARAMS[args.rail])
+    listing = rail.get_reservations if args.rail == "srt" else rail.reservations
+    errors = []
+
+    def work(i):
+        for _ in range(args.rounds):
+            try:
+                rail.search(query)
+                listing()
+            except Exception as ex:
+                errors.append(ex)
+
+    start = time.perf_counter()
+    together(work)
+    wall = time.perf_counter() - start
+    ops = args.threads * args.rounds * 2
+    return not errors, (
+        f"{ops} calls in {wall:.2f}s ({ops / wall:.0f}/s), errors: {len(errors)}"
+        + (f" (first: {errors[0]!r})" if errors else "")
+    )
+
+
+CHECKS = {
+    "srt": (check_funnel, check_relogin, check_referer, check_mixed),
+    "ktx": (check_relogin, check_mixed),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rail", choices=("srt", "ktx"), default="srt")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=20, help="rounds per check")
+    args = parser.parse_args(argv)
+
+    config = StandInConfig(n_bookings=args.threads, n_trains=10)
+    failed = 0
+    with StandIn(config) as server, redirect(server.url):
+        rail = make_client(args.rail)
+        together = Together(args.threads)
+        try:
+            for check in CHECKS[args.rail]:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    ok, detail = check(rail, server, together, args)
+                name = check.__name__.removeprefix("check_")
+                print(f"{name:<8s} {'ok' if ok else 'FAILED':<6s} {detail}")
+                failed += not ok
+        finally:
+            together.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
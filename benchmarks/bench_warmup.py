@@ -0,0 +1,112 @@
+"""Connection warm-up and keep-alive on the stand-in, with both HTTP backends.
+
+The stand-in delays the first reply on each new connection by
+`--connect-latency` (DNS plus TCP/TLS handshakes) and closes connections
+idle for `--idle-timeout`. Two measurements per backend and rail:
+
+* first search after the client sat idle, cold vs after `warm_up()`
+* searches spaced `--wait` apart, with and without keep-alive pings from
+  `PollScheduler.wait(idle=...)`, counting new connections
+
+    python benchmarks/bench_warmup.py --connect-latency 0.05 --polls 5
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import time
+
+from bench import SEARCH_PARAMS, make_client
+from standin import StandIn, StandInConfig, redirect
+
+from srtgo import transport
+from srtgo.scheduler import PollScheduler
+
+
+def first_search(rail_type, warm, args):
+    config = StandInConfig(
+        connect_latency=args.connect_latency, idle_timeout=args.idle_timeout
+    )
+    with StandIn(config) as server, redirect(server.url):
+        rail = make_client(rail_type)
+        time.sleep(args.idle_timeout + 0.1)
+        if warm:
+            with contextlib.redirect_stdout(io.StringIO()):
+                rail.warm_up()
+        start = time.perf_counter()
+        rail.search_train(**SEARCH_PARAMS[rail_type])
+        return time.perf_counter() - start
+
+
+def spaced_searches(rail_type, keep_alive, args):
+    config = StandInConfig(
+        connect_latency=args.connect_latency, idle_timeout=args.idle_timeout
+    )
+    scheduler = PollScheduler(
+        shape=1, scale=1e-9, minimum=args.wait, max_rate=None,
+        idle_interval=args.idle_timeout / 2,
+    )
+    with StandIn(config) as server, redirect(server.url):
+        rail = make_client(rail_type)
+        rail.warm_up()
+        idle = (lambda: rail.warm_up(netfunnel=False)) if keep_alive else None
+        rail.connections.reset()
+        latencies = []
+        for _ in range(args.polls):
+            scheduler.wait(idle=idle)
+            start = time.perf_counter()
+            rail.search_train(**SEARCH_PARAMS[rail_type])
+            latencies.append(time.perf_counter() - start)
+        counts = rail.connections.snapshot()
+    return (
+        statistics.median(latencies),
+        sum(c["requests"] for c in counts.values()),
+        sum(c["new"] for c in counts.values()),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connect-latency", type=float, default=0.05)
+    parser.add_argument("--idle-timeout", type=float, default=0.5)
+    parser.add_argument("--wait", type=float, default=0.8, help="seconds between searches")
+    parser.add_argument("--polls", type=int, default=5)
+    parser.add_argument(
+        "--backend", choices=("curl_cffi", "requests", "both"), default="both"
+    )
+    args = parser.parse_args(argv)
+
+    backends = ("curl_cffi", "requests") if args.backend == "both" else (args.backend,)
+    has_curl_cffi = transport.HAS_CURL_CFFI
+    try:
+        for backend in backends:
+            if backend == "curl_cffi" and not has_curl_cffi:
+                print("curl_cffi: not installed")
+                continue
+            transport.HAS_CURL_CFFI = backend == "curl_cffi"
+            print(f"== {backend}")
+            print(f"  {'rail':<5s} {'first search':<14s} {'time':>10s}")
+            for rail_type in ("srt", "ktx"):
+                for warm in (False, True):
+                    elapsed = first_search(rail_type, warm, args)
+                    label = "warm_up()" if warm else "cold"
+                    print(f"  {rail_type:<5s} {label:<14s} {elapsed * 1000:7.1f} ms")
+            print(
+                f"  {'rail':<5s} {'idle waits':<14s} {'p50':>10s}"
+                f" {'requests':>9s} {'new conns':>10s}"
+            )
+            for rail_type in ("srt", "ktx"):
+                for keep_alive in (False, True):
+                    p50, requests, new = spaced_searches(rail_type, keep_alive, args)
+                    label = "keep-alive" if keep_alive else "none"
+                    print(
+                        f"  {rail_type:<5s} {label:<14s} {p50 * 1000:7.1f} ms"
+                        f" {requests:9d} {new:10d}"
+                    )
+    finally:
+        transport.HAS_CURL_CFFI = has_curl_cffi
+
+
+if __name__ == "__main__":
+    main()
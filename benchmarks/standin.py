@@ -0,0 +1,849 @@
+"""Local stand-in for the SRT, Korail and NetFunnel mobile APIs.
+
+Speaks just enough of each endpoint for `srtgo.srt.SRT` and
+`srtgo.ktx.Korail` to log in, search, reserve, list, pay, cancel and
+refund, with configurable latency, error injection and payload sizes.
+
+    >>> with StandIn(StandInConfig(n_trains=10, latency=0.02)) as server:
+    ...     with redirect(server.url):
+    ...         srt = SRT("1234567890", "pw")
+    ...         srt.search_train("수서", "부산", available_only=False)
+
+Run it standalone with `python benchmarks/standin.py --port 8470`.
+"""
+
+import argparse
+import itertools
+import json
+import random
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from srtgo import ktx, srt
+
+SRT_OVERLOAD_MSG = "사용자가 많아 접속이 원활하지 않습니다."
+SRT_NOT_LOGGED_IN_MSG = "로그인 후 사용하십시오."
+SRT_NETFUNNEL_MSG = "정상적인 경로로 접근 부탁드립니다."
+# Searches list the same trains every 20 minutes from here, whatever time
+# they ask for, so a train keeps its identity for as long as a run lasts
+FIRST_DEPARTURE = "060000"
+
+
+@dataclass
+class StandInConfig:
+    """Behaviour knobs for the stand-in server.
+
+    Latencies are seconds added before each response; `errors` maps an
+    error kind ("overload", "http500", "drop", "expire", "stall") to the
+    probability of injecting it on any endpoint listed in `error_endpoints`.
+    A stalled request gets no reply for `stall` seconds, like a half-open
+    connection. `connect_latency` delays the first reply on every new
+    connection (standing in for DNS and the TCP/TLS handshakes), and
+    `idle_timeout` closes connections that sit idle for that long.
+    NetFunnel replies point the next step at one of `funnel_hosts` loopback
+    addresses (127.0.0.1, 127.0.0.2, ...) in turn, like the real service's
+    redirect IPs.
+    `reserve_details` adds the payment deadline and amount to SRT reserve
+    responses; without it clients have to look the booking up again.
+    """
+
+    latency: float = 0.0
+    latency_by_endpoint: dict = field(default_factory=dict)
+    jitter: float = 0.0
+    errors: dict = field(default_factory=dict)
+    error_endpoints: set = field(
+        default_factory=lambda: {"srt.search_schedule", "ktx.search_schedule"}
+    )
+    n_trains: int = 10
+    extra_fields: int = 60
+    n_bookings: int = 0
+    open_after: int | None = None
+    open_index: int = 0
+    funnel_wait: int = 0
+    funnel_key_ttl: float | None = None
+    stall: float = 60.0
+    connect_latency: float = 0.0
+    funnel_hosts: int = 1
+    idle_timeout: float | None = None
+    reserve_details: bool = True
+    seed: int = 0
+
+
+class _Booking:
+    def __init__(self, pnr, row, seats=1, paid=False):
+        self.pnr = pnr
+        self.row = row
+        self.seats = seats
+        self.paid = paid
+
+
+class StandInState:
+    """Server-side state: sessions, bookings, funnel keys and counters."""
+
+    def __init__(self, config: StandInConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.rng = random.Random(config.seed)
+        self.sessions = set()
+        self.funnel_keys = {}
+        self.funnel_replies = 0
+        self.searches = 0
+        self.connections = 0
+        self.requests = {}
+        self.bytes_out = 0
+        self.bookings = {"srt": [], "ktx": []}
+        self.telegram_messages = []
+        self._pnr = itertools.count(100000)
+        for i in range(config.n_bookings):
+            self.bookings["srt"].append(self.new_booking(self.srt_row(i), paid=i % 2 == 1))
+            self.bookings["ktx"].append(self.new_booking(self.ktx_row(i), paid=i % 2 == 1))
+
+    def new_booking(self, row, seats=1, paid=False):
+        return _Booking(f"{next(self._pnr):013d}", row, seats, paid)
+
+    # Train rows
+    def _departure(self, i, date=None, base=FIRST_DEPARTURE):
+        start = datetime.strptime((date or _today()) + base, "%Y%m%d%H%M%S")
+        dep = start + timedelta(minutes=20 * i)
+        arr = dep + timedelta(minutes=150)
+        return dep, arr
+
+    def _padding(self, prefix):
+        return {f"{prefix}{k:03d}": "0" * 8 for k in range(self.config.extra_fields)}
+
+    def srt_row(self, i, form=None, available=False):
+        form = form or {}
+        dep, arr = self._departure(i, form.get("dptDt"), form.get("dptTm", FIRST_DEPARTURE))
+        row = self._padding("etcFld")
+        row.update(
+            {
+                "stlbTrnClsfCd": "17",
+                "trnNo": f"{301 + 2 * i:05d}",
+                "dptDt": dep.strftime("%Y%m%d"),
+                "dptTm": dep.strftime("%H%M%S"),
+                "dptRsStnCd": form.get("dptRsStnCd", "0551"),
+                "dptStnRunOrdr": "000001",
+                "dptStnConsOrdr": "000001",
+                "arvDt": arr.strftime("%Y%m%d"),
+                "arvTm": arr.strftime("%H%M%S"),
+                "arvRsStnCd": form.get("arvRsStnCd", "0020"),
+                "arvStnRunOrdr": "000010",
+                "arvStnConsOrdr": "000010",
+                "gnrmRsvPsbStr": "예약가능" if available else "매진",
+                "sprmRsvPsbStr": "매진",
+                "rsvWaitPsbCdNm": "매진",
+                "rsvWaitPsbCd": "0",
+            }
+        )
+        return row
+
+    def ktx_row(self, i, form=None, available=False):
+        form = form or {}
+        dep, arr = self._departure(i, form.get("txtGoAbrdDt"), form.get("txtGoHour", FIRST_DEPARTURE))
+        row = self._padding("h_etc_fld")
+        row.update(
+            {
+                "h_trn_clsf_cd": "00",
+                "h_trn_clsf_nm": "KTX",
+                "h_trn_gp_cd": "100",
+                "h_trn_no": f"{101 + 2 * i:05d}",
+                "h_expct_dlay_hr": "000000",
+                "h_dpt_rs_stn_nm": form.get("txtGoStart", "서울"),
+                "h_dpt_rs_stn_cd": "0001",
+                "h_dpt_dt": dep.strftime("%Y%m%d"),
+                "h_dpt_tm": dep.strftime("%H%M%S"),
+                "h_arv_rs_stn_nm": form.get("txtGoEnd", "부산"),
+                "h_arv_rs_stn_cd": "0020",
+                "h_arv_dt": arr.strftime("%Y%m%d"),
+                "h_arv_tm": arr.strftime("%H%M%S"),
+                "h_run_dt": dep.strftime("%Y%m%d"),
+                "h_rsv_psb_flg": "Y" if available else "N",
+                "h_rsv_psb_nm": "예약하기" if available else "매진",
+                "h_spe_rsv_cd": "13",
+                "h_gen_rsv_cd": "11" if available else "13",
+                "h_wait_rsv_flg": "-1",
+            }
+        )
+        return row
+
+    def search_rows(self, rail, form):
+        with self.lock:
+            self.searches += 1
+            searches = self.searches
+        opened = (
+            self.config.open_after is not None and searches > self.config.open_after
+        )
+        make = self.srt_row if rail == "srt" else self.ktx_row
+        form = {**form, "dptTm": FIRST_DEPARTURE, "txtGoHour": FIRST_DEPARTURE}
+        return [
+            make(i, form, available=opened and i == self.config.open_index)
+            for i in range(self.config.n_trains)
+        ]
+
+    def find_booking(self, rail, pnr):
+        for booking in self.bookings[rail]:
+            if booking.pnr == pnr:
+                return booking
+        return None
+
+    def count(self, endpoint, nbytes):
+        with self.lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self.bytes_out += nbytes
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "connections": self.connections,
+                "searches": self.searches,
+                "requests": dict(self.requests),
+                "bytes_out": self.bytes_out,
+                "bookings": {k: len(v) for k, v in self.bookings.items()},
+                "telegram_messages": len(self.telegram_messages),
+            }
+
+
+def _today():
+    return datetime.now().strftime("%Y%m%d")
+
+
+def _route_table():
+    routes = {}
+    for prefix, module in (("srt", srt), ("ktx", ktx)):
+        for name, url in module.API_ENDPOINTS.items():
+            routes[urlsplit(url).path] = f"{prefix}.{name}"
+    routes["/ts.wseq"] = "netfunnel"
+    return routes
+
+
+ROUTES = _route_table()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "StandIn/1.0"
+    disable_nagle_algorithm = True
+
+    @property
+    def state(self) -> StandInState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        self.timeout = self.state.config.idle_timeout
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+        if self.state.config.connect_latency > 0:
+            time.sleep(self.state.config.connect_latency)
+
+    # Plumbing
+    def _form(self):
+        parts = urlsplit(self.path)
+        form = dict(parse_qsl(parts.query, keep_blank_values=True))
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode("utf-8")
+            form.update(parse_qsl(body, keep_blank_values=True))
+        return parts.path, form
+
+    def _session(self):
+        cookie = self.headers.get("Cookie") or ""
+        for part in cookie.split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "JSESSIONID":
+                return value
+        return None
+
+    def _send(self, endpoint, body, status=200, content_type="application/json", cookie=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body, ensure_ascii=False)
+        data = body.encode("utf-8")
+        self.state.count(endpoint, len(data))
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        if cookie:
+            self.send_header("Set-Cookie", f"JSESSIONID={cookie}; Path=/")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _delay(self, endpoint):
+        config = self.state.config
+        delay = config.latency_by_endpoint.get(endpoint, config.latency)
+        if config.jitter:
+            with self.state.lock:
+                delay += self.state.rng.uniform(0, config.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _injected_error(self, endpoint):
+        config = self.state.config
+        if endpoint not in config.error_endpoints:
+            return None
+        with self.state.lock:
+            roll = self.state.rng.random()
+        for kind, probability in config.errors.items():
+            if roll < probability:
+                return kind
+            roll -= probability
+        return None
+
+    def do_HEAD(self):
+        # Connection warm-up: headers only, no session needed
+        self.state.count("head", 0)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        path, form = self._form()
+        if path.startswith("/__standin__/"):
+            return self._control(path.rsplit("/", 1)[-1], form)
+
+        if path.startswith("/bot"):
+            return self._telegram(path.rsplit("/", 1)[-1], form)
+
+        endpoint = ROUTES.get(path)
+        if endpoint is None:
+            return self._send("unknown", "Not Found", 404, "text/html")
+
+        self._delay(endpoint)
+        error = self._injected_error(endpoint)
+        if error == "drop":
+            self.state.count("dropped", 0)
+            self.close_connection = True
+            self.wfile.flush()
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        if error == "stall":
+            time.sleep(self.state.config.stall)
+            self.close_connection = True
+            return
+        if error == "http500":
+            return self._send(endpoint, "<html><body>Internal Server Error</body></html>", 500, "text/html")
+        if error == "expire":
+            with self.state.lock:
+                self.state.sessions.discard(self._session())
+
+        if endpoint == "netfunnel":
+            return self._netfunnel(form)
+
+        rail, name = endpoint.split(".", 1)
+        handler = getattr(self, f"_{rail}_{name}", None)
+        if handler is None:
+            return self._send(endpoint, {})
+        if name not in ("login", "code", "main", "logout") and self._session() not in self.state.sessions:
+            return self._not_logged_in(rail, endpoint)
+        if error == "overload":
+            return self._overload(rail, endpoint)
+        return handler(endpoint, form)
+
+    def _control(self, action, form):
+        if action == "expire":
+            with self.state.lock:
+                self.state.sessions.clear()
+        elif action == "configure":
+            for key, value in json.loads(form.get("config", "{}")).items():
+                setattr(self.state.config, key, value)
+        self._send("control", self.state.snapshot())
+
+    def _login(self, endpoint, payload):
+        token = f"{self.state.rng.getrandbits(64):016x}"
+        with self.state.lock:
+            self.state.sessions.add(token)
+        self._send(endpoint, payload, cookie=token)
+
+    # NetFunnel
+    def _netfunnel(self, form):
+        state, config = self.state, self.state.config
+        opcode, key = form.get("opcode"), form.get("key")
+        with state.lock:
+            if opcode == "5101":
+                key = f"{state.rng.getrandbits(128):032X}"
+                state.funnel_keys[key] = [time.monotonic(), config.funnel_wait]
+            entry = state.funnel_keys.get(key, [time.monotonic(), 0])
+            if opcode == "5002" and entry[1] > 0:
+                entry[1] -= 1
+            nwait = entry[1]
+            state.funnel_replies += 1
+            turn = state.funnel_replies % config.funnel_hosts
+        status = "201" if opcode != "5004" and nwait > 0 else "200"
+        port = self.server.server_address[1]
+        host = f"127.0.0.{1 + turn}"
+        params = f"key={key}&nwait={nwait}&nnext=0&tps=0&ttl=0&ip={host}:{port}&port={port}"
+        if form.get("js") == "true":
+            body = f"NetFunnel.gControl.result='{opcode}:{status}:{params}'; NetFunnel.gControl._showResult();"
+        else:
+            body = f"{status}:{params}"
+        self._send("netfunnel", body, content_type="text/javascript")
+
+    def _funnel_key_valid(self, key):
+        ttl = self.state.config.funnel_key_ttl
+        if ttl is None:
+            return True
+        with self.state.lock:
+            entry = self.state.funnel_keys.get(key)
+        return entry is not None and time.monotonic() - entry[0] < ttl
+
+    # Telegram Bot API
+    def _telegram(self, method, form):
+        endpoint = f"telegram.{method}"
+        self._delay(endpoint)
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "srtgo", "username": "srtgo_bot"}
+        elif method == "sendMessage":
+            with self.state.lock:
+                self.state.telegram_messages.append(form.get("text", ""))
+                message_id = len(self.state.telegram_messages)
+            chat_id = form.get("chat_id", "0").strip('"')
+            result = {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": int(chat_id) if chat_id.lstrip("-").isdigit() else 0, "type": "private"},
+                "text": form.get("text", ""),
+            }
+        else:
+            result = True
+        self._send(endpoint, {"ok": True, "result": result})
+
+    # SRT
+    @staticmethod
+    def _srt_result(success=True, msg=""):
+        return [{"strResult": "SUCC" if success else "FAIL", "msgTxt": msg}]
+
+    def _srt_fail(self, endpoint, msg):
+        self._send(endpoint, {"resultMap": self._srt_result(False, msg)})
+
+    def _not_logged_in(self, rail, endpoint):
+        if rail == "srt":
+            return self._srt_fail(endpoint, SRT_NOT_LOGGED_IN_MSG)
+        self._send(endpoint, {"strResult": "FAIL", "h_msg_cd": "P058", "h_msg_txt": "로그인 후 사용하십시오."})
+
+    def _overload(self, rail, endpoint):
+        if rail == "srt":
+            return self._srt_fail(endpoint, SRT_OVERLOAD_MSG)
+        # No code is known for this one; the client matches the message
+        self._send(endpoint, {"strResult": "FAIL", "h_msg_txt": SRT_OVERLOAD_MSG})
+
+    def _srt_main(self, endpoint, form):
+        self._send(endpoint, "<html></html>", content_type="text/html")
+
+    def _srt_login(self, endpoint, form):
+        self._login(
+            endpoint,
+            {
+                "strResult": "SUCC",
+                "userMap": {
+                    "MB_CRD_NO": "1234567890",
+                    "CUST_NM": "홍길동",
+                    "MBL_PHONE": "010-1234-5678",
+                },
+            },
+        )
+
+    def _srt_logout(self, endpoint, form):
+        with self.state.lock:
+            self.state.sessions.discard(self._session())
+        self._send(endpoint, {})
+
+    def _srt_search_schedule(self, endpoint, form):
+        if not self._funnel_key_valid(form.get("netfunnelKey")):
+            return self._srt_fail(endpoint, SRT_NETFUNNEL_MSG)
+        rows = self.state.search_rows("srt", form)
+        self._send(
+            endpoint,
+            {"resultMap": self._srt_result(), "outDataSets": {"dsOutput1": rows}},
+        )
+
+    def _srt_reserve(self, endpoint, form):
+        row = self.state.srt_row(
+            0,
+            {
+                "dptDt": form.get("dptDt1"),
+                "dptTm": form.get("dptTm1", FIRST_DEPARTURE),
+                "dptRsStnCd": form.get("dptRsStnCd1", "0551"),
+                "arvRsStnCd": form.get("arvRsStnCd1", "0020"),
+            },
+        )
+        row["trnNo"] = form.get("trnNo1", row["trnNo"])
+        booking = self.state.new_booking(row, int(form.get("totPrnb", "1")))
+        with self.state.lock:
+            self.state.bookings["srt"].append(booking)
+        reserved = {"pnrNo": booking.pnr}
+        if self.state.config.reserve_details and form.get("jobId") == "1101":
+            reserved.update(
+                {
+                    "iseLmtDt": row["dptDt"],
+                    "iseLmtTm": "235900",
+                    "rcvdAmt": str(52900 * booking.seats),
+                }
+            )
+        self._send(
+            endpoint,
+            {"resultMap": self._srt_result(), "reservListMap": [reserved]},
+        )
+
+    def _srt_tickets(self, endpoint, form):
+        trains, pays = [], []
+        for booking in list(self.state.bookings["srt"]):
+            row = booking.row
+            trains.append(
+                {
+                    "pnrNo": booking.pnr,
+                    "rcvdAmt": str(52900 * booking.seats),
+                    "tkSpecNum": str(booking.seats),
+                    "seatNum": str(booking.seats),
+                }
+            )
+            pays.append(
+                {
+                    "stlbTrnClsfCd": "17",
+                    "trnNo": row["trnNo"],
+                    "dptDt": row["dptDt"],
+                    "dptTm": row["dptTm"],
+                    "dptRsStnCd": row["dptRsStnCd"],
+                    "arvTm": row["arvTm"],
+                    "arvRsStnCd": row["arvRsStnCd"],
+                    "iseLmtDt": "" if booking.paid else row["dptDt"],
+                    "iseLmtTm": "" if booking.paid else "235900",
+                    "stlFlg": "Y" if booking.paid else "N",
+                }
+            )
+        self._send(
+            endpoint,
+            {"resultMap": self._srt_result(), "trainListMap": trains, "payListMap": pays},
+        )
+
+    def _srt_ticket_info(self, endpoint, form):
+        booking = self.state.find_booking("srt", form.get("pnrNo"))
+        if booking is None:
+            return self._srt_fail(endpoint, "조회 내역이 없습니다.")
+        seats = [
+            {
+                "scarNo": "5",
+                "seatNo": f"{i + 1}A",
+                "psrmClCd": "1",
+                "dcntKndCd": "000",
+                "rcvdAmt": "52900",
+                "stdrPrc": "52900",
+                "dcntPrc": "0",
+            }
+            for i in range(booking.seats)
+        ]
+        self._send(endpoint, {"resultMap": self._srt_result(), "trainListMap": seats})
+
+    def _srt_cancel(self, endpoint, form):
+        booking = self.state.find_booking("srt", form.get("pnrNo"))
+        with self.state.lock:
+            if booking in self.state.bookings["srt"]:
+                self.state.bookings["srt"].remove(booking)
+        self._send(endpoint, {"resultMap": self._srt_result()})
+
+    def _srt_standby_option(self, endpoint, form):
+        self._send(endpoint, {"resultMap": self._srt_result()})
+
+    def _srt_payment(self, endpoint, form):
+        booking = self.state.find_booking("srt", form.get("pnrNo"))
+        if booking is not None:
+            booking.paid = True
+        result = {"strResult": "SUCC" if booking else "FAIL", "msgTxt": ""}
+        self._send(endpoint, {"outDataSets": {"dsOutput0": [result]}})
+
+    def _srt_reserve_info(self, endpoint, form):
+        pnr = (self.headers.get("Referer") or "").rsplit("=", 1)[-1]
+        self._send(
+            endpoint,
+            {
+                "ErrorCode": "0",
+                "ErrorMsg": "",
+                "outDataSets": {
+                    "dsOutput1": [
+                        {
+                            "pnrNo": pnr,
+                            "ogtkSaleDt": _today(),
+                            "ogtkSaleWctNo": "12345",
+                            "ogtkSaleSqno": "1",
+                            "ogtkRetPwd": "00",
+                            "buyPsNm": "홍길동",
+                        }
+                    ]
+                },
+            },
+        )
+
+    def _srt_refund(self, endpoint, form):
+        booking = self.state.find_booking("srt", form.get("pnr_no"))
+        with self.state.lock:
+            if booking in self.state.bookings["srt"]:
+                self.state.bookings["srt"].remove(booking)
+        self._send(endpoint, {"resultMap": self._srt_result()})
+
+    # Korail
+    def _ktx_code(self, endpoint, form):
+        self._send(
+            endpoint,
+            {
+                "strResult": "SUCC",
+                "app.login.cphd": {"idx": "1", "key": "korail1234567890korail1234567890"},
+            },
+        )
+
+    def _ktx_login(self, endpoint, form):
+        self._login(
+            endpoint,
+            {
+                "strResult": "SUCC",
+                "strMbCrdNo": "1234567890",
+                "strCustNm": "홍길동",
+                "strEmailAdr": "user@example.com",
+                "strCpNo": "010-1234-5678",
+            },
+        )
+
+    def _ktx_logout(self, endpoint, form):
+        with self.state.lock:
+            self.state.sessions.discard(self._session())
+        self._send(endpoint, {"strResult": "SUCC"})
+
+    def _ktx_no_results(self, endpoint):
+        self._send(endpoint, {"strResult": "FAIL", "h_msg_cd": "P100", "h_msg_txt": "조회 결과가 없습니다."})
+
+    def _ktx_search_schedule(self, endpoint, form):
+        rows = self.state.search_rows("ktx", form)
+        if not rows:
+            return self._ktx_no_results(endpoint)
+        self._send(endpoint, {"strResult": "SUCC", "trn_infos": {"trn_info": rows}})
+
+    def _ktx_reserve(self, endpoint, form):
+        row = self.state.ktx_row(
+            0,
+            {"txtGoAbrdDt": form.get("txtDptDt1"), "txtGoHour": form.get("txtDptTm1", FIRST_DEPARTURE)},
+        )
+        row["h_trn_no"] = form.get("txtTrnNo1", row["h_trn_no"])
+        booking = self.state.new_booking(row, int(form.get("txtTotPsgCnt", "1")))
+        with self.state.lock:
+            self.state.bookings["ktx"].append(booking)
+        self._send(endpoint, {"strResult": "SUCC", "h_pnr_no": booking.pnr})
+
+    def _ktx_myreservationview(self, endpoint, form):
+        rows = []
+        for booking in list(self.state.bookings["ktx"]):
+            if booking.paid:
+                continue
+            row = dict(booking.row)
+            row.update(
+                {
+                    "h_pnr_no": booking.pnr,
+                    "h_tot_seat_cnt": str(booking.seats),
+                    "h_ntisu_lmt_dt": row["h_dpt_dt"],
+                    "h_ntisu_lmt_tm": "235000",
+                    "h_rsv_amt": str(59800 * booking.seats),
+                }
+            )
+            rows.append(row)
+        if not rows:
+            return self._ktx_no_results(endpoint)
+        self._send(
+            endpoint,
+            {
+                "strResult": "SUCC",
+                "jrny_infos": {"jrny_info": [{"train_infos": {"train_info": rows}}]},
+            },
+        )
+
+    def _ktx_myreservationlist(self, endpoint, form):
+        booking = self.state.find_booking("ktx", form.get("hidPnrNo"))
+        if booking is None:
+            return self._ktx_no_results(endpoint)
+        seats = [
+            {
+                "h_srcar_no": "3",
+                "h_seat_no": f"{i + 1}A",
+                "h_psrm_cl_nm": "일반실",
+                "h_psg_tp_dv_nm": "어른",
+                "h_rcvd_amt": "59800",
+                "h_seat_prc": "59800",
+                "h_dcnt_amt": "0",
+            }
+            for i in range(booking.seats)
+        ]
+        self._send(
+            endpoint,
+            {
+                "strResult": "SUCC",
+                "h_wct_no": "12345",
+                "jrny_infos": {"jrny_info": [{"seat_infos": {"seat_info": seats}}]},
+            },
+        )
+
+    def _ktx_myticketlist(self, endpoint, form):
+        tickets = []
+        for booking in list(self.state.bookings["ktx"]):
+            if not booking.paid:
+                continue
+            row = dict(booking.row)
+            row.update(
+                {
+                    "h_seat_no_end": "",
+                    "h_seat_cnt": str(booking.seats),
+                    "h_buy_ps_nm": "홍길동",
+                    "h_orgtk_sale_dt": _today(),
+                    "h_pnr_no": booking.pnr,
+                    "h_orgtk_wct_no": "12345",
+                    "h_orgtk_ret_sale_dt": _today(),
+                    "h_orgtk_sale_sqno": booking.pnr[-5:],
+                    "h_orgtk_ret_pwd": "00",
+                    "h_rcvd_amt": str(59800 * booking.seats),
+                    "h_srcar_no": "3",
+                    "h_seat_no": "1A",
+                }
+            )
+            tickets.append({"ticket_list": [{"train_info": [row]}]})
+        if not tickets:
+            return self._ktx_no_results(endpoint)
+        self._send(endpoint, {"strResult": "SUCC", "reservation_list": tickets})
+
+    def _ktx_myticketseat(self, endpoint, form):
+        self._send(
+            endpoint,
+            {
+                "strResult": "SUCC",
+                "ticket_infos": {"ticket_info": [{"tk_seat_info": [{"h_seat_no": "1A"}]}]},
+            },
+        )
+
+    def _ktx_pay(self, endpoint, form):
+        booking = self.state.find_booking("ktx", form.get("hidPnrNo"))
+        if booking is None:
+            return self._ktx_no_results(endpoint)
+        booking.paid = True
+        self._send(endpoint, {"strResult": "SUCC"})
+
+    def _ktx_cancel(self, endpoint, form):
+        booking = self.state.find_booking("ktx", form.get("txtPnrNo"))
+        with self.state.lock:
+            if booking in self.state.bookings["ktx"]:
+                self.state.bookings["ktx"].remove(booking)
+        self._send(endpoint, {"strResult": "SUCC"})
+
+    def _ktx_refund(self, endpoint, form):
+        booking = self.state.find_booking("ktx", form.get("txtPrnNo"))
+        with self.state.lock:
+            if booking in self.state.bookings["ktx"]:
+                self.state.bookings["ktx"].remove(booking)
+        self._send(endpoint, {"strResult": "SUCC"})
+
+
+class _Server(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients that time out hang up mid-reply; that is expected here
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class StandIn:
+    """Runs the stand-in server on a background thread."""
+
+    def __init__(self, config: StandInConfig | None = None, host="127.0.0.1", port=0):
+        self.config = config or StandInConfig()
+        self.state = StandInState(self.config)
+        self._server = _Server((host, port), StandInHandler)
+        port = self._server.server_address[1]
+        # Extra NetFunnel hosts: same port, next loopback addresses
+        self._servers = [self._server] + [
+            _Server((f"127.0.0.{i}", port), StandInHandler)
+            for i in range(2, self.config.funnel_hosts + 1)
+        ]
+        for server in self._servers:
+            server.daemon_threads = True
+            server.state = self.state
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandIn":
+        for server in self._servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+    def expire_sessions(self) -> None:
+        with self.state.lock:
+            self.state.sessions.clear()
+
+    def stats(self) -> dict:
+        return self.state.snapshot()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+@contextmanager
+def redirect(url: str):
+    """Point `srtgo.srt` and `srtgo.ktx` at `url` for the duration of the block."""
+    saved = {
+        "srt": dict(srt.API_ENDPOINTS),
+        "ktx": dict(ktx.API_ENDPOINTS),
+        "srt_nf": (srt.NetFunnelHelper.NETFUNNEL_URL, srt.NetFunnelHelper.NETFUNNEL_HOST),
+        "ktx_nf": ktx.NetFunnelHelper.NETFUNNEL_URL,
+    }
+    parts = urlsplit(url)
+    for module in (srt, ktx):
+        for name, endpoint in module.API_ENDPOINTS.items():
+            original = urlsplit(endpoint)
+            query = f"?{original.query}" if original.query or endpoint.endswith("?") else ""
+            module.API_ENDPOINTS[name] = f"{url}{original.path}{query}"
+    srt.NetFunnelHelper.NETFUNNEL_URL = f"{parts.scheme}://{{host}}/ts.wseq"
+    srt.NetFunnelHelper.NETFUNNEL_HOST = parts.netloc
+    ktx.NetFunnelHelper.NETFUNNEL_URL = f"{url}/ts.wseq"
+    try:
+        yield
+    finally:
+        srt.API_ENDPOINTS.update(saved["srt"])
+        ktx.API_ENDPOINTS.update(saved["ktx"])
+        srt.NetFunnelHelper.NETFUNNEL_URL, srt.NetFunnelHelper.NETFUNNEL_HOST = saved["srt_nf"]
+        ktx.NetFunnelHelper.NETFUNNEL_URL = saved["ktx_nf"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8470)
+    parser.add_argument("--config", default="{}", help="StandInConfig fields as JSON")
+    args = parser.parse_args()
+
+    server = StandIn(StandInConfig(**json.loads(args.config)), args.host, args.port)
+    print(f"Stand-in listening on {server.url}", flush=True)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Availability changes between search polls, as events.
+
+From one poll to the next almost every train comes back unchanged. A
+`ChangeTracker` keeps the previous result keyed by train identity and, for
+each raw row of the new one, compares only the model's availability fields.
+Unchanged trains are reused as they are; the rest are rebuilt and their
+transitions become `SeatOpened`, `StandbyOpened` or `SoldOut` events, for
+the reservation loop to act on and for logs and notifications to show.
+
+Train models provide the hooks: `identity(row)`, `AVAILABILITY_FIELDS` (the
+raw row fields that change between polls) and `availability()`, which returns
+(general seat, special seat, standby) open.
+"""
+
+from dataclasses import dataclass
+from operator import itemgetter
+
+CLOSED = (False, False, False)
+
+
+@dataclass(frozen=True)
+class AvailabilityEvent:
+    """A change in the availability of one train.
+
+    Attributes:
+        key: Identity of the train, from `identity(row)`
+        train: The train as of the poll that changed it
+    """
+
+    key: tuple
+    train: object
+
+    label = "변경"
+
+    def __str__(self) -> str:
+        return f"{self.label}: {self.train}"
+
+
+@dataclass(frozen=True)
+class SeatOpened(AvailabilityEvent):
+    """General or special seats became reservable."""
+
+    general: bool
+    special: bool
+
+    label = "좌석 발생"
+
+
+@dataclass(frozen=True)
+class StandbyOpened(AvailabilityEvent):
+    """Standby (예약대기) became possible."""
+
+    label = "예약대기 가능"
+
+
+@dataclass(frozen=True)
+class SoldOut(AvailabilityEvent):
+    """The last reservable seats are gone."""
+
+    label = "매진"
+
+
+class ChangeTracker:
+    """Keeps the last search result and emits events for what changed.
+
+    A train seen for the first time counts as changed from fully closed,
+    so the first poll reports every train that is already open.
+
+    Args:
+        on_event: Called with each event as it is found
+
+    Attributes:
+        events: Events of the last poll
+        polls: Results tracked so far
+        reused: Trains carried over unchanged from the previous poll
+        rebuilt: Trains decoded because they were new or changed
+    """
+
+    def __init__(self, on_event=None) -> None:
+        self.on_event = on_event
+        self.events = []
+        self.polls = 0
+        self.reused = 0
+        self.rebuilt = 0
+        self.counts = {}
+        self._trains = {}  # key -> (availability fields, train, availability)
+
+    def update(self, rows, model) -> list:
+        """Track a new result; returns its trains in row order.
+
+        Args:
+            rows: Raw train rows of the result
+            model: Train class to build changed rows with
+        """
+        previous, current = self._trains, {}
+        identity, fields = model.identity, model.AVAILABILITY_FIELDS
+        values_of = itemgetter(*fields)
+        events, trains = [], []
+        for row in rows:
+            key = identity(row)
+            try:
+                values = values_of(row)
+            except KeyError:
+                values = tuple(row.get(field) for field in fields)
+            entry = previous.get(key)
+            if entry is not None and entry[0] == values:
+                self.reused += 1
+            else:
+                train = model(row)
+                state = train.availability()
+                events.extend(
+                    self._diff(key, train, CLOSED if entry is None else entry[2], state)
+                )
+                entry = (values, train, state)
+                self.rebuilt += 1
+            current[key] = entry
+            trains.append(entry[1])
+
+        self._trains = current
+        self.events = events
+        self.polls += 1
+        for event in events:
+            name = type(event).__name__
+            self.counts[name] = self.counts.get(name, 0) + 1
+            if self.on_event is not None:
+                self.on_event(event)
+        return trains
+
+    def get(self, key: tuple, default=None):
+        """The train with `key` in the last result, or `default`."""
+        entry = self._trains.get(key)
+        return default if entry is None else entry[1]
+
+    def __contains__(self, key) -> bool:
+        return key in self._trains
+
+    def forget(self, key: tuple | None = None) -> None:
+        """Drop what is known about `key` (default: every train).
+
+        The next poll then reports the train again if it is still open,
+        e.g. after a reservation attempt on it failed.
+        """
+        if key is None:
+            self._trains.clear()
+        else:
+            self._trains.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "polls": self.polls,
+            "reused": self.reused,
+            "rebuilt": self.rebuilt,
+            "events": dict(self.counts),
+        }
+
+    @staticmethod
+    def _diff(key, train, before, after):
+        general, special, standby = after
+        if (general and not before[0]) or (special and not before[1]):
+            yield SeatOpened(key, train, general, special)
+        elif (before[0] or before[1]) and not (general or special):
+            yield SoldOut(key, train)
+        if standby and not before[2]:
+            yield StandbyOpened(key, train)
@@ -0,0 +1,107 @@
+"""What the reservation loop does about each kind of error.
+
+Client errors carry the server's result code and declare a `policy`: the
+action to take (retry, back off, refresh the NetFunnel key, reconnect, log
+in again or ask the user) and the signal to feed the `PollScheduler`.
+Transport errors get theirs from `policy_for()`. The loop only dispatches on
+the action, so a busy server or a garbled reply no longer costs a login
+round trip, and a dropped connection waits for the client's
+`CircuitBreaker` rather than for a prompt.
+"""
+
+from dataclasses import dataclass
+from json import JSONDecodeError
+
+from . import transport
+from .scheduler import ERROR, OK, OVERLOAD, TIMEOUT
+
+# Actions
+RETRY = "retry"
+BACKOFF = "backoff"
+REFRESH_FUNNEL = "refresh_funnel"
+RECONNECT = "reconnect"
+REAUTH = "reauth"
+ABORT = "abort"
+
+
+@dataclass(frozen=True)
+class Policy:
+    """How to handle an error.
+
+    Attributes:
+        action: RETRY, BACKOFF, REFRESH_FUNNEL, RECONNECT, REAUTH or ABORT
+        signal: Scheduler signal to record before the next poll, or None
+            to leave the pace to the circuit breaker
+        reauth_after: Log in again after this many of these in a row
+    """
+
+    action: str
+    signal: str | None
+    reauth_after: int | None = None
+
+
+SOLD_OUT = Policy(RETRY, OK)
+BUSY = Policy(BACKOFF, OVERLOAD)
+STALE_KEY = Policy(REFRESH_FUNNEL, OK)
+FUNNEL_FAILED = Policy(REFRESH_FUNNEL, OVERLOAD)
+LOGGED_OUT = Policy(REAUTH, ERROR)
+TIMED_OUT = Policy(BACKOFF, TIMEOUT)
+# Connection errors, and requests the circuit breaker held back
+DISCONNECTED = Policy(RECONNECT, None)
+# Garbled replies; a run of them may be a dead session
+TRANSIENT = Policy(BACKOFF, ERROR, reauth_after=5)
+UNKNOWN = Policy(ABORT, ERROR)
+
+
+def policy_for(ex: BaseException) -> Policy:
+    """The policy `ex` declares, or the one for its transport error."""
+    policy = getattr(ex, "policy", None)
+    if isinstance(policy, Policy):
+        return policy
+    if isinstance(ex, transport.RequestTimeout):
+        return TIMED_OUT
+    if isinstance(ex, (transport.CircuitOpenError, transport.ConnectionError)):
+        return DISCONNECTED
+    if isinstance(ex, JSONDecodeError):
+        return TRANSIENT
+    return UNKNOWN
+
+
+class ErrorCounter:
+    """Counts errors per class and picks the policy for each.
+
+    A policy with `reauth_after` turns into REAUTH once that many errors
+    of the same class came in a row, without a clean poll (see `ok()`).
+
+    Attributes:
+        counts: Errors seen, by class name
+        actions: Actions taken, by action
+    """
+
+    def __init__(self) -> None:
+        self.counts = {}
+        self.actions = {}
+        self._streak = (None, 0)
+
+    def record(self, ex: BaseException) -> Policy:
+        """Count `ex` and return what to do about it."""
+        policy = policy_for(ex)
+        name = type(ex).__name__
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+        last, run = self._streak
+        run = run + 1 if last == name else 1
+        self._streak = (name, run)
+        if policy.reauth_after is not None and run >= policy.reauth_after:
+            policy = Policy(REAUTH, policy.signal)
+            self._streak = (None, 0)
+
+        self.actions[policy.action] = self.actions.get(policy.action, 0) + 1
+        return policy
+
+    def ok(self) -> None:
+        """A poll went through; errors in a row start over."""
+        self._streak = (None, 0)
+
+    def snapshot(self) -> dict:
+        return {"errors": dict(self.counts), "actions": dict(self.actions)}
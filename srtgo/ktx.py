@@ -7,20 +7,34 @@ korail2.korail2
 """
 
 import base64
-try:
-    import curl_cffi
-    HAS_CURL_CFFI = True
-except ImportError:
-    import requests
-    HAS_CURL_CFFI = False
 import itertools
-import json
 import re
+import threading
 import time
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from functools import reduce
+from urllib.parse import urlencode
+
+from . import errors
+from .metrics import InstrumentedSession, Metrics, endpoint_namer
+from .netfunnel import NetFunnel, NetFunnelCancelled, drive, drive_async
+from .rows import Field, Row
+from .transport import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ConnectionStats,
+    RequestTimeout,
+    Timeouts,
+    WorkerPool,
+    export_cookies,
+    import_cookies,
+    loads,
+    new_session,
+    preconnect,
+    request,
+)
 
 
 # Constants
@@ -55,27 +69,28 @@ API_ENDPOINTS = {
 
 
 # Schedule classes
-class Schedule:
+class Schedule(Row):
     """Base class for train schedules"""
 
-    def __init__(self, data):
-        self.train_type = data.get("h_trn_clsf_cd")
-        self.train_type_name = data.get("h_trn_clsf_nm")
-        self.train_group = data.get("h_trn_gp_cd")
-        self.train_no = data.get("h_trn_no")
-        self.delay_time = data.get("h_expct_dlay_hr")
+    __slots__ = ()
+
+    train_type = Field("h_trn_clsf_cd")
+    train_type_name = Field("h_trn_clsf_nm")
+    train_group = Field("h_trn_gp_cd")
+    train_no = Field("h_trn_no")
+    delay_time = Field("h_expct_dlay_hr")
 
-        self.dep_name = data.get("h_dpt_rs_stn_nm")
-        self.dep_code = data.get("h_dpt_rs_stn_cd")
-        self.dep_date = data.get("h_dpt_dt")
-        self.dep_time = data.get("h_dpt_tm")
+    dep_name = Field("h_dpt_rs_stn_nm")
+    dep_code = Field("h_dpt_rs_stn_cd")
+    dep_date = Field("h_dpt_dt")
+    dep_time = Field("h_dpt_tm")
 
-        self.arr_name = data.get("h_arv_rs_stn_nm")
-        self.arr_code = data.get("h_arv_rs_stn_cd")
-        self.arr_date = data.get("h_arv_dt")
-        self.arr_time = data.get("h_arv_tm")
+    arr_name = Field("h_arv_rs_stn_nm")
+    arr_code = Field("h_arv_rs_stn_cd")
+    arr_date = Field("h_arv_dt")
+    arr_time = Field("h_arv_tm")
 
-        self.run_date = data.get("h_run_dt")
+    run_date = Field("h_run_dt")
 
     def __repr__(self):
         dep_time = f"{self.dep_time[:2]}:{self.dep_time[2:4]}"
@@ -95,10 +110,17 @@ class Schedule:
 class Train(Schedule):
     """Train schedule with seat availability"""
 
+    __slots__ = ("special_seat", "general_seat", "wait_reserve_flag")
+
+    reserve_possible = Field("h_rsv_psb_flg")
+    reserve_possible_name = Field("h_rsv_psb_nm")
+
+    AVAILABILITY_FIELDS = ("h_gen_rsv_cd", "h_spe_rsv_cd", "h_wait_rsv_flg")
+
     def __init__(self, data):
         super().__init__(data)
-        self.reserve_possible = data.get("h_rsv_psb_flg")
-        self.reserve_possible_name = data.get("h_rsv_psb_nm")
+
+        # Seat availability, read on every poll
         self.special_seat = data.get("h_spe_rsv_cd")
         self.general_seat = data.get("h_gen_rsv_cd")
         self.wait_reserve_flag = data.get("h_wait_rsv_flg")
@@ -141,6 +163,29 @@ class Train(Schedule):
     def has_general_waiting_list(self):
         return self.wait_reserve_flag == 9
 
+    @staticmethod
+    def identity(data):
+        """Train number, departure date and time, and route of a raw row."""
+        return (
+            data.get("h_trn_no"),
+            data.get("h_dpt_dt"),
+            data.get("h_dpt_tm"),
+            data.get("h_dpt_rs_stn_cd"),
+            data.get("h_arv_rs_stn_cd"),
+        )
+
+    @property
+    def key(self):
+        return self.identity(self._data)
+
+    def availability(self):
+        """Whether general seats, special seats and standby are open."""
+        return (
+            self.has_general_seat(),
+            self.has_special_seat(),
+            self.has_waiting_list(),
+        )
+
 
 class Ticket(Train):
     """Train ticket information"""
@@ -181,12 +226,16 @@ class Ticket(Train):
 
 
 class Reservation(Train):
-    """Train reservation information"""
+    """Train reservation information; `tickets` may be fetched on first access"""
 
-    def __init__(self, data):
+    dep_date = Field("h_run_dt")
+    arr_date = Field("h_run_dt")
+
+    def __init__(self, data, fetch_details=None):
         super().__init__(data)
-        self.dep_date = data.get("h_run_dt")
-        self.arr_date = data.get("h_run_dt")
+        self._tickets = None
+        self._wct_no = None
+        self._fetch_details = fetch_details
         self.rsv_id = data.get("h_pnr_no")
         self.seat_no_count = int(data.get("h_tot_seat_cnt"))
         self.buy_limit_date = data.get("h_ntisu_lmt_dt")
@@ -199,6 +248,36 @@ class Reservation(Train):
             self.buy_limit_date == "00000000" or self.buy_limit_time == "235959"
         )
 
+    @property
+    def tickets(self):
+        self._load_details()
+        return self._tickets
+
+    @tickets.setter
+    def tickets(self, tickets):
+        self._tickets = tickets
+
+    @property
+    def wct_no(self):
+        self._load_details()
+        return self._wct_no
+
+    @wct_no.setter
+    def wct_no(self, wct_no):
+        self._wct_no = wct_no
+
+    @property
+    def details_loaded(self):
+        return self._fetch_details is None
+
+    def set_details(self, info):
+        self._tickets, self._wct_no = info or ([], None)
+        self._fetch_details = None
+
+    def _load_details(self):
+        if self._fetch_details is not None:
+            self.set_details(self._fetch_details(self.rsv_id))
+
     def __repr__(self):
         repr_str = super().__repr__()
         repr_str += f", {self.price}원({self.seat_no_count}석)"
@@ -213,18 +292,22 @@ class Reservation(Train):
         return repr_str
 
 
-class Seat:
+class Seat(Row):
     """Train seat information"""
 
-    def __init__(self, data: dict):
-        self.car = data.get("h_srcar_no")
-        self.seat = data.get("h_seat_no")
-        self.seat_type = data.get("h_psrm_cl_nm")
-        self.passenger_type = data.get("h_psg_tp_dv_nm")
-        self.price = int(data.get("h_rcvd_amt", 0))
-        self.original_price = int(data.get("h_seat_prc", 0))
-        self.discount = int(data.get("h_dcnt_amt", 0))
-        self.is_waiting = self.seat == ""
+    __slots__ = ()
+
+    car = Field("h_srcar_no")
+    seat = Field("h_seat_no")
+    seat_type = Field("h_psrm_cl_nm")
+    passenger_type = Field("h_psg_tp_dv_nm")
+    price = Field("h_rcvd_amt", int, 0)
+    original_price = Field("h_seat_prc", int, 0)
+    discount = Field("h_dcnt_amt", int, 0)
+
+    @property
+    def is_waiting(self):
+        return self.seat == ""
 
     def __repr__(self):
         if self.is_waiting:
@@ -358,9 +441,46 @@ class ReserveOption:
     SPECIAL_ONLY = "SPECIAL_ONLY"
 
 
+# Search query
+@dataclass(frozen=True)
+class KorailSearchQuery:
+    """Schedule search encoded once by Korail.prepare_search()"""
+
+    dep: str
+    arr: str
+    date: str | None
+    time: str | None
+    train_type: str
+    include_no_seats: bool
+    include_waiting_list: bool
+    params: str
+
+    def encode(self, device, version, membership_number, now=None):
+        """Query string to send for the given client fields at `now`."""
+        volatile = {"Device": device, "Version": version}
+        if membership_number is not None:
+            volatile["mbCrdNo"] = membership_number
+        if self.date is None or self.time is None:
+            kst_now = (now or datetime.now()) + timedelta(hours=9)
+            if self.date is None:
+                volatile["txtGoAbrdDt"] = kst_now.strftime("%Y%m%d")
+            if self.time is None:
+                volatile["txtGoHour"] = kst_now.strftime("%H%M%S")
+        return f"{self.params}&{urlencode(volatile)}"
+
+    def accepts(self, train):
+        if train.has_seat():
+            return True
+        return self.include_no_seats or (
+            self.include_waiting_list and train.has_waiting_list()
+        )
+
+
 # Korail errors
 class KorailError(Exception):
-    """Base class for Korail errors"""
+    """Base class for Korail errors, with the loop's `policy` for them"""
+
+    policy = errors.UNKNOWN
 
     def __init__(self, msg, code=None):
         self.msg = msg
@@ -372,6 +492,8 @@ class KorailError(Exception):
 
 class NeedToLoginError(KorailError):
     codes = {"P058"}
+    messages = ()
+    policy = errors.LOGGED_OUT
 
     def __init__(self, code=None):
         super().__init__("Need to Login", code)
@@ -379,6 +501,8 @@ class NeedToLoginError(KorailError):
 
 class NoResultsError(KorailError):
     codes = {"P100", "WRG000000", "WRD000061", "WRT300005"}
+    messages = ()
+    policy = errors.SOLD_OUT
 
     def __init__(self, code=None):
         super().__init__("No Results", code)
@@ -386,12 +510,29 @@ class NoResultsError(KorailError):
 
 class SoldOutError(KorailError):
     codes = {"IRT010110", "ERR211161"}
+    messages = ("잔여석없음", "예약대기자한도수초과")
+    policy = errors.SOLD_OUT
 
     def __init__(self, code=None):
         super().__init__("Sold out", code)
 
 
+class OverloadError(KorailError):
+    codes = set()
+    messages = ("사용자가 많아 접속이 원활하지 않습니다",)
+    policy = errors.BUSY
+
+    def __init__(self, code=None):
+        super().__init__("Server overloaded", code)
+
+
+# Typed errors of a failed reply, matched by `h_msg_cd` or message
+RESULT_ERRORS = (NoResultsError, NeedToLoginError, SoldOutError, OverloadError)
+
+
 class NetFunnelError(Exception):
+    policy = errors.FUNNEL_FAILED
+
     def __init__(self, msg):
         self.msg = msg
 
@@ -403,10 +544,6 @@ class NetFunnelError(Exception):
 class NetFunnelHelper:
     NETFUNNEL_URL = "http://nf.letskorail.com/ts.wseq"
 
-    WAIT_STATUS_PASS = "200"
-    WAIT_STATUS_FAIL = "201"
-    ALREADY_COMPLETED = "502"
-
     OP_CODE = {
         "getTidchkEnter": "5101",
         "chkEnter": "5002",
@@ -419,61 +556,69 @@ class NetFunnelHelper:
         "User-Agent": "Apache-HttpClient/UNAVAILABLE (java 1.4)",
     }
 
-    def __init__(self):
-        if HAS_CURL_CFFI:
-            self._session = curl_cffi.Session(impersonate="chrome131_android")
-        else:
-            self._session = requests.session()
+    def __init__(self, timeouts=None, connections=None, on_progress=None, breaker=None):
+        self._session = new_session(impersonate="chrome131_android")
         self._session.headers.update(self.DEFAULT_HEADERS)
+        self.timeouts = timeouts or Timeouts()
+        self.connections = connections or ConnectionStats()
+        self.breaker = breaker or CircuitBreaker()
+        self.on_progress = on_progress
         self._cached_key = None
         self._last_fetch_time = 0
         self._cache_ttl = 50  # 50 seconds
 
-    def run(self):
-        current_time = time.time()
-        if self._is_cache_valid(current_time):
+    def run(self, on_progress=None, cancel=None, timeout=None):
+        """Return a NetFunnel key, passing the queue unless the cached one is valid"""
+        if self._is_cache_valid(time.monotonic()):
             return self._cached_key
+        with self._pass() as funnel:
+            drive(funnel, self._send, on_progress or self.on_progress, cancel, timeout)
+        return funnel.key
 
-        try:
-            status, self._cached_key, nwait = self._start()
-            self._last_fetch_time = current_time
-
-            while status == self.WAIT_STATUS_FAIL:
-                print(f"\r현재 {nwait}명 대기중...", end="", flush=True)
-                time.sleep(1)
-                status, self._cached_key, nwait = self._check()
-
-            # Try completing once
-            status, _, _ = self._complete()
-            if status == self.WAIT_STATUS_PASS or status == self.ALREADY_COMPLETED:
-                return self._cached_key
+    async def run_async(self, on_progress=None, timeout=None):
+        """Like run(), without blocking the event loop; cancel the task to abort."""
+        if self._is_cache_valid(time.monotonic()):
+            return self._cached_key
+        with self._pass() as funnel:
+            await drive_async(
+                funnel, self._send, on_progress or self.on_progress, timeout
+            )
+        return funnel.key
 
+    @contextmanager
+    def _pass(self):
+        funnel = NetFunnel()
+        fetched_at = time.monotonic()
+        try:
+            yield funnel
+        except (RequestTimeout, NetFunnelCancelled, CircuitOpenError):
             self.clear()
-            raise NetFunnelError("Failed to complete NetFunnel")
-
+            raise
         except Exception as ex:
             self.clear()
             raise NetFunnelError(str(ex))
+        else:
+            self._cached_key, self._last_fetch_time = funnel.key, fetched_at
 
     def clear(self):
         self._cached_key = None
         self._last_fetch_time = 0
 
-    def _start(self):
-        return self._make_request("getTidchkEnter")
-
-    def _check(self):
-        return self._make_request("chkEnter")
-
-    def _complete(self):
-        return self._make_request("setComplete")
-
-    def _make_request(self, opcode: str):
-        params = self._build_params(self.OP_CODE[opcode])
-        response = self._parse(
-            self._session.get(self.NETFUNNEL_URL, params=params).text
+    def _send(self, funnel):
+        return self._make_request(funnel.state, funnel.key)
+
+    def _make_request(self, opcode: str, key: str = None) -> dict:
+        params = self._build_params(self.OP_CODE[opcode], key=key)
+        r = request(
+            self._session,
+            "get",
+            self.NETFUNNEL_URL,
+            self.timeouts.get("netfunnel"),
+            self.connections,
+            self.breaker,
+            params=params,
         )
-        return response.get("status"), response.get("key"), response.get("nwait")
+        return self._parse(r.text)
 
     def _build_params(self, opcode: str, key: str = None) -> dict:
         params = {"opcode": opcode}
@@ -506,18 +651,31 @@ class NetFunnelHelper:
 
 
 class Korail:
-    """Main Korail API interface"""
+    """Main Korail API interface, shareable between threads like `srtgo.srt.SRT`"""
 
-    def __init__(self, korail_id, korail_pw, auto_login=True, verbose=False):
-        if HAS_CURL_CFFI:
-            self._session = curl_cffi.Session(impersonate="chrome131_android")
-        else:
-            self._session = requests.session()
+    def __init__(
+        self,
+        korail_id,
+        korail_pw,
+        auto_login=True,
+        verbose=False,
+        max_workers=4,
+        session_cache=None,
+        timeouts=None,
+        breaker=None,
+    ):
+        self._session = new_session(impersonate="chrome131_android")
+        self._pool = WorkerPool(max_workers, name="korail-detail")
+        self._session_cache = session_cache
         self._session.headers.update(DEFAULT_HEADERS)
+        self.timeouts = timeouts or Timeouts()
+        self.connections = ConnectionStats()
+        self.breaker = breaker or CircuitBreaker()
         self._device = "AD"
         self._version = "240531001"
         self._key = "korail1234567890"
         self._idx = None
+        self.metrics = None
         self.korail_id = korail_id
         self.korail_pw = korail_pw
         self.verbose = verbose
@@ -526,18 +684,93 @@ class Korail:
         self.name = None
         self.email = None
         self.phone_number = None
-        if auto_login:
+        self._auth_lock = threading.RLock()
+        self._logins = 0  # successful logins, to tell a stale relogin()
+        self._unconfirmed = False  # resumed, and no reply has vouched for it yet
+        if auto_login and not self._resume_session():
             self.login(korail_id, korail_pw)
 
     def _log(self, msg: str) -> None:
         if self.verbose:
             print(f"[*] {msg}")
 
+    def _log_response(self, r) -> None:
+        if self.verbose:
+            self._log(r.text)
+
+    def _get(self, kind, url, **kwargs):
+        """GET `url` with the timeouts of endpoint class `kind`."""
+        return self._request("get", kind, url, **kwargs)
+
+    def _post(self, kind, url, **kwargs):
+        """POST to `url` with the timeouts of endpoint class `kind`."""
+        return self._request("post", kind, url, **kwargs)
+
+    def _request(self, method, kind, url, **kwargs):
+        # A resumed session is checked by its first reply; log in and resend
+        # if the server turned it away
+        generation = self._logins
+        r = request(
+            self._session,
+            method,
+            url,
+            self.timeouts.get(kind),
+            self.connections,
+            self.breaker,
+            **kwargs,
+        )
+        if self._unconfirmed and self._resume_refused(r):
+            self.relogin(since=generation)
+            return self._request(method, kind, url, **kwargs)
+        return r
+
+    def _resume_refused(self, r):
+        with self._auth_lock:
+            if not self._unconfirmed:
+                return False
+            self._unconfirmed = False
+        try:
+            self._result_check(loads(r.content))
+        except NeedToLoginError:
+            return True
+        except (KorailError, ValueError):
+            pass
+        return False
+
+    def warm_up(self, netfunnel=True):
+        """Connect to the API host ahead of the next search; `netfunnel` is ignored"""
+        return preconnect(
+            self._session,
+            API_ENDPOINTS.values(),
+            self.timeouts.get("default"),
+            self.connections,
+            self.breaker,
+        )
+
+    def enable_metrics(self, metrics=None):
+        """Record every request per endpoint and return the `Metrics` recorder"""
+        self.disable_metrics()
+        self.metrics = Metrics() if metrics is None else metrics
+        self._session = InstrumentedSession(
+            self._session, self.metrics, endpoint_namer(API_ENDPOINTS)
+        )
+        return self.metrics
+
+    def disable_metrics(self):
+        """Stop recording and go back to the plain HTTP session."""
+        if self.metrics is None:
+            return
+        self._session = self._session.session
+        self.metrics = None
+
     def __enc_password(self, password):
+        from Crypto.Cipher import AES
+        from Crypto.Util.Padding import pad
+
         url = API_ENDPOINTS["code"]
         data = {"code": "app.login.cphd"}
-        r = self._session.post(url, data=data)
-        j = json.loads(r.text)
+        r = self._post("default", url, data=data)
+        j = loads(r.content)
 
         if j["strResult"] == "SUCC" and j.get("app.login.cphd"):
             self._idx = j["app.login.cphd"]["idx"]
@@ -552,58 +785,120 @@ class Korail:
         return False
 
     def login(self, korail_id=None, korail_pw=None):
-        if korail_id:
-            self.korail_id = korail_id
-        if korail_pw:
-            self.korail_pw = korail_pw
-
-        txt_input_flg = (
-            "5"
-            if EMAIL_REGEX.match(self.korail_id)
-            else "4"
-            if PHONE_NUMBER_REGEX.match(self.korail_id)
-            else "2"
-        )
+        with self._auth_lock:
+            if korail_id:
+                self.korail_id = korail_id
+            if korail_pw:
+                self.korail_pw = korail_pw
+
+            txt_input_flg = (
+                "5"
+                if EMAIL_REGEX.match(self.korail_id)
+                else "4"
+                if PHONE_NUMBER_REGEX.match(self.korail_id)
+                else "2"
+            )
 
-        data = {
-            "Device": self._device,
-            "Version": self._version,
-            "Key": self._key,
-            "txtMemberNo": self.korail_id,
-            "txtPwd": self.__enc_password(self.korail_pw),
-            "txtInputFlg": txt_input_flg,
+            data = {
+                "Device": self._device,
+                "Version": self._version,
+                "Key": self._key,
+                "txtMemberNo": self.korail_id,
+                "txtPwd": self.__enc_password(self.korail_pw),
+                "txtInputFlg": txt_input_flg,
+                "idx": self._idx,
+            }
+
+            r = self._post("default", API_ENDPOINTS["login"], data=data)
+            self._log_response(r)
+            j = loads(r.content)
+
+            if j["strResult"] == "SUCC" and j.get("strMbCrdNo"):
+                # self._key = j['Key']
+                self.membership_number = j["strMbCrdNo"]
+                self.name = j["strCustNm"]
+                self.email = j["strEmailAdr"]
+                self.phone_number = j["strCpNo"]
+                print(
+                    f"로그인 성공: {self.name} (멤버십번호: {self.membership_number}, 전화번호: {self.phone_number})"
+                )
+                self.logined = True
+                self._unconfirmed = False
+                self._logins += 1
+                if self._session_cache is not None:
+                    self._session_cache.save(
+                        "KTX", self.korail_id, self.export_session()
+                    )
+                return True
+            self.logined = False
+            return False
+
+    @property
+    def login_generation(self):
+        return self._logins
+
+    def relogin(self, since=None):
+        """Log in again on the existing session, unless a login came after `since`"""
+        with self._auth_lock:
+            if since is not None and self._logins != since and self.logined:
+                return True
+            self.logined = False
+            return self.login()
+
+    @property
+    def is_login(self):
+        return self.logined
+
+    def export_session(self):
+        """Return the cookies and login details needed to resume this session."""
+        return {
+            "cookies": export_cookies(self._session),
+            "membership_number": self.membership_number,
+            "name": self.name,
+            "email": self.email,
+            "phone_number": self.phone_number,
             "idx": self._idx,
         }
 
-        r = self._session.post(API_ENDPOINTS["login"], data=data)
-        self._log(r.text)
-        j = json.loads(r.text)
-
-        if j["strResult"] == "SUCC" and j.get("strMbCrdNo"):
-            # self._key = j['Key']
-            self.membership_number = j["strMbCrdNo"]
-            self.name = j["strCustNm"]
-            self.email = j["strEmailAdr"]
-            self.phone_number = j["strCpNo"]
-            print(
-                f"로그인 성공: {self.name} (멤버십번호: {self.membership_number}, 전화번호: {self.phone_number})"
-            )
-            self.logined = True
-            return True
-        self.logined = False
-        return False
+    def restore_session(self, state):
+        """Resume a session saved with export_session(); its first reply checks it"""
+        import_cookies(self._session, state.get("cookies", []))
+        self.membership_number = state.get("membership_number")
+        self.name = state.get("name")
+        self.email = state.get("email")
+        self.phone_number = state.get("phone_number")
+        self._idx = state.get("idx")
+        self.logined = True
+        self._unconfirmed = True
+
+    def _resume_session(self):
+        if self._session_cache is None:
+            return False
+        state = self._session_cache.load("KTX", self.korail_id)
+        if not state:
+            return False
+        self.restore_session(state)
+        print(
+            f"로그인 세션 재사용: {self.name} (멤버십번호: {self.membership_number}, 전화번호: {self.phone_number})"
+        )
+        return True
 
     def logout(self):
-        r = self._session.get(API_ENDPOINTS["logout"])
-        self._log(r.text)
-        self.logined = False
+        with self._auth_lock:
+            r = self._get("default", API_ENDPOINTS["logout"])
+            self._log_response(r)
+            self.logined = False
+            if self._session_cache is not None:
+                self._session_cache.discard("KTX", self.korail_id)
 
     def _result_check(self, j):
         if j.get("strResult") == "FAIL":
             h_msg_cd = j.get("h_msg_cd")
             h_msg_txt = j.get("h_msg_txt")
-            for error in (NoResultsError, NeedToLoginError, SoldOutError):
-                if h_msg_cd in error.codes:
+            for error in RESULT_ERRORS:
+                if h_msg_cd in error.codes or any(
+                    text in (h_msg_txt or "") for text in error.messages
+                ):
                     raise error(h_msg_cd)
             raise KorailError(h_msg_txt, h_msg_cd)
         return True
@@ -619,9 +914,31 @@ class Korail:
         include_no_seats=False,
         include_waiting_list=False,
     ):
-        kst_now = datetime.now() + timedelta(hours=9)
-        date = date or kst_now.strftime("%Y%m%d")
-        time = time or kst_now.strftime("%H%M%S")
+        return self.search(
+            self.prepare_search(
+                dep,
+                arr,
+                date,
+                time,
+                train_type,
+                passengers,
+                include_no_seats,
+                include_waiting_list,
+            )
+        )
+
+    @staticmethod
+    def prepare_search(
+        dep,
+        arr,
+        date=None,
+        time=None,
+        train_type=TrainType.ALL,
+        passengers=None,
+        include_no_seats=False,
+        include_waiting_list=False,
+    ):
+        """Encode a search_train() query once, to send with search() many times."""
         passengers = passengers or [AdultPassenger()]
         passengers = Passenger.reduce(passengers)
 
@@ -643,8 +960,6 @@ class Korail:
         }
 
         data = {
-            "Device": self._device,
-            "Version": self._version,
             "Sid": "",
             "txtMenuId": "11",
             "radJobId": "1",
@@ -652,8 +967,6 @@ class Korail:
             "txtTrnGpCd": train_type,
             "txtGoStart": dep,
             "txtGoEnd": arr,
-            "txtGoAbrdDt": date,
-            "txtGoHour": time,
             "txtPsgFlg_1": counts["adult"],
             "txtPsgFlg_2": counts["child"] + counts["toddler"],
             "txtPsgFlg_3": counts["senior"],
@@ -666,25 +979,36 @@ class Korail:
             "srtCheckYn": "N",  # SRT 함께 보기
             "rtYn": "N",  # 왕복
             "adjStnScdlOfrFlg": "N",  # 인접역 보기
-            "mbCrdNo": self.membership_number,
         }
+        if date is not None:
+            data["txtGoAbrdDt"] = date
+        if time is not None:
+            data["txtGoHour"] = time
+
+        return KorailSearchQuery(
+            dep,
+            arr,
+            date,
+            time,
+            train_type,
+            include_no_seats,
+            include_waiting_list,
+            urlencode(data),
+        )
 
-        r = self._session.get(API_ENDPOINTS["search_schedule"], params=data)
-        self._log(r.text)
-        j = json.loads(r.text)
+    def search(self, query, changes=None):
+        """Send a query from prepare_search(), tracking it in `changes` if given"""
+        params = query.encode(self._device, self._version, self.membership_number)
+        r = self._get("search", f"{API_ENDPOINTS['search_schedule']}?{params}")
+        self._log_response(r)
+        j = loads(r.content)
 
         if self._result_check(j):
-            trains = [
-                Train(info) for info in j.get("trn_infos", {}).get("trn_info", [])
-            ]
-            filter_fns = [lambda x: x.has_seat()]
-
-            if include_no_seats:
-                filter_fns.append(lambda x: not x.has_seat())
-            if include_waiting_list:
-                filter_fns.append(lambda x: x.has_waiting_list())
-
-            trains = [t for t in trains if any(f(t) for f in filter_fns)]
+            rows = j.get("trn_infos", {}).get("trn_info", [])
+            trains = (
+                map(Train, rows) if changes is None else changes.update(rows, Train)
+            )
+            trains = [t for t in trains if query.accepts(t)]
 
             if not trains:
                 raise NoResultsError()
@@ -757,9 +1081,9 @@ class Korail:
         for i, psg in enumerate(passengers, 1):
             data.update(psg.get_dict(i))
 
-        r = self._session.get(API_ENDPOINTS["reserve"], params=data)
-        self._log(r.text)
-        j = json.loads(r.text)
+        r = self._get("reserve", API_ENDPOINTS["reserve"], params=data)
+        self._log_response(r)
+        j = loads(r.content)
         if self._result_check(j):
             rsv_id = j.get("h_pnr_no")
             reservation = self.reservations(rsv_id)
@@ -780,69 +1104,76 @@ class Korail:
             "hiduserYn": "Y",
         }
 
-        r = self._session.get(API_ENDPOINTS["myticketlist"], params=data)
-        self._log(r.text)
-        j = json.loads(r.text)
+        r = self._get("default", API_ENDPOINTS["myticketlist"], params=data)
+        self._log_response(r)
+        j = loads(r.content)
         try:
             if self._result_check(j):
-                tickets = []
-                for info in j.get("reservation_list", []):
-                    ticket = Ticket(info)
-                    data = {
-                        "Device": self._device,
-                        "Version": self._version,
-                        "Key": self._key,
-                        "h_orgtk_wct_no": ticket.sale_info1,
-                        "h_orgtk_ret_sale_dt": ticket.sale_info2,
-                        "h_orgtk_sale_sqno": ticket.sale_info3,
-                        "h_orgtk_ret_pwd": ticket.sale_info4,
-                    }
-                    r = self._session.get(API_ENDPOINTS["myticketseat"], params=data)
-                    j = json.loads(r.text)
-                    if self._result_check(j):
-                        seat = (
-                            j.get("ticket_infos", {})
-                            .get("ticket_info", [{}])[0]
-                            .get("tk_seat_info", [{}])[0]
-                        )
-                        ticket.seat_no = seat.get("h_seat_no")
-                        ticket.seat_no_end = None
-                    tickets.append(ticket)
-                return tickets
+                tickets = [Ticket(info) for info in j.get("reservation_list", [])]
+                return self._pool.map(self._ticket_seat, tickets)
         except NoResultsError:
             return []
 
-    def reservations(self, rsv_id=None):
+    def _ticket_seat(self, ticket):
+        data = {
+            "Device": self._device,
+            "Version": self._version,
+            "Key": self._key,
+            "h_orgtk_wct_no": ticket.sale_info1,
+            "h_orgtk_ret_sale_dt": ticket.sale_info2,
+            "h_orgtk_sale_sqno": ticket.sale_info3,
+            "h_orgtk_ret_pwd": ticket.sale_info4,
+        }
+        r = self._get("default", API_ENDPOINTS["myticketseat"], params=data)
+        j = loads(r.content)
+        if self._result_check(j):
+            seat = (
+                j.get("ticket_infos", {})
+                .get("ticket_info", [{}])[0]
+                .get("tk_seat_info", [{}])[0]
+            )
+            ticket.seat_no = seat.get("h_seat_no")
+            ticket.seat_no_end = None
+        return ticket
+
+    def reservations(self, rsv_id=None, summary=False):
+        """List reservations, or the one matching `rsv_id`; `summary` defers details"""
         data = {
             "Device": self._device,
             "Version": self._version,
             "Key": self._key,
         }
-        r = self._session.get(API_ENDPOINTS["myreservationview"], params=data)
-        self._log(r.text)
-        j = json.loads(r.text)
+        r = self._get("default", API_ENDPOINTS["myreservationview"], params=data)
+        self._log_response(r)
+        j = loads(r.content)
         try:
             if not self._result_check(j):
                 return []
 
             jrny_info = j.get("jrny_infos", {}).get("jrny_info", [])
-            reserves = []
-
-            for info in jrny_info:
-                train_info = info.get("train_infos", {}).get("train_info", [])
-                for tinfo in train_info:
-                    reservation = Reservation(tinfo)
-                    reservation.tickets, reservation.wct_no = self.ticket_info(
-                        reservation.rsv_id
-                    )
-                    if rsv_id and reservation.rsv_id == rsv_id:
-                        return reservation
-                    reserves.append(reservation)
-            return reserves
+            reserves = [
+                Reservation(tinfo, fetch_details=self.ticket_info)
+                for info in jrny_info
+                for tinfo in info.get("train_infos", {}).get("train_info", [])
+            ]
+
+            # Only the requested reservation needs its details when it exists
+            matches = [r for r in reserves if rsv_id and r.rsv_id == rsv_id][:1]
+            if not summary:
+                self.load_details(matches or reserves)
+
+            return matches[0] if matches else reserves
 
         except NoResultsError:
             return []
 
+    def load_details(self, reservations):
+        """Fetch tickets and `wct_no` for reservations that have not loaded them."""
+        pending = [r for r in reservations if not r.details_loaded]
+        infos = self._pool.map(self.ticket_info, [r.rsv_id for r in pending])
+        for reservation, info in zip(pending, infos):
+            reservation.set_details(info)
+
     def ticket_info(self, rsv_id=None):
         data = {
             "Device": self._device,
@@ -850,9 +1181,9 @@ class Korail:
             "Key": self._key,
             "hidPnrNo": rsv_id,
         }
-        r = self._session.get(API_ENDPOINTS["myreservationlist"], params=data)
-        self._log(r.text)
-        j = json.loads(r.text)
+        r = self._get("default", API_ENDPOINTS["myreservationlist"], params=data)
+        self._log_response(r)
+        j = loads(r.content)
         try:
             if not self._result_check(j):
                 return []
@@ -901,9 +1232,9 @@ class Korail:
             "hiduserYn": "Y",
         }
 
-        r = self._session.post(API_ENDPOINTS["pay"], data=data)
-        self._log(r.text)
-        j = json.loads(r.text)
+        r = self._post("payment", API_ENDPOINTS["pay"], data=data)
+        self._log_response(r)
+        j = loads(r.content)
         if self._result_check(j):
             return True
         return False
@@ -920,9 +1251,9 @@ class Korail:
             "txtJrnyCnt": rsv.journey_cnt,
             "hidRsvChgNo": rsv.rsv_chg_no,
         }
-        r = self._session.post(API_ENDPOINTS["cancel"], data=data)
-        self._log(r.text)
-        j = json.loads(r.text)
+        r = self._post("reserve", API_ENDPOINTS["cancel"], data=data)
+        self._log_response(r)
+        j = loads(r.content)
         return self._result_check(j)
 
     def refund(self, ticket):
@@ -942,7 +1273,7 @@ class Korail:
             "latitude": "",
             "longitude": "",
         }
-        r = self._session.post(API_ENDPOINTS["refund"], data=data)
-        self._log(r.text)
-        j = json.loads(r.text)
+        r = self._post("payment", API_ENDPOINTS["refund"], data=data)
+        self._log_response(r)
+        j = loads(r.content)
         return self._result_check(j)
@@ -0,0 +1,217 @@
+"""Opt-in per-endpoint request metrics for the SRT and Korail clients.
+
+`SRT.enable_metrics()` / `Korail.enable_metrics()` wrap the client's HTTP
+session in an `InstrumentedSession` that records every call into a `Metrics`
+object. Until then the plain session is used, so there is no overhead.
+
+Examples:
+    >>> metrics = srt.enable_metrics()
+    >>> srt.search_train("수서", "부산")
+    >>> metrics.snapshot()["search_schedule"]["time"]["p50"]
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from urllib.parse import urlencode
+
+# Upper bucket bounds; values above the last bound land in an overflow bucket
+TIME_BUCKETS = (
+    0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0,
+)
+SIZE_BUCKETS = tuple(256 * 4**i for i in range(8))  # 256 B .. 4 MiB
+
+
+class Histogram:
+    """Counts of values in fixed buckets, plus count, sum, min and max.
+
+    Args:
+        bounds: Ascending upper bounds of the buckets
+    """
+
+    __slots__ = ("bounds", "counts", "count", "total", "min", "max")
+
+    def __init__(self, bounds: tuple) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p: float) -> float | None:
+        """Upper bound of the bucket holding the `p`-th percentile (capped at max)."""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": {
+                bound: count
+                for bound, count in zip(self.bounds + (float("inf"),), self.counts)
+                if count
+            },
+        }
+
+
+class EndpointStats:
+    """Everything recorded for one endpoint."""
+
+    __slots__ = ("time", "bytes_in", "bytes_out", "status", "errors", "retries")
+
+    def __init__(self) -> None:
+        self.time = Histogram(TIME_BUCKETS)
+        self.bytes_in = Histogram(SIZE_BUCKETS)
+        self.bytes_out = Histogram(SIZE_BUCKETS)
+        self.status = {}
+        self.errors = 0
+        self.retries = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.time.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            "status": dict(self.status),
+            "time": self.time.snapshot(),
+            "bytes_in": self.bytes_in.snapshot(),
+            "bytes_out": self.bytes_out.snapshot(),
+        }
+
+
+class Metrics:
+    """Thread-safe per-endpoint histograms of wall time and payload sizes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(
+        self,
+        endpoint: str,
+        status: int | None,
+        elapsed: float,
+        bytes_in: int = 0,
+        bytes_out: int = 0,
+        retry: bool = False,
+    ) -> None:
+        """Record one call; `status` is None when no response was received."""
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats()
+            stats.time.add(elapsed)
+            stats.bytes_in.add(bytes_in)
+            stats.bytes_out.add(bytes_out)
+            stats.status[status] = stats.status.get(status, 0) + 1
+            if status is None or status >= 400:
+                stats.errors += 1
+            if retry:
+                stats.retries += 1
+
+    def snapshot(self) -> dict:
+        """Return `{endpoint: stats}` as plain dicts, safe to keep or serialize."""
+        with self._lock:
+            return {name: stats.snapshot() for name, stats in self._endpoints.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+
+def _encoded_size(value) -> int:
+    if not value:
+        return 0
+    if isinstance(value, dict):
+        return len(urlencode(value))
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(value)
+
+
+class InstrumentedSession:
+    """Session wrapper that records each `get`/`post` into `metrics`.
+
+    Any other attribute (headers, cookies, ...) is the wrapped session's. A
+    call counts as a retry when the previous call from the same thread went
+    to the same endpoint and failed.
+
+    Args:
+        session: Session to wrap
+        metrics: Where to record
+        name_for: Maps `(url, params)` to an endpoint name
+    """
+
+    def __init__(self, session, metrics: Metrics, name_for) -> None:
+        self.session = session
+        self.metrics = metrics
+        self._name_for = name_for
+        self._last = threading.local()
+
+    def __getattr__(self, name: str):
+        return getattr(self.session, name)
+
+    def get(self, url, **kwargs):
+        return self._call(self.session.get, url, kwargs)
+
+    def post(self, url, **kwargs):
+        return self._call(self.session.post, url, kwargs)
+
+    def _call(self, method, url, kwargs):
+        endpoint = self._name_for(url, kwargs.get("params"))
+        retry = getattr(self._last, "failed", None) == endpoint
+        bytes_out = _encoded_size(kwargs.get("data")) + _encoded_size(
+            kwargs.get("params")
+        )
+
+        status, bytes_in = None, 0
+        start = time.perf_counter()
+        try:
+            r = method(url, **kwargs)
+            status, bytes_in = r.status_code, len(r.content)
+            return r
+        finally:
+            self.metrics.record(
+                endpoint,
+                status,
+                time.perf_counter() - start,
+                bytes_in,
+                bytes_out,
+                retry,
+            )
+            self._last.failed = endpoint if status is None or status >= 400 else None
+
+
+def endpoint_namer(endpoints: dict):
+    """Name URLs after their key in `endpoints` (read at call time)."""
+
+    def name_for(url, params=None):
+        url = url.split("?", 1)[0]
+        for name, endpoint in endpoints.items():
+            if endpoint == url:
+                return name
+        return url
+
+    return name_for
@@ -0,0 +1,317 @@
+"""NetFunnel queue protocol as a state machine, with sync and asyncio drivers.
+
+A pass is `getTidchkEnter`, then `chkEnter` for as long as the server answers
+"wait" (201), then `setComplete`. `NetFunnel` does no I/O: it says which step
+to send next, to which host, and how long to wait first. A driver does the
+waiting and calls `send(funnel)`, which performs the request and returns the
+parsed reply. Queue progress goes to an `on_progress(funnel)` callback instead
+of the terminal, and both drivers can be cancelled or given a timeout.
+"""
+
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from .transport import RequestTimeout, remaining
+
+WAIT_STATUS_PASS = "200"
+WAIT_STATUS_FAIL = "201"
+ALREADY_COMPLETED = "502"
+
+START = "getTidchkEnter"
+CHECK = "chkEnter"
+COMPLETE = "setComplete"
+DONE = "done"
+
+
+class NetFunnelCancelled(Exception):
+    """The caller cancelled the NetFunnel wait."""
+
+
+class NetFunnelFailed(Exception):
+    """The server did not let the pass complete."""
+
+
+class NetFunnel:
+    """One NetFunnel pass.
+
+    Between queue checks the machine waits for the `ttl` the server sends
+    with each "wait" reply, or `interval` seconds when it sends none.
+
+    Args:
+        interval: Seconds between queue checks when the server sets no ttl
+        max_interval: Longest wait between queue checks
+
+    Attributes:
+        state: Step to send next (START, CHECK, COMPLETE), or DONE
+        key: Funnel key of the pass
+        ip: Host the server sent the next step to (None for the default)
+        nwait: Queue position from the last reply
+        checks: Queue checks sent so far
+        delay: Seconds to wait before sending `state`
+        waited: Seconds the driver has spent waiting in the queue
+        network: Seconds the driver has spent in `send`
+    """
+
+    def __init__(self, interval: float = 1.0, max_interval: float = 10.0) -> None:
+        self.interval = interval
+        self.max_interval = max_interval
+        self.state = START
+        self.key = None
+        self.ip = None
+        self.nwait = None
+        self.checks = 0
+        self.delay = 0.0
+        self.waited = 0.0
+        self.network = 0.0
+
+    @property
+    def done(self) -> bool:
+        return self.state == DONE
+
+    @property
+    def queued(self) -> bool:
+        """Whether the pass holds a place in the queue it can come back to."""
+        return self.state == CHECK
+
+    def resume(self, paused: float) -> None:
+        """Take `paused` seconds spent away from the queue off the next wait."""
+        self.delay = max(0.0, self.delay - paused)
+
+    def feed(self, reply: dict) -> None:
+        """Advance with the parsed reply to the step just sent.
+
+        Raises:
+            NetFunnelFailed: If the server refused to complete the pass
+        """
+        status = reply.get("status")
+        if self.state == CHECK:
+            self.checks += 1
+        if self.state == COMPLETE:
+            if status not in (WAIT_STATUS_PASS, ALREADY_COMPLETED):
+                raise NetFunnelFailed("Failed to complete NetFunnel")
+            self.state, self.delay = DONE, 0.0
+            return
+
+        self.key = reply.get("key")
+        self.ip = reply.get("ip")
+        try:
+            self.nwait = int(reply.get("nwait"))
+        except (TypeError, ValueError):
+            self.nwait = None
+        if status == WAIT_STATUS_FAIL:
+            self.state, self.delay = CHECK, self._next_interval(reply)
+        else:
+            self.state, self.delay = COMPLETE, 0.0
+
+    def _next_interval(self, reply: dict) -> float:
+        try:
+            ttl = float(reply.get("ttl") or 0)
+        except ValueError:
+            ttl = 0.0
+        return min(ttl if ttl > 0 else self.interval, self.max_interval)
+
+
+class KeyLifetime:
+    """How long a NetFunnel key stays valid, learned from the server.
+
+    Ages are measured on the monotonic clock. A key older than `ttl` is
+    treated as expired. Each rejection of a key at age `a` lowers `ttl` to
+    `margin * a`, and the smallest such age caps every later estimate. If a
+    key was still accepted close to its `ttl` when it expired, `ttl` grows
+    by `step`, up to the cap (or `max_ttl` before any rejection).
+
+    Args:
+        ttl: Initial estimate in seconds
+        min_ttl: Shortest estimate
+        max_ttl: Longest estimate
+        margin: Fraction of a rejected key's age to trust
+        step: Seconds added when a key outlived the estimate
+
+    Attributes:
+        issued: Keys obtained
+        reused: Times a key was handed out again before expiring
+        expired: Keys dropped because they reached `ttl`
+        rejected: Keys the server refused
+        limit: Youngest age at which a key was refused, if any
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        min_ttl: float = 5.0,
+        max_ttl: float = 120.0,
+        margin: float = 0.9,
+        step: float = 2.0,
+    ) -> None:
+        self.ttl = ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.margin = margin
+        self.step = step
+        self.issued = 0
+        self.reused = 0
+        self.expired = 0
+        self.rejected = 0
+        self.limit = None
+        self._issued_at = None
+        self._accepted_age = 0.0
+
+    def age(self) -> float | None:
+        if self._issued_at is None:
+            return None
+        return time.monotonic() - self._issued_at
+
+    def start(self, issued_at: float | None = None) -> None:
+        """Track a new key, obtained at `issued_at` (monotonic, default now)."""
+        self._issued_at = time.monotonic() if issued_at is None else issued_at
+        self._accepted_age = 0.0
+        self.issued += 1
+
+    def fresh(self) -> bool:
+        """Whether the current key can be reused; counts the reuse or expiry."""
+        age = self.age()
+        if age is None:
+            return False
+        if age < self.ttl:
+            self.reused += 1
+            return True
+        if self._accepted_age >= self.ttl - self.step:
+            self.ttl = min(self.ttl + self.step, self._ceiling())
+        self.expired += 1
+        self._issued_at = None
+        return False
+
+    def accept(self) -> None:
+        """The server accepted the current key."""
+        age = self.age()
+        if age is not None:
+            self._accepted_age = max(self._accepted_age, age)
+
+    def reject(self) -> None:
+        """The server refused the current key; drop it and learn its age."""
+        age = self.age()
+        self._issued_at = None
+        if age is None:
+            return
+        self.rejected += 1
+        self.limit = age if self.limit is None else min(self.limit, age)
+        self.ttl = max(self.min_ttl, min(self.ttl, self.margin * age))
+
+    def drop(self) -> None:
+        self._issued_at = None
+
+    def snapshot(self) -> dict:
+        return {
+            "ttl": self.ttl,
+            "issued": self.issued,
+            "reused": self.reused,
+            "expired": self.expired,
+            "rejected": self.rejected,
+            "limit": self.limit,
+        }
+
+    def _ceiling(self) -> float:
+        if self.limit is None:
+            return self.max_ttl
+        return max(self.min_ttl, self.margin * self.limit)
+
+
+def _budget(delay: float, end: float | None) -> None:
+    # Refuse a wait that would overrun the timeout or the transport deadline
+    left = remaining()
+    if end is not None:
+        until_end = end - time.monotonic()
+        left = until_end if left is None else min(left, until_end)
+    if left is not None and left < delay:
+        raise RequestTimeout("NetFunnel queue wait would overrun the deadline")
+
+
+def drive(
+    funnel: NetFunnel,
+    send,
+    on_progress=None,
+    cancel: threading.Event | None = None,
+    timeout: float | None = None,
+) -> str:
+    """Drive `funnel` to completion on the calling thread; returns the key.
+
+    Args:
+        funnel: Pass to drive
+        send: `send(funnel)` sends `funnel.state` and returns the parsed reply
+        on_progress: Called with `funnel` after every "wait" reply
+        cancel: Event that aborts the wait when set
+        timeout: Seconds the whole pass may take
+
+    Raises:
+        NetFunnelCancelled: If `cancel` was set
+        RequestTimeout: If the pass would overrun `timeout` or the deadline
+        NetFunnelFailed: If the server refused to complete the pass
+    """
+    end = None if timeout is None else time.monotonic() + timeout
+    while not funnel.done:
+        if funnel.delay:
+            _budget(funnel.delay, end)
+            start = time.monotonic()
+            if cancel is None:
+                time.sleep(funnel.delay)
+            elif cancel.wait(funnel.delay):
+                raise NetFunnelCancelled("NetFunnel wait cancelled")
+            funnel.waited += time.monotonic() - start
+            funnel.delay = 0.0
+        if cancel is not None and cancel.is_set():
+            raise NetFunnelCancelled("NetFunnel wait cancelled")
+        start = time.monotonic()
+        reply = send(funnel)
+        funnel.network += time.monotonic() - start
+        funnel.feed(reply)
+        if funnel.state == CHECK and on_progress is not None:
+            on_progress(funnel)
+    return funnel.key
+
+
+async def drive_async(
+    funnel: NetFunnel, send, on_progress=None, timeout: float | None = None
+) -> str:
+    """Drive `funnel` without blocking the event loop; returns the key.
+
+    Requests run in a worker thread and waits are `asyncio.sleep`, so other
+    tasks keep running. Cancel the awaiting task to abort the pass.
+
+    Raises:
+        RequestTimeout: If the pass would overrun `timeout` or the deadline
+        NetFunnelFailed: If the server refused to complete the pass
+    """
+    import asyncio
+
+    end = None if timeout is None else time.monotonic() + timeout
+    while not funnel.done:
+        if funnel.delay:
+            _budget(funnel.delay, end)
+            start = time.monotonic()
+            await asyncio.sleep(funnel.delay)
+            funnel.waited += time.monotonic() - start
+            funnel.delay = 0.0
+        start = time.monotonic()
+        reply = await asyncio.to_thread(send, funnel)
+        funnel.network += time.monotonic() - start
+        funnel.feed(reply)
+        if funnel.state == CHECK and on_progress is not None:
+            on_progress(funnel)
+    return funnel.key
+
+
+@asynccontextmanager
+async def hold_async(lock: threading.Lock, poll: float = 0.01):
+    """`with lock:` for a coroutine, polling so the event loop keeps running.
+
+    Cancelling the task while it waits leaves the lock alone.
+    """
+    import asyncio
+
+    while not lock.acquire(blocking=False):
+        await asyncio.sleep(poll)
+    try:
+        yield
+    finally:
+        lock.release()
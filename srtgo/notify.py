@@ -0,0 +1,170 @@
+"""Background Telegram notifier.
+
+One `telegram.Bot` and one event loop live on a daemon thread for the whole
+session, so `send()` only appends to a queue and returns immediately; the
+booking loop never waits for a Bot API round trip.
+"""
+
+import asyncio
+import threading
+from collections import deque
+
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+
+class TelegramNotifier:
+    """Queue messages and deliver them from a long-lived background bot.
+
+    Messages arriving within `coalesce_delay` seconds of each other are sent
+    as a single Telegram message. At most `max_queue` messages are kept; when
+    the queue is full the oldest one is dropped.
+
+    Args:
+        token: Bot token
+        chat_id: Chat to send to
+        base_url: Bot API base URL (default: Telegram's own)
+        max_queue: Maximum number of undelivered messages
+        coalesce_delay: Seconds to wait for more messages before sending
+
+    Examples:
+        >>> notifier = TelegramNotifier(TOKEN, CHAT_ID)
+        >>> notifier.send("예매 성공")
+        >>> notifier.close()
+    """
+
+    def __init__(
+        self,
+        token: str,
+        chat_id: str,
+        base_url: str | None = None,
+        max_queue: int = 100,
+        coalesce_delay: float = 0.5,
+    ) -> None:
+        self.token = token
+        self.chat_id = chat_id
+        self.base_url = base_url
+        self.coalesce_delay = coalesce_delay
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.last_error = None
+
+        self._pending = deque(maxlen=max_queue)
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = None
+        self._loop = None
+        self._wakeup = None
+        self._bot = None
+        self._initialized = None
+        self._closing = False
+
+    def start(self) -> "TelegramNotifier":
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=asyncio.run,
+                    args=(self._run(),),
+                    name="srtgo-telegram",
+                    daemon=True,
+                )
+                self._thread.start()
+        self._ready.wait()
+        return self
+
+    def send(self, text: str) -> None:
+        """Queue `text` for delivery without waiting for it to be sent."""
+        self.start()
+        with self._lock:
+            if self._closing:
+                return
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append(text)
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def send_now(self, text: str, timeout: float | None = 30) -> None:
+        """Send `text` immediately and wait for the result.
+
+        Raises:
+            telegram.error.TelegramError: If the Bot API rejects the message
+        """
+        self.start()
+        asyncio.run_coroutine_threadsafe(self._deliver(text), self._loop).result(
+            timeout
+        )
+
+    def close(self, timeout: float | None = 10) -> None:
+        """Deliver whatever is still queued and stop the background thread."""
+        with self._lock:
+            if self._thread is None or self._closing:
+                return
+            self._closing = True
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+        self._thread.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def _run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        # Callers only need the loop. Nothing scheduled on it runs before the
+        # first await below, by which time the bot exists; its handshake
+        # finishes in the background and the first delivery waits for it.
+        self._ready.set()
+
+        import telegram
+
+        kwargs = {"base_url": self.base_url} if self.base_url else {}
+        self._bot = telegram.Bot(token=self.token, **kwargs)
+        self._initialized = asyncio.create_task(self._bot.initialize())
+
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                if not self._closing and self.coalesce_delay:
+                    await asyncio.sleep(self.coalesce_delay)
+
+                with self._lock:
+                    messages = list(self._pending)
+                    self._pending.clear()
+                for chunk in self._coalesce(messages):
+                    try:
+                        await self._deliver(chunk)
+                    except Exception as ex:
+                        self.failed += 1
+                        self.last_error = ex
+
+                if self._closing and not self._pending:
+                    break
+        finally:
+            try:
+                await self._bot.shutdown()
+            except Exception:
+                pass
+
+    async def _deliver(self, text: str) -> None:
+        if self._initialized.done() and self._initialized.exception():
+            self._initialized = asyncio.create_task(self._bot.initialize())
+        await self._initialized
+        await self._bot.send_message(chat_id=self.chat_id, text=text)
+        self.sent += 1
+
+    @staticmethod
+    def _coalesce(messages: list[str]) -> list[str]:
+        chunks, current = [], ""
+        for message in messages:
+            message = message[:TELEGRAM_MAX_MESSAGE_LENGTH]
+            candidate = f"{current}\n\n{message}" if current else message
+            if len(candidate) > TELEGRAM_MAX_MESSAGE_LENGTH:
+                chunks.append(current)
+                candidate = message
+            current = candidate
+        if current:
+            chunks.append(current)
+        return chunks
@@ -0,0 +1,246 @@
+"""Phase-level profiling of the reservation loop (`srtgo --profile`).
+
+Each loop iteration is split into phases: terminal output, `search_train`,
+the availability check, the reservation itself and the sleep between polls.
+Network time inside them comes from the client's request metrics (see
+`srtgo.metrics`), so a slow search can be told apart into NetFunnel, the
+search request and client-side work ("parse": JSON decoding and models).
+"""
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from .metrics import Metrics
+
+PHASES = (
+    "iteration",
+    "output",
+    "search",
+    "netfunnel",
+    "request",
+    "parse",
+    "check",
+    "reserve",
+    "sleep",
+)
+
+
+def percentile(ordered: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+class _PhaseMetrics(Metrics):
+    """Request metrics that also feed the profiler's current iteration."""
+
+    def __init__(self, profiler: "LoopProfiler") -> None:
+        super().__init__()
+        self._profiler = profiler
+
+    def record(self, endpoint, status, elapsed, *args, **kwargs) -> None:
+        super().record(endpoint, status, elapsed, *args, **kwargs)
+        self._profiler.add_request(endpoint, elapsed)
+
+
+class LoopProfiler:
+    """Collect per-iteration phase timings, and optionally a cProfile capture.
+
+    Args:
+        cpu: Also run cProfile while the loop is running
+        top: Number of functions in the hot-function table
+        clock: Time source for phase timings
+
+    Examples:
+        >>> profiler = LoopProfiler(cpu=True)
+        >>> reserve_loop(rail, ..., profiler=profiler)
+        >>> print(profiler.summary())
+    """
+
+    def __init__(self, cpu: bool = False, top: int = 15, clock=time.perf_counter):
+        self.cpu = cpu
+        self.top = top
+        self.clock = clock
+        self.iterations = 0
+        self.samples = {phase: [] for phase in PHASES}
+        self.metrics = _PhaseMetrics(self)
+
+        self._lock = threading.Lock()
+        self._current = None
+        self._open_phase = None
+        self._search_network = 0.0
+        self._rail = None
+        self._schedulers = []
+        self._errors = None
+        self._cprofile = None
+
+    def attach(self, rail) -> None:
+        """Route `rail`'s request timings into the profile (once per client)."""
+        if rail is self._rail:
+            return
+        self._rail = rail
+        if getattr(rail, "metrics", None) is not self.metrics:
+            rail.enable_metrics(self.metrics)
+
+    def attach_scheduler(self, scheduler) -> None:
+        """Include `scheduler`'s wait decisions in the summary."""
+        if scheduler not in self._schedulers:
+            self._schedulers.append(scheduler)
+
+    def attach_errors(self, errors) -> None:
+        """Include an `ErrorCounter`'s counts in the summary."""
+        self._errors = errors
+
+    @contextmanager
+    def iteration(self):
+        with self._lock:
+            self._current = {}
+            self._search_network = 0.0
+        if self.cpu:
+            if self._cprofile is None:
+                import cProfile
+
+                self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        start = self.clock()
+        try:
+            yield
+        finally:
+            elapsed = self.clock() - start
+            if self._cprofile is not None:
+                self._cprofile.disable()
+            with self._lock:
+                current, self._current = self._current, None
+                if "search" in current:
+                    current["parse"] = max(
+                        0.0, current["search"] - self._search_network
+                    )
+                current["iteration"] = elapsed
+                for phase, value in current.items():
+                    self.samples[phase].append(value)
+                self.iterations += 1
+
+    @contextmanager
+    def phase(self, name: str):
+        self._open_phase = name
+        start = self.clock()
+        try:
+            yield
+        finally:
+            elapsed = self.clock() - start
+            self._open_phase = None
+            with self._lock:
+                if self._current is not None:
+                    self._current[name] = self._current.get(name, 0.0) + elapsed
+
+    def add_request(self, endpoint: str, elapsed: float) -> None:
+        phase = "netfunnel" if endpoint.startswith("netfunnel") else "request"
+        with self._lock:
+            if self._current is None:
+                return
+            self._current[phase] = self._current.get(phase, 0.0) + elapsed
+            if self._open_phase == "search":
+                self._search_network += elapsed
+
+    def summary(self) -> str:
+        """Phase percentiles and, with `cpu`, the top functions by own time."""
+        lines = [
+            f"== 예매 루프 프로파일 ({self.iterations}회)",
+            f"  {'phase':<10s} {'count':>6s} {'total s':>9s}"
+            f" {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}",
+        ]
+        with self._lock:
+            samples = {phase: sorted(values) for phase, values in self.samples.items()}
+        for phase, values in samples.items():
+            if not values:
+                continue
+            lines.append(
+                f"  {phase:<10s} {len(values):6d} {sum(values):9.3f}"
+                + "".join(
+                    f" {percentile(values, p) * 1000:9.2f}" for p in (50, 95, 99)
+                )
+            )
+
+        for scheduler in self._schedulers:
+            stats = scheduler.stats()
+            lines.append(
+                f"  대기 결정: {stats['waits']}회, {stats['waited']:.1f}s, "
+                + ", ".join(f"{k}={v}" for k, v in stats["reasons"].items())
+                + " / 신호: "
+                + ", ".join(f"{k}={v}" for k, v in stats["signals"].items())
+            )
+
+        if self._errors is not None and self._errors.counts:
+            stats = self._errors.snapshot()
+            lines.append(
+                "  오류: "
+                + ", ".join(f"{k}={v}" for k, v in stats["errors"].items())
+                + " / 처리: "
+                + ", ".join(f"{k}={v}" for k, v in stats["actions"].items())
+            )
+
+        netfunnel_stats = getattr(self._rail, "netfunnel_stats", None)
+        if netfunnel_stats is not None:
+            funnel = netfunnel_stats()
+            keys = funnel["keys"]
+            lines.append(
+                f"  NetFunnel: 통과 {funnel['runs']}회 (캐시 {funnel['cached']}회), "
+                f"네트워크 {funnel['network']:.3f}s, 대기열 {funnel['queue']:.3f}s"
+            )
+            lines.append(
+                f"  NetFunnel 키: 수명 {keys['ttl']:.0f}s, 발급 {keys['issued']}, "
+                f"재사용 {keys['reused']}, 만료 {keys['expired']}, "
+                f"거부 {keys['rejected']}"
+            )
+
+        connections = getattr(self._rail, "connections", None)
+        if connections is not None:
+            for host, counts in connections.snapshot().items():
+                lines.append(
+                    f"  연결 {host}: 요청 {counts['requests']}회, "
+                    f"재사용 {counts['reused']}, 신규 {counts['new']}"
+                )
+
+        breaker = getattr(self._rail, "breaker", None)
+        if breaker is not None:
+            for host, circuit in breaker.snapshot().items():
+                lines.append(
+                    f"  차단기 {host}: {circuit['state']}, "
+                    f"열림 {circuit['opened']}회, 시험 {circuit['probes']}회, "
+                    f"차단 {circuit['rejected']}회"
+                )
+
+        if self._cprofile is not None:
+            import io
+            import pstats
+
+            stream = io.StringIO()
+            stats = pstats.Stats(self._cprofile, stream=stream)
+            stats.sort_stats("tottime").print_stats(self.top)
+            lines.append(f"== 상위 {self.top}개 함수 (cProfile, tottime)")
+            lines.append(stream.getvalue().strip("\n"))
+        return "\n".join(lines)
+
+
+class _NullProfiler:
+    """Stand-in used when profiling is off; every hook is a no-op."""
+
+    _context = nullcontext()
+
+    def attach(self, rail) -> None:
+        pass
+
+    def attach_scheduler(self, scheduler) -> None:
+        pass
+
+    def attach_errors(self, errors) -> None:
+        pass
+
+    def iteration(self):
+        return self._context
+
+    def phase(self, name: str):
+        return self._context
+
+
+NULL_PROFILER = _NullProfiler()
@@ -0,0 +1,59 @@
+"""Compact model classes backed by raw API rows.
+
+Search responses are parsed on every poll and most of the resulting trains are
+thrown away a second later, so models keep the row dict they were built from
+and only decode a field when it is read.
+"""
+
+
+class Field:
+    """Read `key` from the instance's raw row on access.
+
+    Args:
+        key: Key in the raw row
+        decode: Applied to the raw value on every access (e.g. `int`)
+        default: Raw value used when `key` is missing
+    """
+
+    __slots__ = ("key", "decode", "default", "name")
+
+    def __init__(self, key: str, decode=None, default=None) -> None:
+        self.key = key
+        self.decode = decode
+        self.default = default
+        self.name = key
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        value = obj._data.get(self.key, self.default)
+        return value if self.decode is None else self.decode(value)
+
+
+class Row:
+    """Base for models that wrap a raw API row; see `Field`."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict) -> None:
+        self._data = data
+
+    @property
+    def raw(self) -> dict:
+        """The row this object was built from."""
+        return self._data
+
+    @classmethod
+    def fields(cls) -> dict[str, Field]:
+        """All `Field`s declared on the class and its bases, by attribute name."""
+        found = {}
+        for klass in reversed(cls.__mro__):
+            found.update(
+                (name, value)
+                for name, value in vars(klass).items()
+                if isinstance(value, Field)
+            )
+        return found
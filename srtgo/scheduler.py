@@ -0,0 +1,184 @@
+"""Poll scheduling for the reservation loop.
+
+`reserve_loop` asks a `PollScheduler` how long to wait before the next search
+and tells it what the last attempt ran into. The scheduler backs off while the
+server reports overload or requests keep failing, and returns to its normal
+pace once answers are clean again.
+"""
+
+import random
+import time
+from collections import deque
+
+OK = "ok"  # Clean answer, including sold out
+OVERLOAD = "overload"  # "사용자가 많아 접속이 원활하지 않습니다", NetFunnel rejection
+ERROR = "error"  # Connection errors, unparseable or unexpected responses
+TIMEOUT = "timeout"  # Request timeout or iteration deadline exceeded
+SIGNALS = (OK, OVERLOAD, ERROR, TIMEOUT)
+
+
+class SimulatedClock:
+    """Manual clock: `sleep()` advances `now` instead of blocking.
+
+    Pass the instance as `clock` and its `sleep` as `sleep` to drive a
+    `PollScheduler` deterministically.
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += max(0.0, seconds)
+
+
+class PollScheduler:
+    """Gamma-distributed poll interval with backoff, cool-down and a rate cap.
+
+    The base interval is `gammavariate(shape, scale) + minimum`. Every overload,
+    error or timeout signal raises the backoff level by one, which multiplies the
+    interval by `backoff ** level` (at most `max_delay`). Each clean answer
+    lowers the level by one, but not within `cooldown` seconds of the last
+    overload. `max_rate` caps searches per second whatever was drawn.
+
+    Args:
+        shape: Gamma shape of the base interval
+        scale: Gamma scale of the base interval (seconds)
+        minimum: Added to every base interval (seconds)
+        backoff: Interval multiplier per backoff level
+        max_level: Highest backoff level
+        max_delay: Longest single wait (seconds)
+        cooldown: Seconds after an overload before the level may drop
+        max_rate: Maximum searches per second (None for no cap)
+        idle_interval: Seconds between `idle` calls during a long `wait()`
+        clock: Monotonic time source
+        sleep: Sleep function matching `clock`
+        rng: Random source for the interval
+        history: Number of recent decisions kept in `decisions`
+
+    Examples:
+        >>> clock = SimulatedClock()
+        >>> scheduler = PollScheduler(clock=clock, sleep=clock.sleep, rng=random.Random(0))
+        >>> scheduler.record(OVERLOAD)
+        >>> scheduler.wait()
+    """
+
+    def __init__(
+        self,
+        shape: float = 4,
+        scale: float = 0.25,
+        minimum: float = 0.25,
+        backoff: float = 2.0,
+        max_level: int = 4,
+        max_delay: float = 30.0,
+        cooldown: float = 10.0,
+        max_rate: float | None = 2.0,
+        idle_interval: float = 10.0,
+        clock=time.monotonic,
+        sleep=time.sleep,
+        rng: random.Random | None = None,
+        history: int = 100,
+    ) -> None:
+        self.shape = shape
+        self.scale = scale
+        self.minimum = minimum
+        self.backoff = backoff
+        self.max_level = max_level
+        self.max_delay = max_delay
+        self.cooldown = cooldown
+        self.max_rate = max_rate
+        self.idle_interval = idle_interval
+        self.on_decision = None
+
+        self.level = 0
+        self.waits = 0
+        self.waited = 0.0
+        self.signals = dict.fromkeys(SIGNALS, 0)
+        self.reasons = {"base": 0, "backoff": 0, "rate": 0, "hold": 0}
+        self.decisions = deque(maxlen=history)
+
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._last_signal = None
+        self._last_poll = None
+        self._cooldown_until = None
+
+    def record(self, signal: str) -> None:
+        """Report the outcome of the last attempt (one of `SIGNALS`)."""
+        if signal not in self.signals:
+            raise ValueError(f"Unknown signal: {signal}")
+        now = self._clock()
+        self.signals[signal] += 1
+        self._last_signal = signal
+        if signal == OK:
+            if self.level and (
+                self._cooldown_until is None or now >= self._cooldown_until
+            ):
+                self.level -= 1
+        else:
+            self.level = min(self.level + 1, self.max_level)
+            if signal == OVERLOAD:
+                self._cooldown_until = now + self.cooldown
+
+    def next_delay(self, hold: float = 0.0) -> float:
+        """Decide the wait before the next search, and record the decision.
+
+        The wait is at least `hold` seconds, e.g. until a circuit breaker
+        lets the next request through.
+        """
+        now = self._clock()
+        base = self._rng.gammavariate(self.shape, self.scale) + self.minimum
+        delay = min(base * self.backoff**self.level, self.max_delay)
+        reason = "backoff" if self.level else "base"
+        if self.max_rate and self._last_poll is not None:
+            earliest = self._last_poll + 1 / self.max_rate - now
+            if earliest > delay:
+                delay, reason = earliest, "rate"
+        if hold > delay:
+            delay, reason = hold, "hold"
+
+        decision = {
+            "time": now,
+            "delay": delay,
+            "base": base,
+            "level": self.level,
+            "reason": reason,
+            "signal": self._last_signal,
+        }
+        self.decisions.append(decision)
+        self.reasons[reason] += 1
+        self.waits += 1
+        self.waited += delay
+        if self.on_decision is not None:
+            self.on_decision(decision)
+        return delay
+
+    def wait(self, idle=None, hold: float = 0.0) -> float:
+        """Sleep until the next search may start; returns the delay.
+
+        During a wait longer than `idle_interval`, `idle()` is called every
+        `idle_interval` seconds, e.g. to keep connections from going stale.
+        The wait is at least `hold` seconds (see `next_delay`).
+        """
+        delay = self.next_delay(hold)
+        end = self._clock() + delay
+        if idle is not None and self.idle_interval:
+            while end - self._clock() > self.idle_interval:
+                self._sleep(self.idle_interval)
+                idle()
+        self._sleep(max(0.0, end - self._clock()))
+        self._last_poll = self._clock()
+        return delay
+
+    def stats(self) -> dict:
+        return {
+            "level": self.level,
+            "waits": self.waits,
+            "waited": self.waited,
+            "signals": dict(self.signals),
+            "reasons": dict(self.reasons),
+            "last": self.decisions[-1] if self.decisions else None,
+        }
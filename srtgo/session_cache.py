@@ -0,0 +1,99 @@
+"""Encrypted on-disk cache of login sessions.
+
+Clients given a `SessionCache` save their cookies and login details after
+each login and, on the next start, reuse them instead of logging in again as
+long as the server still accepts the session. The file is encrypted with
+AES-GCM under a key kept outside it (the CLI keeps it in the keyring).
+"""
+
+import base64
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+
+def default_path() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "srtgo" / "sessions.bin"
+
+
+class SessionCache:
+    """Login sessions per rail and account, in one encrypted file.
+
+    Args:
+        key: 32-byte AES key, e.g. from `SessionCache.new_key()`
+        path: Cache file (default: `$XDG_CACHE_HOME/srtgo/sessions.bin`)
+        max_age: Seconds after which a saved session is ignored
+
+    Examples:
+        >>> cache = SessionCache(key)
+        >>> srt = SRT(srt_id, srt_pw, session_cache=cache)  # resumes if it can
+    """
+
+    def __init__(
+        self, key: bytes, path: str | Path | None = None, max_age: float = 12 * 3600
+    ) -> None:
+        if len(key) != 32:
+            raise ValueError("Session cache key must be 32 bytes")
+        self.key = key
+        self.path = Path(path) if path else default_path()
+        self.max_age = max_age
+
+    @staticmethod
+    def new_key() -> bytes:
+        return os.urandom(32)
+
+    def load(self, rail: str, user_id: str) -> dict | None:
+        """Return the saved session of `user_id` on `rail`, if still fresh."""
+        entry = self._read().get(f"{rail}:{user_id}")
+        if not entry or time.time() - entry.get("saved_at", 0) > self.max_age:
+            return None
+        return entry.get("state")
+
+    def save(self, rail: str, user_id: str, state: dict) -> None:
+        entries = self._read()
+        entries[f"{rail}:{user_id}"] = {"saved_at": time.time(), "state": state}
+        self._write(entries)
+
+    def discard(self, rail: str, user_id: str) -> None:
+        entries = self._read()
+        if entries.pop(f"{rail}:{user_id}", None) is not None:
+            self._write(entries)
+
+    def _read(self) -> dict:
+        from Crypto.Cipher import AES
+
+        try:
+            blob = self.path.read_bytes()
+            nonce, tag, ciphertext = blob[:12], blob[12:28], blob[28:]
+            cipher = AES.new(self.key, AES.MODE_GCM, nonce=nonce)
+            return json.loads(cipher.decrypt_and_verify(ciphertext, tag))
+        except (OSError, ValueError):
+            # Missing, truncated, tampered with or written under another key
+            return {}
+
+    def _write(self, entries: dict) -> None:
+        from Crypto.Cipher import AES
+
+        cipher = AES.new(self.key, AES.MODE_GCM, nonce=os.urandom(12))
+        ciphertext, tag = cipher.encrypt_and_digest(json.dumps(entries).encode())
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".sessions-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(cipher.nonce + tag + ciphertext)
+            os.chmod(tmp, 0o600)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def encode_key(key: bytes) -> str:
+    return base64.b64encode(key).decode("ascii")
+
+
+def decode_key(text: str) -> bytes:
+    return base64.b64decode(text)
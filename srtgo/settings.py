@@ -0,0 +1,95 @@
+"""In-memory settings store in front of `keyring`.
+
+Every keyring lookup can be an IPC round trip (D-Bus on Linux, the Keychain
+on macOS), so the CLI reads each section's entries together the first time
+one of them is needed, serves reads from memory and writes changes back
+together on `flush()`. Sections that are never touched, such as the card
+details outside payment, are never read.
+"""
+
+from typing import Dict, Optional, Tuple
+
+PASSENGER_KEYS = ("adult", "child", "senior", "disability1to3", "disability4to6")
+SEARCH_KEYS = ("departure", "arrival", "date", "time") + PASSENGER_KEYS
+LOGIN_KEYS = ("id", "pass", "ok")
+
+KEYS: Dict[str, Tuple[str, ...]] = {
+    "SRT": LOGIN_KEYS + ("station", "options") + SEARCH_KEYS,
+    "KTX": LOGIN_KEYS + ("station",) + SEARCH_KEYS,
+    "card": ("number", "password", "birthday", "expire", "ok"),
+    "telegram": ("token", "chat_id", "ok"),
+    "session": ("key",),
+}
+
+_DELETED = object()
+
+
+class Settings:
+    """Batched, cached view of the `srtgo` keyring entries.
+
+    Args:
+        backend: Object with keyring's `get_password`/`set_password`/
+            `delete_password` functions (default: the `keyring` module)
+
+    Examples:
+        >>> settings = Settings()
+        >>> settings.get("SRT", "id")
+        >>> settings.set("SRT", "departure", "수서")
+        >>> settings.flush()
+    """
+
+    def __init__(self, backend=None) -> None:
+        self._backend = backend
+        self._values: Dict[Tuple[str, str], Optional[str]] = {}
+        self._pending: Dict[Tuple[str, str], object] = {}
+        self._loaded = set()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            import keyring
+
+            self._backend = keyring
+        return self._backend
+
+    def load(self, service: str) -> None:
+        """Read every known entry of `service` from the backend in one pass.
+
+        Entries already set or deleted in memory are kept.
+        """
+        for name in KEYS.get(service, ()):
+            key = (service, name)
+            if key not in self._values:
+                self._values[key] = self.backend.get_password(service, name)
+        self._loaded.add(service)
+
+    def get(self, service: str, name: str, default: Optional[str] = None):
+        if service not in self._loaded:
+            self.load(service)
+        key = (service, name)
+        if key not in self._values:
+            self._values[key] = self.backend.get_password(service, name)
+        value = self._values[key]
+        return default if value is None else value
+
+    def set(self, service: str, name: str, value: str) -> None:
+        self._values[(service, name)] = value
+        self._pending[(service, name)] = value
+
+    def delete(self, service: str, name: str) -> None:
+        self._values[(service, name)] = None
+        self._pending[(service, name)] = _DELETED
+
+    def flush(self) -> None:
+        """Write all pending changes back to the backend."""
+        from keyring.errors import PasswordDeleteError
+
+        pending, self._pending = self._pending, {}
+        for (service, name), value in pending.items():
+            if value is _DELETED:
+                try:
+                    self.backend.delete_password(service, name)
+                except PasswordDeleteError:
+                    pass
+            else:
+                self.backend.set_password(service, name, value)
@@ -1,17 +1,45 @@
 import abc
-try:
-    import curl_cffi
-    HAS_CURL_CFFI = True
-except ImportError:
-    import requests
-    HAS_CURL_CFFI = False
-
 import json
 import re
+import threading
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
 from enum import Enum
 from datetime import datetime
+from operator import itemgetter
+from types import MappingProxyType
 from typing import Dict, List, Pattern
+from urllib.parse import quote_plus, urlencode
+
+from . import errors
+from .changes import ChangeTracker
+from .metrics import InstrumentedSession, Metrics, endpoint_namer
+from .netfunnel import (
+    KeyLifetime,
+    NetFunnel,
+    NetFunnelCancelled,
+    drive,
+    drive_async,
+    hold_async,
+)
+from .rows import Field, Row
+from .session_cache import SessionCache
+from .transport import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ConnectionStats,
+    RequestTimeout,
+    Timeouts,
+    WorkerPool,
+    export_cookies,
+    import_cookies,
+    loads,
+    new_session,
+    preconnect,
+    request,
+)
 
 # Constants
 EMAIL_REGEX: Pattern = re.compile(r"[^@]+@[^@]+\.[^@]+")
@@ -27,6 +55,11 @@ DEFAULT_HEADERS: Dict[str, str] = {
     "Accept": "application/json",
 }
 
+# Content type of pre-encoded form bodies, which the HTTP library doesn't set
+FORM_HEADERS: Dict[str, str] = {
+    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+}
+
 RESERVE_JOBID = {
     "PERSONAL": "1101",  # 개인예약
     "STANDBY": "1102",  # 예약대기
@@ -85,6 +118,9 @@ TRAIN_NAME = {
 
 WINDOW_SEAT = {None: "000", True: "012", False: "013"}
 
+# Reply to a search or reservation carrying an expired NetFunnel key
+NETFUNNEL_REJECTED = "정상적인 경로로 접근 부탁드립니다"
+
 SRT_MOBILE = "https://app.srail.or.kr:443"
 API_ENDPOINTS = {
     "main": f"{SRT_MOBILE}/main/main.do",
@@ -105,9 +141,20 @@ API_ENDPOINTS = {
 
 # Exception classes
 class SRTError(Exception):
-    def __init__(self, msg):
+    """Base of SRT errors.
+
+    Attributes:
+        msg: Error message, usually the server's `msgTxt`
+        code: Server result code, if the reply had one
+        policy: How the reservation loop handles it; see `srtgo.errors`
+    """
+
+    policy = errors.UNKNOWN
+
+    def __init__(self, msg, code=None):
         super().__init__(msg)
         self.msg = msg
+        self.code = code
 
     def __str__(self):
         return self.msg
@@ -118,19 +165,54 @@ class SRTLoginError(SRTError):
 
 
 class SRTResponseError(SRTError):
-    pass
+    # Substrings of the server message that select the subclass; see
+    # SRTResponseData.error()
+    messages: tuple[str, ...] = ()
 
 
 class SRTDuplicateError(SRTResponseError):
     pass
 
 
+class SRTSoldOutError(SRTResponseError):
+    messages = ("잔여석없음", "예약대기 접수가 마감되었습니다", "예약대기자한도수초과")
+    policy = errors.SOLD_OUT
+
+
+class SRTOverloadError(SRTResponseError):
+    messages = ("사용자가 많아 접속이 원활하지 않습니다",)
+    policy = errors.BUSY
+
+
+class SRTNetFunnelKeyError(SRTResponseError):
+    """The server refused the NetFunnel key as expired."""
+
+    messages = (NETFUNNEL_REJECTED,)
+    policy = errors.STALE_KEY
+
+
+class SRTSessionExpiredError(SRTResponseError):
+    messages = ("로그인 후 사용하십시오",)
+    policy = errors.LOGGED_OUT
+
+
 class SRTNotLoggedInError(SRTError):
-    pass
+    policy = errors.LOGGED_OUT
+
+    def __init__(self, msg="Not logged in", code=None):
+        super().__init__(msg, code)
 
 
 class SRTNetFunnelError(SRTError):
-    pass
+    policy = errors.FUNNEL_FAILED
+
+
+RESPONSE_ERRORS = (
+    SRTSoldOutError,
+    SRTOverloadError,
+    SRTNetFunnelKeyError,
+    SRTSessionExpiredError,
+)
 
 
 # Passenger class
@@ -235,7 +317,9 @@ class Disability4To6(Passenger):
 
 
 # Ticket class
-class SRTTicket:
+class SRTTicket(Row):
+    __slots__ = ()
+
     SEAT_TYPE = {"1": "일반실", "2": "특실"}
 
     PASSENGER_TYPE = {
@@ -271,19 +355,25 @@ class SRTTicket:
         "206": "4~6급 장애인",
     }
 
-    def __init__(self, data: dict) -> None:
-        self.car = data.get("scarNo")
-        self.seat = data.get("seatNo")
-        self.seat_type_code = data.get("psrmClCd")
-        self.seat_type = self.SEAT_TYPE[self.seat_type_code]
-        self.passenger_type_code = data.get("dcntKndCd")
-        self.passenger_type = self.DISCOUNT_TYPE.get(
-            self.passenger_type_code, "기타 할인"
-        )
-        self.price = int(data.get("rcvdAmt"))
-        self.original_price = int(data.get("stdrPrc"))
-        self.discount = int(data.get("dcntPrc"))
-        self.is_waiting = self.seat == ""
+    car = Field("scarNo")
+    seat = Field("seatNo")
+    seat_type_code = Field("psrmClCd")
+    passenger_type_code = Field("dcntKndCd")
+    price = Field("rcvdAmt", int)
+    original_price = Field("stdrPrc", int)
+    discount = Field("dcntPrc", int)
+
+    @property
+    def seat_type(self) -> str:
+        return self.SEAT_TYPE[self.seat_type_code]
+
+    @property
+    def passenger_type(self) -> str:
+        return self.DISCOUNT_TYPE.get(self.passenger_type_code, "기타 할인")
+
+    @property
+    def is_waiting(self) -> bool:
+        return self.seat == ""
 
     def __str__(self) -> str:
         return self.dump()
@@ -303,7 +393,9 @@ class SRTTicket:
 
 
 class SRTReservation:
-    def __init__(self, train, pay, tickets):
+    """A reservation; `tickets` may be given up front or fetched on first access."""
+
+    def __init__(self, train, pay, tickets=None, fetch_tickets=None):
         self.reservation_number = train.get("pnrNo")
         self.total_cost = int(train.get("rcvdAmt"))
         self.seat_count = train.get("tkSpecNum") or int(train.get("seatNum"))
@@ -328,6 +420,7 @@ class SRTReservation:
         self.is_waiting = not (self.paid or self.payment_date or self.payment_time)
 
         self._tickets = tickets
+        self._fetch_tickets = fetch_tickets
 
     def __str__(self):
         return self.dump()
@@ -359,18 +452,34 @@ class SRTReservation:
 
     @property
     def tickets(self):
+        if self._tickets is None and self._fetch_tickets is not None:
+            self._tickets = self._fetch_tickets(self.reservation_number)
+            self._fetch_tickets = None
         return self._tickets
 
+    @tickets.setter
+    def tickets(self, tickets):
+        self._tickets = tickets
+        self._fetch_tickets = None
+
+    @property
+    def tickets_loaded(self) -> bool:
+        return self._tickets is not None or self._fetch_tickets is None
+
 
 # SRTResponseData class
 class SRTResponseData:
-    """SRT Response data class that parses JSON response from API request"""
+    """SRT Response data class that parses JSON response from API request
+
+    `get_all()` and `get_status()` return read-only views of the parsed body
+    rather than copies.
+    """
 
     STATUS_SUCCESS = "SUCC"
     STATUS_FAIL = "FAIL"
 
-    def __init__(self, response: str) -> None:
-        self._json = json.loads(response)
+    def __init__(self, response: bytes | str) -> None:
+        self._json = loads(response)
         self._status = self._parse()
 
     def __str__(self) -> str:
@@ -384,7 +493,8 @@ class SRTResponseData:
 
         if "ErrorCode" in self._json and "ErrorMsg" in self._json:
             raise SRTResponseError(
-                f'Undefined result status "[{self._json["ErrorCode"]}]: {self._json["ErrorMsg"]}"'
+                f'Undefined result status "[{self._json["ErrorCode"]}]: {self._json["ErrorMsg"]}"',
+                self._json["ErrorCode"],
             )
         raise SRTError(f"Unexpected case [{self._json}]")
 
@@ -403,11 +513,22 @@ class SRTResponseData:
     def message(self) -> str:
         return self._status.get("msgTxt", "")
 
-    def get_all(self) -> dict:
-        return self._json.copy()
+    def code(self) -> str | None:
+        return self._status.get("msgCd")
+
+    def error(self) -> SRTResponseError:
+        """The error of a failed reply, typed after its message."""
+        message = self.message()
+        for error in RESPONSE_ERRORS:
+            if any(text in message for text in error.messages):
+                return error(message, self.code())
+        return SRTResponseError(message, self.code())
 
-    def get_status(self) -> dict:
-        return self._status.copy()
+    def get_all(self) -> MappingProxyType:
+        return MappingProxyType(self._json)
+
+    def get_status(self) -> MappingProxyType:
+        return MappingProxyType(self._status)
 
 
 class SeatType(Enum):
@@ -418,36 +539,47 @@ class SeatType(Enum):
 
 
 # Train class
-class Train:
-    pass
+class Train(Row):
+    __slots__ = ()
 
 
 class SRTTrain(Train):
-    def __init__(self, data):
-        self.train_code = data["stlbTrnClsfCd"]
-        self.train_name = TRAIN_NAME[self.train_code]
-        self.train_number = data["trnNo"]
-
-        # Departure info
-        self.dep_date = data["dptDt"]
-        self.dep_time = data["dptTm"]
-        self.dep_station_code = data["dptRsStnCd"]
-        self.dep_station_name = STATION_NAME[self.dep_station_code]
-        self.dep_station_run_order = data["dptStnRunOrdr"]
-        self.dep_station_constitution_order = data["dptStnConsOrdr"]
+    __slots__ = (
+        "general_seat_state",
+        "special_seat_state",
+        "reserve_wait_possible_code",
+    )
+
+    train_code = Field("stlbTrnClsfCd")
+    train_name = Field("stlbTrnClsfCd", TRAIN_NAME.__getitem__)
+    train_number = Field("trnNo")
+
+    # Departure info
+    dep_date = Field("dptDt")
+    dep_time = Field("dptTm")
+    dep_station_code = Field("dptRsStnCd")
+    dep_station_name = Field("dptRsStnCd", STATION_NAME.__getitem__)
+    dep_station_run_order = Field("dptStnRunOrdr")
+    dep_station_constitution_order = Field("dptStnConsOrdr")
+
+    # Arrival info
+    arr_date = Field("arvDt")
+    arr_time = Field("arvTm")
+    arr_station_code = Field("arvRsStnCd")
+    arr_station_name = Field("arvRsStnCd", STATION_NAME.__getitem__)
+    arr_station_run_order = Field("arvStnRunOrdr")
+    arr_station_constitution_order = Field("arvStnConsOrdr")
+
+    reserve_wait_possible_name = Field("rsvWaitPsbCdNm")
+
+    AVAILABILITY_FIELDS = ("gnrmRsvPsbStr", "sprmRsvPsbStr", "rsvWaitPsbCd")
 
-        # Arrival info
-        self.arr_date = data["arvDt"]
-        self.arr_time = data["arvTm"]
-        self.arr_station_code = data["arvRsStnCd"]
-        self.arr_station_name = STATION_NAME[self.arr_station_code]
-        self.arr_station_run_order = data["arvStnRunOrdr"]
-        self.arr_station_constitution_order = data["arvStnConsOrdr"]
+    def __init__(self, data):
+        super().__init__(data)
 
-        # Seat availability info
+        # Seat availability info, read on every poll
         self.general_seat_state = data["gnrmRsvPsbStr"]
         self.special_seat_state = data["sprmRsvPsbStr"]
-        self.reserve_wait_possible_name = data["rsvWaitPsbCdNm"]
         self.reserve_wait_possible_code = int(
             data["rsvWaitPsbCd"]
         )  # -1: 예약대기 없음, 9: 예약대기 가능, 0: 매진, -2: 예약대기 불가능
@@ -495,12 +627,56 @@ class SRTTrain(Train):
     def seat_available(self):
         return self.general_seat_available() or self.special_seat_available()
 
+    # Train number, departure date and time, and route of a raw row
+    identity = staticmethod(
+        itemgetter("trnNo", "dptDt", "dptTm", "dptRsStnCd", "arvRsStnCd")
+    )
+
+    @property
+    def key(self) -> tuple:
+        return self.identity(self._data)
+
+    def availability(self) -> tuple[bool, bool, bool]:
+        """Whether general seats, special seats and standby are open."""
+        return (
+            self.general_seat_available(),
+            self.special_seat_available(),
+            self.reserve_standby_available(),
+        )
+
 
 # NetFunnel
 class NetFunnelHelper:
-    WAIT_STATUS_PASS = "200"
-    WAIT_STATUS_FAIL = "201"
-    ALREADY_COMPLETED = "502"
+    """Passes the NetFunnel queue in front of search and reserve.
+
+    Queue checks go to whichever host the previous reply names (`ip`), so
+    the helper keeps one keep-alive session per funnel host, at most
+    `max_hosts` of them, least recently used dropped first. They are reused
+    across steps and across run() calls.
+
+    The key is reused until `lifetime` says it has expired. Callers report
+    whether the server took it with key_accepted() and key_rejected(), which
+    is how `lifetime` learns the real key TTL.
+
+    The helper is shared by the client's threads. Only one of them passes
+    the queue at a time; the others wait for that pass and use its key.
+
+    A pass cut short by the timeout or the deadline while waiting in the
+    queue keeps its place: the next run() picks it up where it stopped
+    instead of joining the queue again at the back.
+
+    Args:
+        debug: Print raw NetFunnel replies
+        timeouts: Timeouts of the "netfunnel" endpoint class
+        connections: Where to count connection reuse
+        breaker: Circuit breaker shared with the client
+        max_hosts: Funnel hosts kept connected
+        on_progress: Called with the `NetFunnel` pass after each queue check
+        key_ttl: Initial estimate of the key lifetime in seconds
+    """
+
+    NETFUNNEL_URL = "https://{host}/ts.wseq"
+    NETFUNNEL_HOST = "nf.letskorail.com"
 
     OP_CODE = {
         "getTidchkEnter": "5101",
@@ -528,65 +704,231 @@ class NetFunnelHelper:
         "Accept-Language": "en-US,en;q=0.9,ko-KR;q=0.8,ko;q=0.7",
     }
 
-    def __init__(self, debug=False):
-        if HAS_CURL_CFFI:
-            self._session = curl_cffi.Session(impersonate="chrome")
-        else:
-            self._session = requests.session()
-        self._session.headers.update(self.DEFAULT_HEADERS)
+    def __init__(
+        self,
+        debug=False,
+        timeouts: Timeouts | None = None,
+        connections: ConnectionStats | None = None,
+        breaker: CircuitBreaker | None = None,
+        max_hosts: int = 8,
+        on_progress=None,
+        key_ttl: float = 48.0,
+    ):
+        self._sessions = OrderedDict()  # host -> session, least recent first
+        self.max_hosts = max_hosts
+        self.on_progress = on_progress
+        self.metrics = None
+        self.timeouts = timeouts or Timeouts()
+        self.connections = connections or ConnectionStats()
+        self.breaker = breaker or CircuitBreaker()
         self._cached_key = None
-        self._last_fetch_time = 0
-        self._cache_ttl = 48  # 48 seconds
+        self._queued = None  # (pass, started, paused) of a pass still queued
+        self.lifetime = KeyLifetime(key_ttl)
         self.debug = debug
+        self._lock = threading.Lock()  # key, lifetime, counters, session pool
+        self._refresh = threading.Lock()  # one queue pass at a time
 
-    def run(self):
-        current_time = time.time()
-        if self._is_cache_valid(current_time):
-            return self._cached_key
+        self.runs = 0
+        self.cached_runs = 0
+        self.network_time = 0.0
+        self.queue_time = 0.0
+        self.last_run = None
 
-        try:
-            status, self._cached_key, nwait, ip = self._start()
-            self._last_fetch_time = current_time
-
-            # Keep checking until we get a pass status
-            while status == self.WAIT_STATUS_FAIL:
-                print(f"\r현재 {nwait}명 대기중...", end="", flush=True)
-                time.sleep(1)
-                status, self._cached_key, nwait, ip = self._check(ip)
-
-            # Complete the funnel process
-            status, *_ = self._complete(ip)
-            if status in (self.WAIT_STATUS_PASS, self.ALREADY_COMPLETED):
-                return self._cached_key
+    def run(self, on_progress=None, cancel=None, timeout: float | None = None):
+        """Return a NetFunnel key, passing the queue unless the cached one is valid.
 
-            self.clear()
-            raise SRTNetFunnelError("Failed to complete NetFunnel")
+        Args:
+            on_progress: Called with the `NetFunnel` pass after each queue
+                check (default: `self.on_progress`)
+            cancel: `threading.Event` that aborts the wait when set
+            timeout: Seconds the pass may take
 
+        Raises:
+            SRTNetFunnelError: If the pass failed
+            RequestTimeout: If it would overrun `timeout` or the deadline
+            NetFunnelCancelled: If `cancel` was set
+        """
+        key = self._valid_key()
+        if key is not None:
+            return key
+        with self._refresh:
+            # Another thread may have passed while this one waited
+            key = self._valid_key()
+            if key is not None:
+                return key
+            with self._pass() as funnel:
+                drive(
+                    funnel, self._send, on_progress or self.on_progress, cancel, timeout
+                )
+            return funnel.key
+
+    async def run_async(self, on_progress=None, timeout: float | None = None):
+        """Like run(), without blocking the event loop; cancel the task to abort."""
+        key = self._valid_key()
+        if key is not None:
+            return key
+        async with hold_async(self._refresh):
+            key = self._valid_key()
+            if key is not None:
+                return key
+            with self._pass() as funnel:
+                await drive_async(
+                    funnel, self._send, on_progress or self.on_progress, timeout
+                )
+            return funnel.key
+
+    @contextmanager
+    def _pass(self):
+        with self._lock:
+            queued, self._queued = self._queued, None
+        if queued is None:
+            funnel, fetched_at = NetFunnel(), time.monotonic()
+        else:
+            funnel, fetched_at, paused_at = queued
+            funnel.resume(time.monotonic() - paused_at)
+        network, waited = funnel.network, funnel.waited
+        start = time.perf_counter()
+        try:
+            yield funnel
+        except RequestTimeout:
+            self.clear()
+            if funnel.queued:
+                with self._lock:
+                    self._queued = (funnel, fetched_at, time.monotonic())
+            raise
+        except (NetFunnelCancelled, CircuitOpenError):
+            self.clear()
+            raise
         except Exception as ex:
             self.clear()
             raise SRTNetFunnelError(str(ex))
+        else:
+            with self._lock:
+                self._cached_key = funnel.key
+                self.lifetime.start(fetched_at)
+        finally:
+            with self._lock:
+                self.runs += 1
+                self.network_time += funnel.network - network
+                self.queue_time += funnel.waited - waited
+                self.last_run = {
+                    "total": time.perf_counter() - start,
+                    "network": funnel.network,
+                    "queue": funnel.waited,
+                    "checks": funnel.checks,
+                }
+
+    def _send(self, funnel: NetFunnel) -> dict:
+        return self._make_request(funnel.state, funnel.ip, funnel.key)
+
+    def key_accepted(self, key: str) -> None:
+        """The server accepted `key` in a search or reservation."""
+        with self._lock:
+            if key == self._cached_key:
+                self.lifetime.accept()
+
+    def key_rejected(self, key: str) -> None:
+        """The server refused `key` as expired; drop it and learn from it."""
+        with self._lock:
+            if key == self._cached_key:
+                self.lifetime.reject()
+                self._cached_key = None
+
+    def stats(self) -> dict:
+        """Funnel passes, and how much of their time was network vs queue.
+
+        `network` is time spent in funnel requests and `queue` time spent
+        waiting between queue checks, both summed over all passes. `keys`
+        is the key lifetime estimate and counts from KeyLifetime.snapshot().
+        """
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "cached": self.cached_runs,
+                "network": self.network_time,
+                "queue": self.queue_time,
+                "hosts": list(self._sessions),
+                "last": self.last_run,
+                "keys": self.lifetime.snapshot(),
+            }
+
+    def enable_metrics(self, metrics: Metrics) -> None:
+        """Record every funnel request into `metrics`, on all pooled sessions."""
+        self.disable_metrics()
+        with self._lock:
+            self.metrics = metrics
+            for host, session in self._sessions.items():
+                self._sessions[host] = InstrumentedSession(
+                    session, metrics, self.endpoint_name
+                )
 
-    def clear(self):
-        self._cached_key = None
-        self._last_fetch_time = 0
-
-    def _start(self):
-        return self._make_request("getTidchkEnter")
-
-    def _check(self, ip: str | None = None):
-        return self._make_request("chkEnter", ip)
+    def disable_metrics(self) -> None:
+        with self._lock:
+            if self.metrics is None:
+                return
+            for host, session in self._sessions.items():
+                self._sessions[host] = session.session
+            self.metrics = None
+
+    def close(self) -> None:
+        """Close every pooled funnel session."""
+        with self._lock:
+            while self._sessions:
+                _, session = self._sessions.popitem()
+                session.close()
+
+    def _session_for(self, host: str):
+        with self._lock:
+            session = self._sessions.pop(host, None)
+            if session is None:
+                session = new_session(impersonate="chrome")
+                session.headers.update(self.DEFAULT_HEADERS)
+                if self.metrics is not None:
+                    session = InstrumentedSession(
+                        session, self.metrics, self.endpoint_name
+                    )
+                while len(self._sessions) >= self.max_hosts:
+                    _, stale = self._sessions.popitem(last=False)
+                    stale.close()
+            self._sessions[host] = session
+            return session
 
-    def _complete(self, ip: str | None = None):
-        return self._make_request("setComplete", ip)
+    def clear(self):
+        with self._lock:
+            self._cached_key = None
+            self._queued = None
+            self.lifetime.drop()
+
+    def warm_up(self) -> bool:
+        """Open a connection to the NetFunnel host; see `SRT.warm_up`."""
+        url = self.NETFUNNEL_URL.format(host=self.NETFUNNEL_HOST)
+        return preconnect(
+            self._session_for(self.NETFUNNEL_HOST),
+            [url],
+            self.timeouts.get("netfunnel"),
+            self.connections,
+            self.breaker,
+        )
 
-    def _make_request(self, opcode: str, ip: str | None = None):
-        url = f"https://{ip or 'nf.letskorail.com'}/ts.wseq"
-        params = self._build_params(self.OP_CODE[opcode])
-        r = self._session.get(url, params=params, verify=False)
+    def _make_request(
+        self, opcode: str, ip: str | None = None, key: str | None = None
+    ) -> dict:
+        host = ip or self.NETFUNNEL_HOST
+        url = self.NETFUNNEL_URL.format(host=host)
+        params = self._build_params(self.OP_CODE[opcode], key=key)
+        r = request(
+            self._session_for(host),
+            "get",
+            url,
+            self.timeouts.get("netfunnel"),
+            self.connections,
+            self.breaker,
+            params=params,
+            verify=False,
+        )
         if self.debug:
             print(r.text)
-        response = self._parse(r.text)
-        return map(response.get, ("status", "key", "nwait", "ip"))
+        return self._parse(r.text)
 
     def _build_params(
         self, opcode: str, timestamp: str = None, key: str = None
@@ -623,10 +965,62 @@ class NetFunnelHelper:
         params.update({"code": code, "status": status})
         return params
 
-    def _is_cache_valid(self, current_time: float) -> bool:
-        return bool(
-            self._cached_key
-            and (current_time - self._last_fetch_time) < self._cache_ttl
+    @classmethod
+    def endpoint_name(cls, url: str, params: dict | None = None) -> str:
+        """Metrics name of a NetFunnel call, e.g. "netfunnel.chkEnter"."""
+        opcode = (params or {}).get("opcode")
+        for name, code in cls.OP_CODE.items():
+            if code == opcode:
+                return f"netfunnel.{name}"
+        return "netfunnel"
+
+    def _valid_key(self) -> str | None:
+        """The cached key if it may be reused (counted as a cached run)."""
+        with self._lock:
+            if self._cached_key and self.lifetime.fresh():
+                self.cached_runs += 1
+                return self._cached_key
+        return None
+
+
+# Search query
+@dataclass(frozen=True)
+class SRTSearchQuery:
+    """Schedule search prepared by SRT.prepare_search().
+
+    The form body is encoded once. Sending the query only appends the
+    departure time, moved up to now when searching today, and the NetFunnel
+    key. The query holds nothing of the client it was prepared on.
+    """
+
+    dep: str
+    arr: str
+    date: str
+    time: str
+    time_limit: str | None
+    available_only: bool
+    body: str
+
+    def encode(self, netfunnel_key: str, now: datetime | None = None) -> str:
+        """Form body to send with `netfunnel_key` at `now` (default: now).
+
+        Raises:
+            ValueError: If the date has passed since the query was prepared
+        """
+        stamp = (now or datetime.now()).strftime("%Y%m%d%H%M%S")
+        if self.date < stamp[:8]:
+            raise ValueError("Date cannot be before today")
+        time = self.time
+        if self.date == stamp[:8]:
+            time = max(time, stamp[8:])
+        return (
+            f"{self.body}&dptTm={time}&dptTm1={time[:2]}0000"
+            f"&netfunnelKey={quote_plus(netfunnel_key or '')}"
+        )
+
+    def accepts(self, train: "SRTTrain") -> bool:
+        return (not self.available_only or train.seat_available()) and (
+            not self.time_limit or train.dep_time <= self.time_limit
         )
 
 
@@ -639,6 +1033,29 @@ class SRT:
         srt_pw (str): SRT account password
         auto_login (bool): Whether to automatically login on initialization
         verbose (bool): Whether to print debug logs
+        max_workers (int): Maximum concurrent ticket detail requests when listing
+        session_cache (SessionCache): Where to save the login session and try
+            to resume it from on initialization
+        timeouts (Timeouts): Connect/read timeouts per endpoint class
+        breaker (CircuitBreaker): Stops requests to a host whose connections
+            keep failing, and paces the reconnect attempts (default: one with
+            default thresholds)
+        netfunnel_progress (callable): Called with the `NetFunnel` pass after
+            each NetFunnel queue check, e.g. to show the queue position
+
+    Attributes:
+        connections (ConnectionStats): Requests per host that reused a
+            kept-alive connection or opened a new one
+        breaker (CircuitBreaker): Circuit state and counts per host
+
+    One client may be shared between threads, e.g. the reservation loop and
+    a listing worker pool. Requests never change the session's own headers.
+    A NetFunnel key is fetched by one thread at a time, and threads that
+    need it meanwhile wait for that key. login(), relogin() and logout() run
+    one at a time, and relogin(since=...) calls from threads that found the
+    same session logged out share a single login. The caller keeps
+    enable_metrics()/disable_metrics() and session restores away from
+    requests in flight, and gives each thread its own `ChangeTracker`.
 
     Examples:
         >>> srt = SRT("1234567890", YOUR_PASSWORD) # with membership number
@@ -647,14 +1064,32 @@ class SRT:
     """
 
     def __init__(
-        self, srt_id: str, srt_pw: str, auto_login: bool = True, verbose: bool = False
+        self,
+        srt_id: str,
+        srt_pw: str,
+        auto_login: bool = True,
+        verbose: bool = False,
+        max_workers: int = 4,
+        session_cache: SessionCache | None = None,
+        timeouts: Timeouts | None = None,
+        breaker: CircuitBreaker | None = None,
+        netfunnel_progress=None,
     ) -> None:
-        if HAS_CURL_CFFI:
-            self._session = curl_cffi.Session(impersonate="chrome")
-        else:
-            self._session = requests.session()
+        self._session = new_session(impersonate="chrome")
+        self._pool = WorkerPool(max_workers, name="srt-detail")
+        self._session_cache = session_cache
         self._session.headers.update(DEFAULT_HEADERS)
-        self._netfunnel = NetFunnelHelper(debug=verbose)
+        self.timeouts = timeouts or Timeouts()
+        self.connections = ConnectionStats()
+        self.breaker = breaker or CircuitBreaker()
+        self._netfunnel = NetFunnelHelper(
+            debug=verbose,
+            timeouts=self.timeouts,
+            connections=self.connections,
+            breaker=self.breaker,
+            on_progress=netfunnel_progress,
+        )
+        self.metrics = None
         self.srt_id = srt_id
         self.srt_pw = srt_pw
         self.verbose = verbose
@@ -662,14 +1097,111 @@ class SRT:
         self.membership_number = None
         self.membership_name = None
         self.phone_number = None
+        self._auth_lock = threading.RLock()
+        self._logins = 0  # successful logins, to tell a stale relogin()
+        self._unconfirmed = False  # resumed, and no reply has vouched for it yet
 
-        if auto_login:
+        if auto_login and not self._resume_session():
             self.login()
 
     def _log(self, msg: str) -> None:
         if self.verbose:
             print("[*] " + msg)
 
+    def _log_response(self, r) -> None:
+        if self.verbose:  # r.text decodes the whole body
+            self._log(r.text)
+
+    def _post(self, kind: str, url: str, **kwargs):
+        """POST to `url` with the timeouts of endpoint class `kind`.
+
+        The first reply on a resumed session stands in for the check that it
+        is still logged in: if the server turned it away, this logs in and
+        sends the request again.
+        """
+        generation = self._logins
+        r = request(
+            self._session,
+            "post",
+            url,
+            self.timeouts.get(kind),
+            self.connections,
+            self.breaker,
+            **kwargs,
+        )
+        if self._unconfirmed and self._resume_refused(r):
+            self.relogin(since=generation)
+            return self._post(kind, url, **kwargs)
+        return r
+
+    def _resume_refused(self, r) -> bool:
+        with self._auth_lock:
+            if not self._unconfirmed:
+                return False
+            self._unconfirmed = False
+        try:
+            error = SRTResponseData(r.content).error()
+        except (SRTError, ValueError):
+            return False
+        return isinstance(error, SRTSessionExpiredError)
+
+    def warm_up(self, netfunnel: bool = True) -> bool:
+        """Connect to the API and NetFunnel hosts ahead of the next search.
+
+        Resolves both hosts and completes the TCP/TLS handshakes, so the next
+        search_train() doesn't pay for them in series. With `netfunnel` it
+        also fetches a NetFunnel key. Calling it again while idle keeps the
+        connections from being closed. Failures are not raised, since the
+        next request reconnects anyway.
+
+        Returns:
+            bool: Whether every host answered
+        """
+        ok = preconnect(
+            self._session,
+            API_ENDPOINTS.values(),
+            self.timeouts.get("default"),
+            self.connections,
+            self.breaker,
+        )
+        ok = self._netfunnel.warm_up() and ok
+        if netfunnel and ok:
+            try:
+                self._netfunnel.run()
+            except (SRTNetFunnelError, OSError):  # timeouts, connection errors
+                ok = False
+        return ok
+
+    def enable_metrics(self, metrics: Metrics | None = None) -> Metrics:
+        """Record latency, status and payload sizes of every request per endpoint.
+
+        Args:
+            metrics: Recorder to use, e.g. one shared with another client
+
+        Returns:
+            Metrics: The recorder; see Metrics.snapshot()
+
+        Examples:
+            >>> metrics = srt.enable_metrics()
+            >>> srt.search_train("수서", "부산")
+            >>> metrics.snapshot()["search_schedule"]["time"]["p50"]
+        """
+        self.disable_metrics()
+        self.metrics = Metrics() if metrics is None else metrics
+        self._session = InstrumentedSession(
+            self._session, self.metrics, endpoint_namer(API_ENDPOINTS)
+        )
+        self._netfunnel.enable_metrics(self.metrics)
+        return self.metrics
+
+    def disable_metrics(self) -> None:
+        """Stop recording and go back to the plain HTTP sessions."""
+        if self.metrics is None:
+            return
+        self._session = self._session.session
+        self._netfunnel.disable_metrics()
+        self.metrics = None
+
     def login(self, srt_id: str | None = None, srt_pw: str | None = None) -> bool:
         """Login to SRT server.
 
@@ -685,9 +1217,10 @@ class SRT:
         Raises:
             SRTLoginError: If login fails
         """
-        srt_id = srt_id or self.srt_id
-        srt_pw = srt_pw or self.srt_pw
+        with self._auth_lock:
+            return self._login(srt_id or self.srt_id, srt_pw or self.srt_pw)
 
+    def _login(self, srt_id: str, srt_pw: str) -> bool:
         login_type = (
             "2"
             if EMAIL_REGEX.match(srt_id)
@@ -709,8 +1242,8 @@ class SRT:
             "hmpgPwdCphd": srt_pw,
         }
 
-        r = self._session.post(url=API_ENDPOINTS["login"], data=data)
-        self._log(r.text)
+        r = self._post("default", API_ENDPOINTS["login"], data=data)
+        self._log_response(r)
 
         if "존재하지않는 회원입니다" in r.text:
             raise SRTLoginError(r.json()["MSG"])
@@ -719,17 +1252,86 @@ class SRT:
         if "Your IP Address Blocked" in r.text:
             raise SRTLoginError(r.text.strip())
 
-        self.is_login = True
-        user_info = json.loads(r.text)["userMap"]
+        user_info = loads(r.content)["userMap"]
         self.membership_number = user_info["MB_CRD_NO"]
         self.membership_name = user_info["CUST_NM"]
         self.phone_number = user_info["MBL_PHONE"]
+        self.is_login = True
+        self._unconfirmed = False
+        self._logins += 1
+        if self._session_cache is not None:
+            self._session_cache.save("SRT", self.srt_id, self.export_session())
 
         print(
             f"로그인 성공: {self.membership_name} (멤버십번호: {self.membership_number}, 전화번호: {self.phone_number})"
         )
         return True
 
+    def export_session(self) -> dict:
+        """Return the cookies and login details needed to resume this session."""
+        return {
+            "cookies": export_cookies(self._session),
+            "membership_number": self.membership_number,
+            "membership_name": self.membership_name,
+            "phone_number": self.phone_number,
+        }
+
+    def restore_session(self, state: dict) -> None:
+        """Resume a session saved with export_session().
+
+        The session is not checked with the server up front, which would cost
+        as much as logging in; the first request checks it (see _post()).
+
+        Args:
+            state: Saved session
+        """
+        import_cookies(self._session, state.get("cookies", []))
+        self.membership_number = state.get("membership_number")
+        self.membership_name = state.get("membership_name")
+        self.phone_number = state.get("phone_number")
+        self.is_login = True
+        self._unconfirmed = True
+
+    def _resume_session(self) -> bool:
+        if self._session_cache is None:
+            return False
+        state = self._session_cache.load("SRT", self.srt_id)
+        if not state:
+            return False
+        self.restore_session(state)
+        print(
+            f"로그인 세션 재사용: {self.membership_name} (멤버십번호: {self.membership_number}, 전화번호: {self.phone_number})"
+        )
+        return True
+
+    @property
+    def login_generation(self) -> int:
+        """Count of successful logins; read it before a request, for relogin()."""
+        return self._logins
+
+    def relogin(self, since: int | None = None) -> bool:
+        """Log in again on the existing session.
+
+        Keeps the HTTP connections, NetFunnel key and worker pool; only the
+        authentication exchange is redone.
+
+        Args:
+            since: `login_generation` as read before the request that found
+                the session logged out. If a login has succeeded since then,
+                that login is used instead of logging in again.
+
+        Returns:
+            bool: Whether login was successful
+
+        Raises:
+            SRTLoginError: If login fails
+        """
+        with self._auth_lock:
+            if since is not None and self._logins != since and self.is_login:
+                return True
+            self.is_login = False
+            return self.login()
+
     def logout(self) -> bool:
         """Logout from SRT server.
 
@@ -739,18 +1341,21 @@ class SRT:
         Raises:
             SRTResponseError: If server returns error
         """
-        if not self.is_login:
-            return True
+        with self._auth_lock:
+            if not self.is_login:
+                return True
 
-        r = self._session.post(url=API_ENDPOINTS["logout"])
-        self._log(r.text)
+            r = self._post("default", API_ENDPOINTS["logout"])
+            self._log_response(r)
 
-        if not r.ok:
-            raise SRTResponseError(r.text)
+            if not r.ok:
+                raise SRTResponseError(r.text)
 
-        self.is_login = False
-        self.membership_number = None
-        return True
+            self.is_login = False
+            self.membership_number = None
+            if self._session_cache is not None:
+                self._session_cache.discard("SRT", self.srt_id)
+            return True
 
     def search_train(
         self,
@@ -779,63 +1384,97 @@ class SRT:
         Raises:
             ValueError: If invalid station names provided
         """
+        return self.search(
+            self.prepare_search(
+                dep, arr, date, time, time_limit, passengers, available_only
+            )
+        )
+
+    @staticmethod
+    def prepare_search(
+        dep: str,
+        arr: str,
+        date: str | None = None,
+        time: str | None = None,
+        time_limit: str | None = None,
+        passengers: list[Passenger] | None = None,
+        available_only: bool = True,
+    ) -> SRTSearchQuery:
+        """Validate and encode a search once, to send with search() many times.
+
+        Takes the arguments of search_train().
+
+        Raises:
+            ValueError: If invalid station names provided
+
+        Examples:
+            >>> query = srt.prepare_search("수서", "부산", "210101", "000000")
+            >>> trains = srt.search(query)
+        """
         if dep not in STATION_CODE or arr not in STATION_CODE:
             raise ValueError(f'Invalid station: "{dep}" or "{arr}"')
 
-        now = datetime.now()
-        today = now.strftime("%Y%m%d")
+        today = datetime.now().strftime("%Y%m%d")
         date = date or today
 
         if date < today:
             raise ValueError("Date cannot be before today")
 
-        time = (
-            max(time or "000000", now.strftime("%H%M%S"))
-            if date == today
-            else time or "000000"
-        )
-
         passengers = Passenger.combine(passengers or [Adult()])
 
-        data = {
-            "chtnDvCd": "1",
-            "dptDt": date,
-            "dptTm": time,
-            "dptDt1": date,
-            "dptTm1": time[:2] + "0000",
-            "dptRsStnCd": STATION_CODE[dep],
-            "arvRsStnCd": STATION_CODE[arr],
-            "stlbTrnClsfCd": "05",
-            "trnGpCd": 109,
-            "trnNo": "",
-            "psgNum": str(Passenger.total_count(passengers)),
-            "seatAttCd": "015",
-            "arriveTime": "N",
-            "tkDptDt": "",
-            "tkDptTm": "",
-            "tkTrnNo": "",
-            "tkTripChgFlg": "",
-            "dlayTnumAplFlg": "Y",
-            "netfunnelKey": self._netfunnel.run(),
-        }
+        body = urlencode(
+            {
+                "chtnDvCd": "1",
+                "dptDt": date,
+                "dptDt1": date,
+                "dptRsStnCd": STATION_CODE[dep],
+                "arvRsStnCd": STATION_CODE[arr],
+                "stlbTrnClsfCd": "05",
+                "trnGpCd": 109,
+                "trnNo": "",
+                "psgNum": Passenger.total_count(passengers),
+                "seatAttCd": "015",
+                "arriveTime": "N",
+                "tkDptDt": "",
+                "tkDptTm": "",
+                "tkTrnNo": "",
+                "tkTripChgFlg": "",
+                "dlayTnumAplFlg": "Y",
+            }
+        )
+        return SRTSearchQuery(
+            dep, arr, date, time or "000000", time_limit, available_only, body
+        )
 
-        r = self._session.post(url=API_ENDPOINTS["search_schedule"], data=data)
-        self._log(r.text)
-        parser = SRTResponseData(r.text)
+    def search(
+        self, query: SRTSearchQuery, changes: ChangeTracker | None = None
+    ) -> list[SRTTrain]:
+        """Send a query from prepare_search(); see search_train().
 
-        if not parser.success():
-            raise SRTResponseError(parser.message())
-
-        return [
-            train
-            for train in (
-                SRTTrain(t)
-                for t in parser.get_all()["outDataSets"]["dsOutput1"]
-                if t["stlbTrnClsfCd"] == "17"
-            )
-            if (not available_only or train.seat_available())
-            and (not time_limit or train.dep_time <= time_limit)
+        With `changes`, the result goes through the tracker: trains whose
+        availability didn't change since its last poll are reused, and
+        `changes.events` holds what did change.
+        """
+        netfunnel_key = self._netfunnel.run()
+        r = self._post(
+            "search",
+            API_ENDPOINTS["search_schedule"],
+            data=query.encode(netfunnel_key),
+            headers=FORM_HEADERS,
+        )
+        self._log_response(r)
+        parser = SRTResponseData(r.content)
+        self._check_netfunnel_reply(parser, netfunnel_key)
+
+        rows = [
+            t
+            for t in parser.get_all()["outDataSets"]["dsOutput1"]
+            if t["stlbTrnClsfCd"] == "17"
         ]
+        trains = (
+            map(SRTTrain, rows) if changes is None else changes.update(rows, SRTTrain)
+        )
+        return [train for train in trains if query.accepts(train)]
 
     def reserve(
         self,
@@ -996,16 +1635,60 @@ class SRT:
             )
         )
 
-        r = self._session.post(url=API_ENDPOINTS["reserve"], data=data)
-        self._log(r.text)
-        parser = SRTResponseData(r.text)
+        r = self._post("reserve", API_ENDPOINTS["reserve"], data=data)
+        self._log_response(r)
+        parser = SRTResponseData(r.content)
+        self._check_netfunnel_reply(parser, data["netfunnelKey"])
 
-        if not parser.success():
-            raise SRTResponseError(parser.message())
+        reserved = parser.get_all()["reservListMap"][0]
+
+        try:
+            if reservation := self._reservation_from_reserve(jobid, train, reserved):
+                return reservation
+        except (SRTResponseError, KeyError, ValueError, TypeError):
+            pass
+
+        return self._find_reservation(reserved["pnrNo"])
 
-        reservation_number = parser.get_all()["reservListMap"][0]["pnrNo"]
+    def _reservation_from_reserve(
+        self, jobid: str, train: SRTTrain, reserved: dict
+    ) -> SRTReservation | None:
+        """Build the new reservation from the reserve response and one ticket_info call.
 
-        for ticket in self.get_reservations():
+        Returns None when the response lacks what SRTReservation needs (a
+        personal booking without its payment deadline), so the caller can
+        fall back to scanning every reservation.
+        """
+        if jobid == RESERVE_JOBID["PERSONAL"] and not (
+            reserved.get("iseLmtDt") and reserved.get("iseLmtTm")
+        ):
+            return None
+
+        tickets = self.ticket_info(reserved["pnrNo"])
+        if not tickets:
+            return None
+
+        train_row = {
+            "pnrNo": reserved["pnrNo"],
+            "rcvdAmt": reserved.get("rcvdAmt") or sum(t.price for t in tickets),
+            "tkSpecNum": str(len(tickets)),
+        }
+        pay_row = {
+            "stlbTrnClsfCd": train.train_code,
+            "trnNo": train.train_number,
+            "dptDt": train.dep_date,
+            "dptTm": train.dep_time,
+            "dptRsStnCd": train.dep_station_code,
+            "arvTm": train.arr_time,
+            "arvRsStnCd": train.arr_station_code,
+            "iseLmtDt": reserved.get("iseLmtDt"),
+            "iseLmtTm": reserved.get("iseLmtTm"),
+            "stlFlg": "N",
+        }
+        return SRTReservation(train_row, pay_row, tickets)
+
+    def _find_reservation(self, reservation_number: str) -> SRTReservation:
+        for ticket in self.get_reservations(summary=True):
             if ticket.reservation_number == reservation_number:
                 return ticket
 
@@ -1046,15 +1729,19 @@ class SRT:
             "telNo": telNo if isAgreeSMS else "",
         }
 
-        r = self._session.post(url=API_ENDPOINTS["standby_option"], data=data)
-        self._log(r.text)
+        r = self._post("reserve", API_ENDPOINTS["standby_option"], data=data)
+        self._log_response(r)
         return r.status_code == 200
 
-    def get_reservations(self, paid_only: bool = False) -> list[SRTReservation]:
+    def get_reservations(
+        self, paid_only: bool = False, summary: bool = False
+    ) -> list[SRTReservation]:
         """Get all reservations.
 
         Args:
             paid_only: Whether to only return paid reservations
+            summary: Skip the per-reservation ticket lookups; each reservation
+                fetches its tickets on first access instead
 
         Returns:
             List of SRTReservation objects
@@ -1066,20 +1753,39 @@ class SRT:
         if not self.is_login:
             raise SRTNotLoggedInError()
 
-        r = self._session.post(url=API_ENDPOINTS["tickets"], data={"pageNo": "0"})
-        self._log(r.text)
-        parser = SRTResponseData(r.text)
+        r = self._post("default", API_ENDPOINTS["tickets"], data={"pageNo": "0"})
+        self._log_response(r)
+        parser = SRTResponseData(r.content)
 
         if not parser.success():
-            raise SRTResponseError(parser.message())
+            raise parser.error()
 
-        return [
-            SRTReservation(train, pay, self.ticket_info(train["pnrNo"]))
-            for train, pay in zip(
-                parser.get_all()["trainListMap"], parser.get_all()["payListMap"]
-            )
+        data = parser.get_all()
+        rows = [
+            (train, pay)
+            for train, pay in zip(data["trainListMap"], data["payListMap"])
             if not paid_only or pay["stlFlg"] != "N"
         ]
+        reservations = [
+            SRTReservation(train, pay, fetch_tickets=self.ticket_info)
+            for train, pay in rows
+        ]
+        if not summary:
+            self.load_tickets(reservations)
+        return reservations
+
+    def load_tickets(self, reservations: list[SRTReservation]) -> None:
+        """Fetch tickets for every reservation that has not loaded them yet.
+
+        Args:
+            reservations: Reservations, e.g. from get_reservations(summary=True)
+        """
+        pending = [r for r in reservations if not r.tickets_loaded]
+        tickets = self._pool.map(
+            self.ticket_info, [r.reservation_number for r in pending]
+        )
+        for reservation, ticket in zip(pending, tickets):
+            reservation.tickets = ticket
 
     def ticket_info(self, reservation: SRTReservation | int) -> list[SRTTicket]:
         """Get detailed ticket information.
@@ -1099,15 +1805,16 @@ class SRT:
 
         reservation_number = getattr(reservation, "reservation_number", reservation)
 
-        r = self._session.post(
-            url=API_ENDPOINTS["ticket_info"],
+        r = self._post(
+            "default",
+            API_ENDPOINTS["ticket_info"],
             data={"pnrNo": reservation_number, "jrnySqno": "1"},
         )
-        self._log(r.text)
-        parser = SRTResponseData(r.text)
+        self._log_response(r)
+        parser = SRTResponseData(r.content)
 
         if not parser.success():
-            raise SRTResponseError(parser.message())
+            raise parser.error()
 
         return [SRTTicket(ticket) for ticket in parser.get_all()["trainListMap"]]
 
@@ -1137,12 +1844,12 @@ class SRT:
 
         data = {"pnrNo": reservation_number, "jrnyCnt": "1", "rsvChgTno": "0"}
 
-        r = self._session.post(url=API_ENDPOINTS["cancel"], data=data)
-        self._log(r.text)
-        parser = SRTResponseData(r.text)
+        r = self._post("reserve", API_ENDPOINTS["cancel"], data=data)
+        self._log_response(r)
+        parser = SRTResponseData(r.content)
 
         if not parser.success():
-            raise SRTResponseError(parser.message())
+            raise parser.error()
 
         return True
 
@@ -1215,9 +1922,9 @@ class SRT:
             "pageUrl": "",
         }
 
-        r = self._session.post(url=API_ENDPOINTS["payment"], data=data)
-        self._log(r.text)
-        response = json.loads(r.text)
+        r = self._post("payment", API_ENDPOINTS["payment"], data=data)
+        self._log_response(r)
+        response = loads(r.content)
 
         if response["outDataSets"]["dsOutput0"][0]["strResult"] == "FAIL":
             raise SRTResponseError(response["outDataSets"]["dsOutput0"][0]["msgTxt"])
@@ -1225,11 +1932,13 @@ class SRT:
         return True
 
     def reserve_info(self, reservation: SRTReservation | int) -> bool:
-        referer = API_ENDPOINTS["reserve_info_referer"] + reservation.reservation_number
-        self._session.headers.update({"Referer": referer})
-        r = self._session.post(url=API_ENDPOINTS["reserve_info"])
-        self._log(r.text)
-        response = json.loads(r.text)
+        r = self._post(
+            "payment",
+            API_ENDPOINTS["reserve_info"],
+            headers=self._reserve_info_headers(reservation),
+        )
+        self._log_response(r)
+        response = loads(r.content)
         if response.get("ErrorCode") == "0" and response.get("ErrorMsg") == "":
             return response.get("outDataSets").get("dsOutput1")[0]
         else:
@@ -1247,15 +1956,71 @@ class SRT:
             "psgNm": info.get("buyPsNm"),
         }
 
-        r = self._session.post(url=API_ENDPOINTS["refund"], data=data)
-        self._log(r.text)
-        response = SRTResponseData(r.text)
+        r = self._post(
+            "payment",
+            API_ENDPOINTS["refund"],
+            data=data,
+            headers=self._reserve_info_headers(reservation),
+        )
+        self._log_response(r)
+        response = SRTResponseData(r.content)
 
         if not response.success():
-            raise SRTResponseError(response.message())
+            raise response.error()
 
         return True
 
+    @staticmethod
+    def _reserve_info_headers(reservation: SRTReservation) -> dict:
+        # Per request: the session's headers are shared by every thread
+        referer = API_ENDPOINTS["reserve_info_referer"] + reservation.reservation_number
+        return {"Referer": referer}
+
     def clear(self):
         self._log("Clearing the netfunnel key")
         self._netfunnel.clear()
+
+    def _check_netfunnel_reply(self, parser: SRTResponseData, key: str) -> None:
+        """Raise if a request sent with NetFunnel `key` failed.
+
+        Also tells the NetFunnel helper whether the server took the key.
+        """
+        if parser.success():
+            self._netfunnel.key_accepted(key)
+            return
+        error = parser.error()
+        if isinstance(error, SRTNetFunnelKeyError):
+            self._netfunnel.key_rejected(key)
+        raise error
+
+    def netfunnel(self, timeout: float | None = None) -> str:
+        """Pass NetFunnel now; the key is cached for the next search or reservation.
+
+        Args:
+            timeout: Seconds the pass may take
+
+        Returns:
+            str: NetFunnel key
+        """
+        return self._netfunnel.run(timeout=timeout)
+
+    async def netfunnel_async(self, timeout: float | None = None) -> str:
+        """Pass NetFunnel without blocking the event loop.
+
+        The key is cached for the next search or reservation, so the queue
+        wait can overlap other work. Cancel the task to abort it.
+
+        Args:
+            timeout: Seconds the pass may take
+
+        Returns:
+            str: NetFunnel key
+        """
+        return await self._netfunnel.run_async(timeout=timeout)
+
+    def netfunnel_stats(self) -> dict:
+        """NetFunnel passes and their network vs queue time.
+
+        See NetFunnelHelper.stats().
+        """
+        return self._netfunnel.stats()
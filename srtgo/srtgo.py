@@ -1,25 +1,24 @@
-try:
-    from curl_cffi.requests.exceptions import ConnectionError
-except ImportError:
-    from requests.exceptions import ConnectionError
-
 from datetime import datetime, timedelta
-from json.decoder import JSONDecodeError
-from random import gammavariate
 from termcolor import colored
-from typing import Awaitable, Callable, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
 
-import asyncio
+import atexit
 import click
-import inquirer
-import keyring
-import telegram
+import importlib.util
+import sys
 import time
 import re
 
+from . import transport
+from .changes import ChangeTracker
+from .errors import ABORT, REAUTH, RECONNECT, REFRESH_FUNNEL, ErrorCounter
+from .profiling import NULL_PROFILER, LoopProfiler
+from .scheduler import OK, PollScheduler
+from .session_cache import SessionCache, decode_key, encode_key
+from .settings import Settings
+from .watch import WatchSet
 from .ktx import (
     Korail,
-    KorailError,
     ReserveOption,
     TrainType,
     AdultPassenger,
@@ -32,7 +31,6 @@ from .ktx import (
 from .srt import (
     SRT,
     SRTError,
-    SRTNetFunnelError,
     SeatType,
     Adult,
     Child,
@@ -41,6 +39,9 @@ from .srt import (
     Disability4To6,
 )
 
+if TYPE_CHECKING:
+    from .notify import TelegramNotifier
+
 
 STATIONS = {
     "SRT": [
@@ -121,6 +122,7 @@ DEFAULT_STATIONS = {
 RESERVE_INTERVAL_SHAPE = 4
 RESERVE_INTERVAL_SCALE = 0.25
 RESERVE_INTERVAL_MIN = 0.25
+RESERVE_ITERATION_DEADLINE = 15  # seconds per search, NetFunnel queue excluded
 
 WAITING_BAR = ["|", "/", "-", "\\"]
 
@@ -128,9 +130,40 @@ RailType = Union[str, None]
 ChoiceType = Union[int, None]
 
 
+def _lazy_import(name):
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# The prompt stack dominates start-up time, so it is only loaded once a menu
+# is actually drawn.
+inquirer = _lazy_import("inquirer")
+
+settings = Settings()
+_notifier = None
+_profiler = None
+
+
 @click.command()
 @click.option("--debug", is_flag=True, help="Debug mode")
-def srtgo(debug=False):
+@click.option("--profile", is_flag=True, help="Print reservation loop phase timings at exit")
+@click.option("--profile-cpu", is_flag=True, help="With --profile, also run cProfile")
+@click.option("--profile-top", default=15, show_default=True, help="Functions to list")
+def srtgo(debug=False, profile=False, profile_cpu=False, profile_top=15):
+    global _profiler
+    if profile or profile_cpu:
+        _profiler = LoopProfiler(cpu=profile_cpu, top=profile_top)
+        atexit.register(
+            lambda: _profiler.iterations and print("\n" + _profiler.summary())
+        )
+
     MENU_CHOICES = [
         ("예매 시작", 1),
         ("예매 확인/결제/취소", 2),
@@ -204,9 +237,10 @@ def set_station(rail_type: RailType) -> bool:
         print("선택된 역이 없습니다.")
         return False
 
-    keyring.set_password(
+    settings.set(
         rail_type, "station", (selected_stations := ",".join(selected))
     )
+    settings.flush()
     print(f"선택된 역: {selected_stations}")
     return True
 
@@ -218,7 +252,7 @@ def edit_station(rail_type: RailType) -> bool:
             inquirer.Text(
                 "stations",
                 message="역 수정 (예: 수서,대전,동대구)",
-                default=keyring.get_password(rail_type, "station") or "",
+                default=settings.get(rail_type, "station") or "",
             )
         ]
     )
@@ -239,16 +273,17 @@ def edit_station(rail_type: RailType) -> bool:
             selected = DEFAULT_STATIONS[rail_type]
             break
 
-    keyring.set_password(
+    settings.set(
         rail_type, "station", (selected_stations := ",".join(selected))
     )
+    settings.flush()
     print(f"선택된 역: {selected_stations}")
     return True
 
 
 def get_station(rail_type: RailType) -> Tuple[List[str], List[int]]:
     stations = STATIONS[rail_type]
-    station_key = keyring.get_password(rail_type, "station")
+    station_key = settings.get(rail_type, "station")
 
     if not station_key:
         return stations, DEFAULT_STATIONS[rail_type]
@@ -280,17 +315,18 @@ def set_options():
         return
 
     options = choices.get("options", [])
-    keyring.set_password("SRT", "options", ",".join(options))
+    settings.set("SRT", "options", ",".join(options))
+    settings.flush()
 
 
 def get_options():
-    options = keyring.get_password("SRT", "options") or ""
+    options = settings.get("SRT", "options") or ""
     return options.split(",") if options else []
 
 
 def set_telegram() -> bool:
-    token = keyring.get_password("telegram", "token") or ""
-    chat_id = keyring.get_password("telegram", "chat_id") or ""
+    token = settings.get("telegram", "token") or ""
+    chat_id = settings.get("telegram", "chat_id") or ""
 
     telegram_info = inquirer.prompt(
         [
@@ -312,37 +348,48 @@ def set_telegram() -> bool:
     token, chat_id = telegram_info["token"], telegram_info["chat_id"]
 
     try:
-        keyring.set_password("telegram", "ok", "1")
-        keyring.set_password("telegram", "token", token)
-        keyring.set_password("telegram", "chat_id", chat_id)
-        tgprintf = get_telegram()
-        asyncio.run(tgprintf("[SRTGO] 텔레그램 설정 완료"))
+        settings.set("telegram", "ok", "1")
+        settings.set("telegram", "token", token)
+        settings.set("telegram", "chat_id", chat_id)
+        if notifier := get_telegram():
+            notifier.send_now("[SRTGO] 텔레그램 설정 완료")
         return True
     except Exception as err:
         print(err)
-        keyring.delete_password("telegram", "ok")
+        settings.delete("telegram", "ok")
         return False
+    finally:
+        settings.flush()
 
 
-def get_telegram() -> Optional[Callable[[str], Awaitable[None]]]:
-    token = keyring.get_password("telegram", "token")
-    chat_id = keyring.get_password("telegram", "chat_id")
+def get_telegram() -> Optional["TelegramNotifier"]:
+    global _notifier
+    from .notify import TelegramNotifier
 
-    async def tgprintf(text):
-        if token and chat_id:
-            bot = telegram.Bot(token=token)
-            async with bot:
-                await bot.send_message(chat_id=chat_id, text=text)
+    token = settings.get("telegram", "token")
+    chat_id = settings.get("telegram", "chat_id")
+    if not (token and chat_id):
+        return None
 
-    return tgprintf
+    if _notifier is None or (_notifier.token, _notifier.chat_id) != (token, chat_id):
+        if _notifier is not None:
+            _notifier.close()
+        _notifier = TelegramNotifier(token, chat_id)
+        atexit.register(_notifier.close)
+    return _notifier
+
+
+def notify(text: str) -> None:
+    if notifier := get_telegram():
+        notifier.send(text)
 
 
 def set_card() -> None:
     card_info = {
-        "number": keyring.get_password("card", "number") or "",
-        "password": keyring.get_password("card", "password") or "",
-        "birthday": keyring.get_password("card", "birthday") or "",
-        "expire": keyring.get_password("card", "expire") or "",
+        "number": settings.get("card", "number") or "",
+        "password": settings.get("card", "password") or "",
+        "birthday": settings.get("card", "birthday") or "",
+        "expire": settings.get("card", "expire") or "",
     }
 
     card_info = inquirer.prompt(
@@ -371,19 +418,20 @@ def set_card() -> None:
     )
     if card_info:
         for key, value in card_info.items():
-            keyring.set_password("card", key, value)
-        keyring.set_password("card", "ok", "1")
+            settings.set("card", key, value)
+        settings.set("card", "ok", "1")
+        settings.flush()
 
 
 def pay_card(rail, reservation) -> bool:
-    if keyring.get_password("card", "ok"):
-        birthday = keyring.get_password("card", "birthday")
+    if settings.get("card", "ok"):
+        birthday = settings.get("card", "birthday")
         return rail.pay_with_card(
             reservation,
-            keyring.get_password("card", "number"),
-            keyring.get_password("card", "password"),
+            settings.get("card", "number"),
+            settings.get("card", "password"),
             birthday,
-            keyring.get_password("card", "expire"),
+            settings.get("card", "expire"),
             0,
             "J" if len(birthday) == 6 else "S",
         )
@@ -392,8 +440,8 @@ def pay_card(rail, reservation) -> bool:
 
 def set_login(rail_type="SRT", debug=False):
     credentials = {
-        "id": keyring.get_password(rail_type, "id") or "",
-        "pass": keyring.get_password(rail_type, "pass") or "",
+        "id": settings.get(rail_type, "id") or "",
+        "pass": settings.get(rail_type, "pass") or "",
     }
 
     login_info = inquirer.prompt(
@@ -420,28 +468,68 @@ def set_login(rail_type="SRT", debug=False):
             login_info["id"], login_info["pass"], verbose=debug
         )
 
-        keyring.set_password(rail_type, "id", login_info["id"])
-        keyring.set_password(rail_type, "pass", login_info["pass"])
-        keyring.set_password(rail_type, "ok", "1")
+        settings.set(rail_type, "id", login_info["id"])
+        settings.set(rail_type, "pass", login_info["pass"])
+        settings.set(rail_type, "ok", "1")
         return True
     except SRTError as err:
         print(err)
-        keyring.delete_password(rail_type, "ok")
+        settings.delete(rail_type, "ok")
         return False
+    finally:
+        settings.flush()
 
 
 def login(rail_type="SRT", debug=False):
     if (
-        keyring.get_password(rail_type, "id") is None
-        or keyring.get_password(rail_type, "pass") is None
+        settings.get(rail_type, "id") is None
+        or settings.get(rail_type, "pass") is None
     ):
         set_login(rail_type)
 
-    user_id = keyring.get_password(rail_type, "id")
-    password = keyring.get_password(rail_type, "pass")
+    user_id = settings.get(rail_type, "id")
+    password = settings.get(rail_type, "pass")
+
+    if rail_type != "SRT":
+        return Korail(
+            user_id, password, verbose=debug, session_cache=get_session_cache()
+        )
+    return SRT(
+        user_id,
+        password,
+        verbose=debug,
+        session_cache=get_session_cache(),
+        netfunnel_progress=show_netfunnel_progress,
+    )
+
+
+def show_netfunnel_progress(funnel):
+    print(f"\r현재 {funnel.nwait}명 대기중...", end="", flush=True)
+
+
+def get_session_cache():
+    try:
+        key = settings.get("session", "key")
+        if key is None:
+            key = encode_key(SessionCache.new_key())
+            settings.set("session", "key", key)
+            settings.flush()
+        return SessionCache(decode_key(key))
+    except Exception:
+        return None
 
-    rail = SRT if rail_type == "SRT" else Korail
-    return rail(user_id, password, verbose=debug)
+
+def relogin(rail, rail_type="SRT", debug=False, since=None):
+    try:
+        if rail.relogin(since=since):
+            return rail
+    except Exception as ex:
+        if debug:
+            print(f"\nRelogin failed: {ex}")
+    # The new client would resume the session that just failed
+    if cache := get_session_cache():
+        cache.discard(rail_type, settings.get(rail_type, "id"))
+    return login(rail_type, debug=debug)
 
 
 def reserve(rail_type="SRT", debug=False):
@@ -454,16 +542,16 @@ def reserve(rail_type="SRT", debug=False):
     this_time = now.strftime("%H%M%S")
 
     defaults = {
-        "departure": keyring.get_password(rail_type, "departure")
+        "departure": settings.get(rail_type, "departure")
         or ("수서" if is_srt else "서울"),
-        "arrival": keyring.get_password(rail_type, "arrival") or "동대구",
-        "date": keyring.get_password(rail_type, "date") or today,
-        "time": keyring.get_password(rail_type, "time") or "120000",
-        "adult": int(keyring.get_password(rail_type, "adult") or 1),
-        "child": int(keyring.get_password(rail_type, "child") or 0),
-        "senior": int(keyring.get_password(rail_type, "senior") or 0),
-        "disability1to3": int(keyring.get_password(rail_type, "disability1to3") or 0),
-        "disability4to6": int(keyring.get_password(rail_type, "disability4to6") or 0),
+        "arrival": settings.get(rail_type, "arrival") or "동대구",
+        "date": settings.get(rail_type, "date") or today,
+        "time": settings.get(rail_type, "time") or "120000",
+        "adult": int(settings.get(rail_type, "adult") or 1),
+        "child": int(settings.get(rail_type, "child") or 0),
+        "senior": int(settings.get(rail_type, "senior") or 0),
+        "disability1to3": int(settings.get(rail_type, "disability1to3") or 0),
+        "disability4to6": int(settings.get(rail_type, "disability4to6") or 0),
     }
 
     # Set default stations if departure equals arrival
@@ -578,7 +666,8 @@ def reserve(rail_type="SRT", debug=False):
 
     # Save preferences
     for key, value in info.items():
-        keyring.set_password(rail_type, key, str(value))
+        settings.set(rail_type, key, str(value))
+    settings.flush()
 
     # Adjust time if needed
     if info["date"] == today and int(info["time"]) < int(this_time):
@@ -676,117 +765,159 @@ def reserve(rail_type="SRT", debug=False):
         print(colored("예매 정보 입력 중 취소되었습니다", "green", "on_red") + "\n")
         return
 
+    reserve_loop(
+        rail,
+        rail_type,
+        params,
+        WatchSet(trains[i] for i in choice["trains"]),
+        passengers,
+        options["type"],
+        pay=options["pay"],
+        debug=debug,
+        profiler=_profiler,
+    )
+
+
+def reserve_loop(
+    rail,
+    rail_type,
+    params,
+    watch,
+    passengers,
+    seat_type,
+    pay=False,
+    debug=False,
+    max_attempts=None,
+    profiler=None,
+    scheduler=None,
+    deadline=RESERVE_ITERATION_DEADLINE,
+):
     # Reserve function
     def _reserve(train):
-        reserve = rail.reserve(train, passengers=passengers, option=options["type"])
+        try:
+            reserve = rail.reserve(train, passengers=passengers, option=seat_type)
+        except (transport.RequestTimeout, transport.ConnectionError):
+            # The server may have booked it after the client gave up
+            try:
+                reserve = _find_reservation(rail, rail_type, train)
+            except Exception as ex:
+                msg = f"예약 응답 없음, 예약 여부를 확인하세요: {train}\n{ex}"
+                print(colored(f"\n{msg}\n", "green", "on_red"))
+                notify(msg)
+                return None
+            if reserve is None:
+                raise
         msg = f"{reserve}"
-        if hasattr(reserve, "tickets") and reserve.tickets:
-            msg += "\n" + "\n".join(map(str, reserve.tickets))
-
-        print(colored(f"\n\n🎫 🎉 예매 성공!!! 🎉 🎫\n{msg}\n", "red", "on_green"))
+        # The seat is booked: an error from here on ends the loop, since
+        # polling on could book a second train
+        try:
+            if hasattr(reserve, "tickets") and reserve.tickets:
+                msg += "\n" + "\n".join(map(str, reserve.tickets))
 
-        if options["pay"] and not reserve.is_waiting and pay_card(rail, reserve):
             print(
-                colored("\n\n💳 ✨ 결제 성공!!! ✨ 💳\n\n", "green", "on_red"), end=""
+                colored(f"\n\n🎫 🎉 예매 성공!!! 🎉 🎫\n{msg}\n", "red", "on_green")
             )
-            msg += "\n결제 완료"
 
-        tgprintf = get_telegram()
-        asyncio.run(tgprintf(msg))
+            if pay and not reserve.is_waiting and pay_card(rail, reserve):
+                print(
+                    colored("\n\n💳 ✨ 결제 성공!!! ✨ 💳\n\n", "green", "on_red"),
+                    end="",
+                )
+                msg += "\n결제 완료"
+        except Exception as ex:
+            msg += f"\n예매 후 오류, 결제 여부를 확인하세요: {ex}"
+            print(colored(f"\n{msg}\n", "green", "on_red"))
+
+        notify(msg)
+        return reserve
+
+    def sleep(signal, hold=0.0):
+        if signal is not None:
+            scheduler.record(signal)
+        with profiler.phase("sleep"):
+            scheduler.wait(idle=lambda: rail.warm_up(netfunnel=False), hold=hold)
 
     # Reservation loop
     i_try = 0
     start_time = time.time()
+    profiler = profiler or NULL_PROFILER
+    scheduler = scheduler or PollScheduler(
+        RESERVE_INTERVAL_SHAPE, RESERVE_INTERVAL_SCALE, RESERVE_INTERVAL_MIN
+    )
+    profiler.attach_scheduler(scheduler)
+    errors = ErrorCounter()
+    profiler.attach_errors(errors)
+    # Validate and encode the search once; each poll only sends it
+    query = rail.prepare_search(**params)
+    changes = ChangeTracker(on_event=(lambda e: print(f"\n{e}")) if debug else None)
+    # Connect (and pass NetFunnel) now rather than inside the first search
+    rail.warm_up()
     while True:
-        try:
-            i_try += 1
-            elapsed_time = time.time() - start_time
-            hours, remainder = divmod(int(elapsed_time), 3600)
-            minutes, seconds = divmod(remainder, 60)
-            print(
-                f"\r예매 대기 중... {WAITING_BAR[i_try & 3]} {i_try:4d} ({hours:02d}:{minutes:02d}:{seconds:02d}) ",
-                end="",
-                flush=True,
-            )
-
-            trains = rail.search_train(**params)
-            for i in choice["trains"]:
-                if _is_seat_available(trains[i], options["type"], rail_type):
-                    _reserve(trains[i])
-                    return
-            _sleep()
-
-        except SRTError as ex:
-            msg = ex.msg
-            if "정상적인 경로로 접근 부탁드립니다" in msg or isinstance(
-                ex, SRTNetFunnelError
-            ):
-                if debug:
+        with profiler.iteration():
+            # A login by another thread after this point serves this one too
+            generation = rail.login_generation
+            try:
+                profiler.attach(rail)
+                i_try += 1
+                with profiler.phase("output"):
+                    elapsed_time = time.time() - start_time
+                    hours, remainder = divmod(int(elapsed_time), 3600)
+                    minutes, seconds = divmod(remainder, 60)
                     print(
-                        f"\nException: {ex}\nType: {type(ex)}\nArgs: {ex.args}\nMessage: {msg}"
+                        f"\r예매 대기 중... {WAITING_BAR[i_try & 3]} {i_try:4d} ({hours:02d}:{minutes:02d}:{seconds:02d}) ",
+                        end="",
+                        flush=True,
                     )
-                rail.clear()
-            elif "로그인 후 사용하십시오" in msg:
+
+                with profiler.phase("search"):
+                    # The queue takes as long as it takes; leaving it early
+                    # only sends the next search to the back
+                    if rail_type == "SRT":
+                        rail.netfunnel()
+                    with transport.deadline(deadline):
+                        rail.search(query, changes)
+                errors.ok()
+                with profiler.phase("check"):
+                    found, gone = watch.match(changes)
+                    for missing in gone:
+                        print(f"\n선택한 열차가 검색 결과에 없습니다: {missing}")
+                    # Every watched train, not just those with an event: a
+                    # seat that stays open after a failed reserve is retried
+                    train = next(
+                        (
+                            t
+                            for t in found
+                            if _is_seat_available(t, seat_type, rail_type)
+                        ),
+                        None,
+                    )
+                if train is not None:
+                    with profiler.phase("reserve"):
+                        return _reserve(train)
+                if max_attempts and i_try >= max_attempts:
+                    return None
+                sleep(OK)
+
+            except Exception as ex:
+                policy = errors.record(ex)
+                hold = 0.0
                 if debug:
                     print(
-                        f"\nException: {ex}\nType: {type(ex)}\nArgs: {ex.args}\nMessage: {msg}"
+                        f"\nException: {ex}\nType: {type(ex)}\nCode: "
+                        f"{getattr(ex, 'code', None)}\nPolicy: {policy.action}"
                     )
-                rail = login(rail_type, debug=debug)
-                if not rail.is_login and not _handle_error(ex):
-                    return
-            elif not any(
-                err in msg
-                for err in (
-                    "잔여석없음",
-                    "사용자가 많아 접속이 원활하지 않습니다",
-                    "예약대기 접수가 마감되었습니다",
-                    "예약대기자한도수초과",
-                )
-            ):
-                if not _handle_error(ex):
-                    return
-            _sleep()
-
-        except KorailError as ex:
-            msg = ex.msg
-            if "Need to Login" in msg:
-                rail = login(rail_type, debug=debug)
-                if not rail.is_login and not _handle_error(ex):
-                    return
-            elif not any(
-                err in msg
-                for err in ("Sold out", "잔여석없음", "예약대기자한도수초과")
-            ):
-                if not _handle_error(ex):
+                if policy.action == REFRESH_FUNNEL:
+                    rail.clear()
+                elif policy.action == RECONNECT:
+                    # Until the breaker lets a probe through (0 while closed)
+                    hold = getattr(ex, "retry_in", 0.0)
+                elif policy.action == REAUTH:
+                    rail = relogin(rail, rail_type, debug=debug, since=generation)
+                    if not rail.is_login and not _handle_error(ex):
+                        return
+                elif policy.action == ABORT and not _handle_error(ex):
                     return
-            _sleep()
-
-        except JSONDecodeError as ex:
-            if debug:
-                print(
-                    f"\nException: {ex}\nType: {type(ex)}\nArgs: {ex.args}\nMessage: {ex.msg}"
-                )
-            _sleep()
-            rail = login(rail_type, debug=debug)
-
-        except ConnectionError as ex:
-            if not _handle_error(ex, "연결이 끊겼습니다"):
-                return
-            rail = login(rail_type, debug=debug)
-
-        except Exception as ex:
-            if debug:
-                print("\nUndefined exception")
-            if not _handle_error(ex):
-                return
-            rail = login(rail_type, debug=debug)
-
-
-def _sleep():
-    time.sleep(
-        gammavariate(RESERVE_INTERVAL_SHAPE, RESERVE_INTERVAL_SCALE)
-        + RESERVE_INTERVAL_MIN
-    )
+                sleep(policy.signal, hold)
 
 
 def _handle_error(ex, msg=None):
@@ -795,11 +926,32 @@ def _handle_error(ex, msg=None):
         or f"\nException: {ex}, Type: {type(ex)}, Message: {ex.msg if hasattr(ex, 'msg') else 'No message attribute'}"
     )
     print(msg)
-    tgprintf = get_telegram()
-    asyncio.run(tgprintf(msg))
+    notify(msg)
     return inquirer.confirm(message="계속할까요", default=True)
 
 
+def _find_reservation(rail, rail_type, train):
+    if rail_type == "SRT":
+        return next(
+            (
+                r
+                for r in rail.get_reservations(summary=True)
+                if (r.train_number, r.dep_date, r.dep_time)
+                == (train.train_number, train.dep_date, train.dep_time)
+            ),
+            None,
+        )
+    return next(
+        (
+            r
+            for r in rail.reservations(summary=True)
+            if (r.train_no, r.dep_date, r.dep_time)
+            == (train.train_no, train.run_date, train.dep_time)
+        ),
+        None,
+    )
+
+
 def _is_seat_available(train, seat_type, rail_type):
     if rail_type == "SRT":
         if not train.seat_available():
@@ -823,8 +975,11 @@ def check_reservation(rail_type="SRT", debug=False):
     rail = login(rail_type, debug=debug)
 
     while True:
+        # Ticket details are only fetched for what is actually shown or paid
         reservations = (
-            rail.get_reservations() if rail_type == "SRT" else rail.reservations()
+            rail.get_reservations(summary=True)
+            if rail_type == "SRT"
+            else rail.reservations(summary=True)
         )
         tickets = [] if rail_type == "SRT" else rail.tickets()
 
@@ -857,6 +1012,8 @@ def check_reservation(rail_type="SRT", debug=False):
         if choice == -2:
             out = []
             if all_reservations:
+                if rail_type == "SRT":
+                    rail.load_tickets(reservations)
                 out.append("[ 예매 내역 ]")
                 for reservation in all_reservations:
                     out.append(f"🚅{reservation}")
@@ -864,8 +1021,7 @@ def check_reservation(rail_type="SRT", debug=False):
                         out.extend(map(str, reservation.tickets))
 
             if out:
-                tgprintf = get_telegram()
-                asyncio.run(tgprintf("\n".join(out)))
+                notify("\n".join(out))
             return
 
         # If choice is an unpaid reservation, ask to pay or cancel
@@ -0,0 +1,526 @@
+"""HTTP session factory and response decoding shared by the SRT and Korail clients.
+
+`curl_cffi` (or `requests` when it is not installed) is only imported when the
+first session is created, so importing `srtgo` stays cheap.
+"""
+
+import importlib
+import importlib.util
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+HAS_CURL_CFFI = importlib.util.find_spec("curl_cffi") is not None
+
+# Preferred first; `json` is always available. Chosen on first use.
+JSON_BACKENDS = ("orjson", "json")
+JSON_BACKEND = None
+_loads = None
+
+
+def set_json_backend(name: str | None = None) -> str:
+    """Select the JSON parser used by `loads`.
+
+    Args:
+        name: One of `JSON_BACKENDS`, or None for the first one installed
+
+    Returns:
+        str: Name of the selected backend
+
+    Raises:
+        ImportError: If `name` is given but not installed
+    """
+    global JSON_BACKEND, _loads
+    for candidate in (name,) if name else JSON_BACKENDS:
+        try:
+            module = importlib.import_module(candidate)
+        except ImportError:
+            if name:
+                raise
+            continue
+        JSON_BACKEND, _loads = candidate, module.loads
+        return candidate
+    raise ImportError("no JSON backend available")
+
+
+def loads(content: bytes | str):
+    """Parse a JSON body, straight from the response bytes.
+
+    Raises:
+        ValueError: If `content` is not valid JSON
+    """
+    if _loads is None:
+        set_json_backend()
+    return _loads(content)
+
+
+def new_session(impersonate: str = "chrome"):
+    """Create an HTTP session, impersonating `impersonate` when curl_cffi is available."""
+    if HAS_CURL_CFFI:
+        import curl_cffi
+
+        return curl_cffi.Session(impersonate=impersonate)
+
+    import requests
+
+    return requests.session()
+
+
+def export_cookies(session) -> list[dict]:
+    """Return `session`'s cookies as plain dicts, e.g. to save them to disk."""
+    jar = getattr(session.cookies, "jar", session.cookies)
+    return [
+        {
+            "name": cookie.name,
+            "value": cookie.value,
+            "domain": cookie.domain,
+            "path": cookie.path,
+            "secure": cookie.secure,
+        }
+        for cookie in jar
+    ]
+
+
+def import_cookies(session, cookies: list[dict]) -> None:
+    """Load cookies produced by `export_cookies` into `session`."""
+    for cookie in cookies:
+        session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain", ""),
+            path=cookie.get("path", "/"),
+            secure=cookie.get("secure", False),
+        )
+
+
+class RequestTimeout(TimeoutError):
+    """A request ran past its timeout, or was not sent because the
+    surrounding `deadline()` had already expired."""
+
+
+class Timeouts:
+    """(connect, read) timeouts in seconds per endpoint class.
+
+    `default` covers every endpoint outside the other classes (login,
+    listings, logout). A single number sets both timeouts of a class.
+
+    Examples:
+        >>> Timeouts(search=(2, 4), payment=60).get("payment")
+        (60.0, 60.0)
+    """
+
+    DEFAULTS = {
+        "default": (3.05, 10.0),
+        "search": (3.05, 5.0),
+        "reserve": (3.05, 10.0),
+        "payment": (3.05, 30.0),
+        "netfunnel": (3.05, 5.0),
+    }
+
+    def __init__(self, **timeouts) -> None:
+        unknown = timeouts.keys() - self.DEFAULTS.keys()
+        if unknown:
+            raise ValueError(f"Unknown endpoint class: {', '.join(sorted(unknown))}")
+        self._values = dict(self.DEFAULTS)
+        for kind, value in timeouts.items():
+            connect, read = value if isinstance(value, tuple) else (value, value)
+            self._values[kind] = (float(connect), float(read))
+
+    def get(self, kind: str) -> tuple[float, float]:
+        return self._values.get(kind, self._values["default"])
+
+    def __repr__(self) -> str:
+        return f"Timeouts({self._values})"
+
+
+# A context variable rather than a thread-local, so the deadline follows
+# `asyncio.to_thread` calls made under it
+_deadline: ContextVar[float | None] = ContextVar("srtgo_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float | None):
+    """Bound every `request()` in this context to finish within `seconds`.
+
+    Nested deadlines keep the earlier expiry. None leaves the current one.
+    """
+    previous = _deadline.get()
+    at = previous
+    if seconds is not None:
+        at = time.monotonic() + seconds
+        at = at if previous is None else min(previous, at)
+    token = _deadline.set(at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left until the current deadline, or None without one."""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def request(
+    session,
+    method: str,
+    url: str,
+    timeout: tuple[float, float],
+    stats: "ConnectionStats | None" = None,
+    breaker: "CircuitBreaker | None" = None,
+    **kwargs,
+):
+    """Send `session.<method>(url, **kwargs)` within `timeout` and the deadline.
+
+    The response is counted in `stats` when given. With a `breaker`, the
+    request is only sent while the circuit to the host lets it through, and
+    timeouts and connection errors count against the host.
+
+    Raises:
+        RequestTimeout: If the request timed out or the deadline has passed
+        CircuitOpenError: If `breaker` holds requests to the host back
+    """
+    connect, read = timeout
+    left = remaining()
+    if left is not None:
+        if left <= 0:
+            raise RequestTimeout(f"Deadline exceeded before {url}")
+        # curl_cffi bounds the whole transfer by connect + read
+        connect = min(connect, left)
+        read = max(0.001, min(read, left - connect))
+    if breaker is None:
+        try:
+            r = getattr(session, method)(url, timeout=(connect, read), **kwargs)
+        except _timeout_error() as ex:
+            raise RequestTimeout(f"Timed out: {url} ({ex})") from ex
+    else:
+        host = _host(url)
+        breaker.before(host)
+        try:
+            r = getattr(session, method)(url, timeout=(connect, read), **kwargs)
+        except _timeout_error() as ex:
+            breaker.failure(host)
+            raise RequestTimeout(f"Timed out: {url} ({ex})") from ex
+        except _connection_error():
+            breaker.failure(host)
+            raise
+        except BaseException:
+            breaker.release(host)
+            raise
+        breaker.success(host)
+    if stats is not None:
+        stats.record(r)
+    return r
+
+
+def preconnect(
+    session,
+    urls,
+    timeout: tuple[float, float],
+    stats: "ConnectionStats | None" = None,
+    breaker: "CircuitBreaker | None" = None,
+) -> bool:
+    """Open (or refresh) a kept-alive connection to the host of each URL.
+
+    Sends one HEAD request per distinct origin, which resolves the host and
+    completes the TCP and TLS handshakes. Returns whether every host answered.
+    Failures are not raised; the next real request simply reconnects.
+    """
+    ok = True
+    for origin in dict.fromkeys(
+        "{0.scheme}://{0.netloc}/".format(urlsplit(url)) for url in urls
+    ):
+        try:
+            request(
+                session, "head", origin, timeout, stats, breaker, allow_redirects=False
+            )
+        except (OSError, TimeoutError):
+            ok = False
+    return ok
+
+
+class ConnectionStats:
+    """Count requests per host that reused a kept-alive connection or opened one.
+
+    A connection is new when the local port of the transfer differs from the
+    last one seen on that host through the same curl handle (curl_cffi, one
+    per session and thread) or urllib3 pool (`requests`, read from the
+    connection just handed back to the pool).
+
+    Examples:
+        >>> srt.connections.snapshot()
+        {'app.srail.or.kr': {'requests': 12, 'reused': 11, 'new': 1}}
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._markers = {}
+
+    def record(self, response) -> None:
+        host = urlsplit(response.url).netloc
+        pool = getattr(getattr(response, "raw", None), "_pool", None)
+        if pool is not None:
+            key, marker = (host, id(pool)), _pooled_port(pool)
+        else:
+            key = (host, id(getattr(response, "curl", None)))
+            marker = getattr(response, "local_port", None)
+        with self._lock:
+            counts = self._hosts.setdefault(host, [0, 0])
+            counts[0] += 1
+            if marker is None or self._markers.get(key) != marker:
+                counts[1] += 1
+            self._markers[key] = marker
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                host: {"requests": total, "reused": total - new, "new": new}
+                for host, (total, new) in self._hosts.items()
+            }
+
+    def reset(self) -> None:
+        """Zero the counts; connections already open still count as reused."""
+        with self._lock:
+            self._hosts.clear()
+
+
+class CircuitOpenError(ConnectionError):  # the builtin, not the backend's
+    """A request was not sent because the circuit to its host is open.
+
+    Attributes:
+        host: Host the request was for
+        retry_in: Seconds until the breaker lets a probe through
+    """
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        super().__init__(f"Circuit to {host} is open, retry in {retry_in:.1f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class _Circuit:
+    __slots__ = ("state", "failures", "delay", "until", "opened", "probes", "rejected")
+
+    def __init__(self) -> None:
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.delay = 0.0
+        self.until = 0.0
+        self.opened = 0
+        self.probes = 0
+        self.rejected = 0
+
+
+class CircuitBreaker:
+    """Hold requests back from a host whose connections keep failing.
+
+    Each host has its own circuit. It opens after `threshold` timeouts or
+    connection errors in a row, and while it is open requests fail fast with
+    `CircuitOpenError` instead of going out. After the reset delay the
+    circuit is half-open and lets a single probe through: if it gets a
+    response the circuit closes, otherwise it opens again with the delay
+    multiplied by `backoff`. Each delay is shortened by up to `jitter` of
+    itself at random, so clients cut off together don't all probe at once.
+
+    Args:
+        threshold: Failures in a row that open the circuit
+        delay: First reset delay (seconds)
+        backoff: Reset delay multiplier per failed probe
+        max_delay: Longest reset delay (seconds)
+        jitter: Largest fraction of the delay taken off at random
+        clock: Monotonic time source
+        rng: Random source for the jitter
+
+    Examples:
+        >>> srt = SRT(..., breaker=CircuitBreaker(threshold=5, max_delay=30))
+        >>> srt.breaker.snapshot()
+        {'app.srail.or.kr': {'state': 'open', 'failures': 5, 'opened': 1, ...}}
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        threshold: int = 3,
+        delay: float = 1.0,
+        backoff: float = 2.0,
+        max_delay: float = 10.0,
+        jitter: float = 0.5,
+        clock=time.monotonic,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.threshold = threshold
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._circuits = {}  # host -> _Circuit, from its first failure on
+
+    def before(self, host: str) -> None:
+        """Let a request to `host` through, or raise `CircuitOpenError`."""
+        circuit = self._circuits.get(host)
+        if circuit is None or circuit.state == self.CLOSED:
+            return
+        with self._lock:
+            if circuit.state == self.OPEN:
+                now = self._clock()
+                if now < circuit.until:
+                    circuit.rejected += 1
+                    raise CircuitOpenError(host, circuit.until - now)
+                circuit.state = self.HALF_OPEN
+                circuit.probes += 1
+            elif circuit.state == self.HALF_OPEN:
+                # Another thread's probe is in flight
+                circuit.rejected += 1
+                raise CircuitOpenError(host, self.delay)
+
+    def success(self, host: str) -> None:
+        """`host` answered: close its circuit."""
+        circuit = self._circuits.get(host)
+        if circuit is None or (circuit.state == self.CLOSED and not circuit.failures):
+            return
+        with self._lock:
+            circuit.state = self.CLOSED
+            circuit.failures = 0
+            circuit.delay = 0.0
+
+    def failure(self, host: str) -> None:
+        """A request to `host` timed out or lost its connection."""
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None:
+                circuit = self._circuits[host] = _Circuit()
+            circuit.failures += 1
+            if circuit.state == self.HALF_OPEN:
+                self._open(circuit, min(circuit.delay * self.backoff, self.max_delay))
+            elif circuit.state == self.CLOSED and circuit.failures >= self.threshold:
+                self._open(circuit, self.delay)
+
+    def release(self, host: str) -> None:
+        """A request to `host` ended without telling whether the host is up."""
+        circuit = self._circuits.get(host)
+        if circuit is not None and circuit.state == self.HALF_OPEN:
+            with self._lock:
+                circuit.state = self.OPEN  # probe again right away
+
+    def retry_in(self, host: str) -> float:
+        """Seconds until a request to `host` may go out (0 if it may now)."""
+        circuit = self._circuits.get(host)
+        if circuit is None or circuit.state != self.OPEN:
+            return 0.0
+        return max(0.0, circuit.until - self._clock())
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                host: {
+                    "state": circuit.state,
+                    "failures": circuit.failures,
+                    "opened": circuit.opened,
+                    "probes": circuit.probes,
+                    "rejected": circuit.rejected,
+                    "retry_in": self.retry_in(host),
+                }
+                for host, circuit in self._circuits.items()
+            }
+
+    def reset(self) -> None:
+        """Close every circuit and forget the counts."""
+        with self._lock:
+            self._circuits.clear()
+
+    def _open(self, circuit: _Circuit, delay: float) -> None:
+        circuit.state = self.OPEN
+        circuit.delay = delay
+        circuit.until = self._clock() + delay * (1 - self.jitter * self._rng.random())
+        circuit.opened += 1
+
+
+@lru_cache(maxsize=64)
+def _host(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+def _pooled_port(pool) -> int | None:
+    # urllib3 puts the connection back on top of its LIFO pool once the body
+    # has been read, and reconnects dropped ones on the same object
+    try:
+        return pool.pool.queue[-1].sock.getsockname()[1]
+    except (AttributeError, IndexError, OSError):
+        return None
+
+
+def _timeout_error():
+    if HAS_CURL_CFFI:
+        from curl_cffi.requests.exceptions import Timeout
+    else:
+        from requests.exceptions import Timeout
+    return Timeout
+
+
+def _connection_error():
+    if HAS_CURL_CFFI:
+        from curl_cffi.requests.exceptions import ConnectionError
+    else:
+        from requests.exceptions import ConnectionError
+    return ConnectionError
+
+
+def __getattr__(name: str):
+    # Resolved lazily so `except transport.ConnectionError` does not force
+    # the HTTP backend to load at import time.
+    if name == "ConnectionError":
+        return _connection_error()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class WorkerPool:
+    """Run per-item follow-up requests on a small, capped thread pool.
+
+    Results come back in input order, and the first failing item's exception
+    is re-raised to the caller, as if the items had been fetched one by one.
+    Threads are created on first use and reused afterwards, so each keeps its
+    own warm connection.
+
+    Args:
+        max_workers: Maximum number of requests in flight (1 disables threading)
+        name: Thread name prefix
+    """
+
+    def __init__(self, max_workers: int = 4, name: str = "srtgo") -> None:
+        self.max_workers = max_workers
+        self.name = name
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def map(self, fn, items) -> list:
+        items = list(items)
+        if self.max_workers <= 1 or len(items) <= 1:
+            return [fn(item) for item in items]
+
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+            executor = self._executor
+        return list(executor.map(fn, items))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,71 @@
+"""Trains picked for the reservation loop, kept by identity.
+
+A search result is a fresh list on every poll, and the server may insert,
+drop or reorder trains between polls, so positions picked from one result
+don't point at the same trains in the next. A `WatchSet` keys the picks by
+train identity (train number, departure date and time, route; see
+`SRTTrain.key` and ktx `Train.key`) and looks each of them up in the new
+result, reporting the ones that are gone instead of checking another train.
+"""
+
+
+class WatchSet:
+    """Picked trains by identity, in order of preference.
+
+    Args:
+        trains: Trains to watch, most preferred first
+
+    Attributes:
+        missing: Keys of watched trains absent from the last result
+
+    Examples:
+        >>> watch = WatchSet(trains[i] for i in picked)
+        >>> found, gone = watch.match(srt.search_train(...))
+    """
+
+    def __init__(self, trains=()) -> None:
+        self._trains = {}  # key -> train as picked
+        self.missing = set()
+        for train in trains:
+            self.add(train)
+
+    def add(self, train) -> None:
+        self._trains.setdefault(train.key, train)
+
+    def discard(self, key: tuple) -> None:
+        self._trains.pop(key, None)
+        self.missing.discard(key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._trains
+
+    def __iter__(self):
+        return iter(self._trains.values())
+
+    def __len__(self) -> int:
+        return len(self._trains)
+
+    def match(self, result) -> tuple[list, list]:
+        """Find the watched trains in a new search result.
+
+        Args:
+            result: List of trains, or a mapping of key to train such as a
+                `ChangeTracker`, whose lookups are O(1) without reindexing
+
+        Returns:
+            Watched trains present in `result`, as of `result` and in order
+            of preference, and the picked trains that went missing since the
+            previous call
+        """
+        if isinstance(result, list):
+            result = {train.key: train for train in result}
+        found, gone = [], []
+        for key, picked in self._trains.items():
+            train = result.get(key)
+            if train is not None:
+                found.append(train)
+                self.missing.discard(key)
+            elif key not in self.missing:
+                self.missing.add(key)
+                gone.append(picked)
+        return found, gone